@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AttnBackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ATTN_Backend'
+
+    def ready(self):
+        from . import checks, signals, tasks  # noqa: F401
@@ -0,0 +1,87 @@
+from datetime import date
+
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.views.decorators.http import require_safe
+
+from . import catalog, queries
+from .models import OrderProducts
+from .fastpath import mapper
+from .pagination import InvalidCursor, akeyset_page, parse_page_size
+from .renderers import ORJSONRenderer
+from .routers import read_from_replica
+from .serializers import OrderProductsSerializer, OrderedItemSerializer
+
+
+# Async twins of the read-heavy list views, served instead of the DRF
+# views when ATTN_ASYNC_VIEWS is on (the ASGI deployment). While a query
+# is in flight the event loop keeps serving other requests, so polling
+# pages do not each pin a worker thread. Responses are byte-for-byte the
+# same as the sync views'.
+
+def _response(data, status=200, headers=None):
+    # Rendered exactly as DRF's Response would be (see ORJSONRenderer)
+    return HttpResponse(
+        ORJSONRenderer().render(data), status=status, headers=headers, content_type="application/json"
+    )
+
+
+@require_safe
+async def product_list(request):
+    version = await catalog.acurrent_version()
+    headers = catalog.headers(version)
+    if catalog.not_modified(request, version):
+        return HttpResponseNotModified(headers=headers)
+    return _response(await catalog.apayload(version), headers=headers)
+
+
+@require_safe
+async def order_list(request):
+    params = request.GET
+    try:
+        orders = queries.filter_orders(OrderProducts.objects.all(), params)
+    except ValueError:
+        return _response({"error": "Dates must be in YYYY-MM-DD format"}, status=400)
+
+    if "cursor" not in params and "limit" not in params:
+        serialize = mapper(OrderProductsSerializer)
+        return _response(serialize.map([row async for row in serialize.queryset(orders)]))
+
+    try:
+        limit = parse_page_size(params.get("limit"))
+        serialize = mapper(OrderProductsSerializer)
+        page, next_cursor = await akeyset_page(
+            serialize.queryset(orders),
+            ["order_date", "order_id"],
+            cursor=params.get("cursor"),
+            limit=limit,
+            parsers={"order_date": date.fromisoformat},
+        )
+    except InvalidCursor as exc:
+        return _response({"error": str(exc)}, status=400)
+
+    return _response({
+        "results": serialize.map(page),
+        "next_cursor": next_cursor,
+    })
+
+
+@require_safe
+@read_from_replica
+async def orderitem_list(request):
+    serialize = mapper(OrderedItemSerializer)
+    return _response(serialize.map([row async for row in serialize.queryset(queries.ordered_items())]))
+
+
+@require_safe
+async def notification_list(request):
+    return JsonResponse([n async for n in queries.notifications()], safe=False)
+
+
+@require_safe
+@read_from_replica
+async def analytics(request):
+    daily_sales, top_products = queries.analytics(date.today())
+    return _response({
+        "daily_sales": [row async for row in daily_sales],
+        "top_products": [row async for row in top_products],
+    })
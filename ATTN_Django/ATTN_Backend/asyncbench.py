@@ -0,0 +1,156 @@
+import asyncio
+import io
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db.backends.signals import connection_created
+
+
+MODES = ("wsgi", "asgi")
+HOST = "localhost"
+
+
+def inject_latency(latency_ms):
+    """
+    Make every query on every new connection take ``latency_ms`` longer,
+    the way a round trip to a remote database would (the thread waits).
+    """
+    delay = latency_ms / 1000
+
+    def slow(execute, sql, params, many, context):
+        time.sleep(delay)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if slow not in connection.execute_wrappers:
+            connection.execute_wrappers.append(slow)
+
+    if delay:
+        connection_created.connect(install, weak=False, dispatch_uid="attn-asyncbench-latency")
+
+
+def _summary(mode, path, timings, statuses, elapsed, concurrency):
+    timings.sort()
+    return {
+        "mode": mode,
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(timings),
+        "errors": sum(1 for s in statuses if s >= 400),
+        "throughput_rps": round(len(timings) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+    }
+
+
+def run_wsgi(path, requests=200, concurrency=50, workers=4):
+    """
+    ``concurrency`` clients share a WSGI server with ``workers`` threads
+    (like gunicorn --threads): requests beyond that queue for a thread.
+    """
+    handler = WSGIHandler()
+    url = urlsplit(path)
+    timings, statuses = [], []
+    lock = threading.Lock()
+
+    def serve():
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "SERVER_NAME": HOST,
+            "SERVER_PORT": "80",
+            "HTTP_HOST": HOST,
+            "wsgi.input": io.BytesIO(),
+            "wsgi.url_scheme": "http",
+        }
+        status = []
+        body = handler(environ, lambda s, headers, exc_info=None: status.append(int(s[:3])))
+        try:
+            b"".join(body)
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+        return status[0]
+
+    with ThreadPoolExecutor(max_workers=workers) as server:
+        def client(count):
+            for _ in range(count):
+                start = time.perf_counter()
+                code = server.submit(serve).result()
+                with lock:
+                    timings.append((time.perf_counter() - start) * 1000)
+                    statuses.append(code)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            list(clients.map(client, _split(requests, concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return _summary("wsgi", path, timings, statuses, elapsed, concurrency)
+
+
+def run_asgi(path, requests=200, concurrency=50):
+    """``concurrency`` clients on one ASGI event loop (one uvicorn worker)."""
+    handler = ASGIHandler()
+    url = urlsplit(path)
+    timings, statuses = [], []
+
+    async def serve():
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "headers": [(b"host", HOST.encode())],
+            "client": ("127.0.0.1", 0),
+            "server": (HOST, 80),
+        }
+        done = asyncio.Event()
+        status = []
+        sent = []
+
+        async def receive():
+            if not sent:
+                sent.append(True)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+            elif not message.get("more_body"):
+                done.set()
+
+        await handler(scope, receive, send)
+        return status[0]
+
+    async def client(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            code = await serve()
+            timings.append((time.perf_counter() - start) * 1000)
+            statuses.append(code)
+
+    async def main():
+        await asyncio.gather(*[client(n) for n in _split(requests, concurrency)])
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    return _summary("asgi", path, timings, statuses, elapsed, concurrency)
+
+
+def _split(total, parts):
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
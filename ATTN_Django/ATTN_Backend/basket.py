@@ -0,0 +1,164 @@
+from collections import defaultdict
+from itertools import combinations
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import OrderedItem, BasketPair
+from .rollups import increment
+
+
+# Key of the BasketPair row that stores the total number of baskets
+TOTAL = ("", "")
+
+CHUNK_SIZE = 500
+
+
+def normalize(name):
+    return (name or "").lower().strip()
+
+
+def record_order(items):
+    """Count a new basket: its items, every pair of them and the total."""
+    record_orders([items])
+
+
+def record_orders(baskets):
+    """Count many baskets (lists of items) with a single upsert."""
+    deltas = defaultdict(lambda: {"count": 0})
+    for items in baskets:
+        names = sorted({normalize(item.product_name) for item in items} - {""})
+        if not names:
+            continue
+        deltas[TOTAL]["count"] += 1
+        for name in names:
+            deltas[(name, name)]["count"] += 1
+        for pair in combinations(names, 2):
+            deltas[pair]["count"] += 1
+    increment(BasketPair, ["item_a", "item_b"], dict(deltas))
+
+
+def count_pairs(order_ids, names):
+    """
+    Co-occurrence counts for (order_id, product_name) rows.
+
+    Returns (total baskets, {name: baskets}, {(a, b): baskets}) with a < b.
+    Pairs are generated with vectorised shifts over the rows sorted by
+    basket, so the Python-level loop runs once per basket *size*, not
+    once per basket.
+    """
+    import numpy as np
+
+    order_ids = np.asarray(order_ids, dtype=np.int64)
+    vocab, item_idx = np.unique(np.asarray(names, dtype=object), return_inverse=True)
+    item_idx = item_idx.astype(np.int64)
+    n_items = len(vocab)
+
+    if len(order_ids) == 0:
+        return 0, {}, {}
+
+    # one row per (basket, item), sorted by basket then item
+    codes = np.unique(order_ids * n_items + item_idx)
+    baskets, items = np.divmod(codes, n_items)
+
+    singles = np.bincount(items, minlength=n_items)
+    total = len(np.unique(baskets))
+
+    pair_codes = []
+    for shift in range(1, len(items)):
+        same = baskets[:-shift] == baskets[shift:]
+        if not same.any():
+            break
+        a = items[:-shift][same]
+        b = items[shift:][same]
+        pair_codes.append(a * n_items + b)
+
+    pairs = {}
+    if pair_codes:
+        unique, counts = np.unique(np.concatenate(pair_codes), return_counts=True)
+        a, b = np.divmod(unique, n_items)
+        pairs = {
+            (vocab[i], vocab[j]): int(c)
+            for i, j, c in zip(a.tolist(), b.tolist(), counts.tolist())
+        }
+
+    return total, {vocab[i]: int(c) for i, c in enumerate(singles.tolist()) if c}, pairs
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute all basket counts from the ordered item history."""
+    order_ids, names = [], []
+    rows = OrderedItem.objects.values_list("order_id", "product_name").iterator(chunk_size=5000)
+    for order_id, name in rows:
+        name = normalize(name)
+        if name:
+            order_ids.append(order_id)
+            names.append(name)
+
+    total, singles, pairs = count_pairs(order_ids, names)
+
+    BasketPair.objects.all().delete()
+    rows = [BasketPair(item_a=TOTAL[0], item_b=TOTAL[1], count=total)]
+    rows += [BasketPair(item_a=name, item_b=name, count=c) for name, c in singles.items()]
+    rows += [BasketPair(item_a=a, item_b=b, count=c) for (a, b), c in pairs.items()]
+    BasketPair.objects.bulk_create(rows, batch_size=2000)
+    return total, len(pairs)
+
+
+def associations(min_count=2, min_support=0.0, min_lift=1.0, limit=10):
+    """
+    Most frequent product pairs with support/confidence/lift, in the shape
+    pages/analytics.jsx renders. ``min_support`` is a percentage.
+    """
+    total = BasketPair.objects.filter(item_a=TOTAL[0], item_b=TOTAL[1]).values_list("count", flat=True).first()
+    if not total:
+        return []
+
+    min_count = max(min_count, int(-(-min_support * total // 100)))
+    candidates = (
+        BasketPair.objects.filter(count__gte=max(min_count, 1))
+        .exclude(item_a=TOTAL[0])
+        .order_by("-count", "item_a", "item_b")
+        .values_list("item_a", "item_b", "count")
+    )
+
+    results = []
+    singles = {}
+    offset = 0
+    while len(results) < limit:
+        rows = list(candidates[offset:offset + CHUNK_SIZE])
+        if not rows:
+            break
+        offset += CHUNK_SIZE
+        chunk = [row for row in rows if row[0] != row[1]]
+
+        missing = {name for a, b, _ in chunk for name in (a, b)} - singles.keys()
+        if missing:
+            singles.update(
+                BasketPair.objects.filter(item_a__in=missing, item_b=F("item_a"))
+                .values_list("item_a", "count")
+            )
+
+        for a, b, count in chunk:
+            count_a, count_b = singles.get(a, 0), singles.get(b, 0)
+            if not count_a or not count_b:
+                continue
+            lift = (count / total) / ((count_a / total) * (count_b / total))
+            if lift <= min_lift:
+                continue
+            union = count_a + count_b - count
+            results.append({
+                "product1": a.capitalize(),
+                "product2": b.capitalize(),
+                "frequency": count,
+                "support": count / total * 100,
+                "confidence": count / union * 100 if union else 0,
+                "confidence_1_to_2": count / count_a * 100,
+                "confidence_2_to_1": count / count_b * 100,
+                "lift": lift,
+            })
+            if len(results) >= limit:
+                break
+
+    return results
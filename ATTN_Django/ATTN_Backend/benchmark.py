@@ -0,0 +1,465 @@
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import close_old_connections, connection, connections, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import basket, ledger, rollups
+from .models import Category, Product, OrderProducts, OrderedItem, DebtPayments
+
+
+SEED_CHUNK = 5000
+SEED_STOCK = 10 ** 7  # create_order runs many times; never let it run dry
+# Requests go through the full stack, host validation included: use a
+# name that ALLOWED_HOSTS accepts in development (DEBUG allows localhost)
+HOST = "localhost"
+
+
+def client():
+    return Client(HTTP_HOST=HOST)
+
+
+# ---------------------------------------------------------------------------
+# Data generator
+# ---------------------------------------------------------------------------
+
+LOCAL_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+
+
+def local_database(alias="default"):
+    """
+    (is local, description) for the ``alias`` database. Seeding and the
+    write scenarios leave generated rows behind, so the commands only run
+    against SQLite or a server on this machine unless told otherwise.
+    """
+    settings_dict = connections[alias].settings_dict
+    if connections[alias].vendor == "sqlite":
+        return True, str(settings_dict["NAME"])
+    host = settings_dict.get("HOST") or ""
+    # a leading slash is a Unix socket directory
+    return host in LOCAL_HOSTS or host.startswith("/"), f"{settings_dict['NAME']} on {host or 'localhost'}"
+
+
+def seed(products=5000, orders=100_000, items_per_order=5, categories=25, days=365,
+         pending_ratio=0.2, payments_per_debt=1, rng_seed=0, log=lambda msg: None):
+    """
+    Fill the database with a reproducible, realistic shop history:
+    ``orders`` orders spread over the last ``days`` days with on average
+    ``items_per_order`` lines each, a share of them left pending with debt
+    payments recorded against them. Rollups and basket pairs are rebuilt
+    at the end so the analytics views see the same data.
+    """
+    rng = random.Random(rng_seed)
+    today = date.today()
+
+    with transaction.atomic():
+        cats = Category.objects.bulk_create(
+            [Category(name=f"category {i:03d}") for i in range(categories)]
+        )
+        catalog = []
+        for start in range(0, products, SEED_CHUNK):
+            batch = []
+            for i in range(start, min(start + SEED_CHUNK, products)):
+                cost = Decimal(rng.randint(500, 50000)) / 100
+                batch.append(Product(
+                    name=f"product {i:05d}",
+                    category=rng.choice(cats),
+                    stock=SEED_STOCK,
+                    cost_price=cost,
+                    selling_price=(cost * Decimal("1.3")).quantize(Decimal("0.01")),
+                ))
+            catalog.extend(Product.objects.bulk_create(batch))
+            ledger.opening(batch)
+        log(f"{len(catalog)} products")
+
+    # A few best sellers, a long tail: weights roughly follow Zipf
+    weights = [1 / (rank + 1) for rank in range(len(catalog))]
+    customers = [f"customer {i:04d}" for i in range(max(1, orders // 50))]
+    items_total = 0
+
+    for start in range(0, orders, SEED_CHUNK):
+        with transaction.atomic():
+            batch, lines_per_order = [], []
+            for _ in range(start, min(start + SEED_CHUNK, orders)):
+                picked = {p.id: p for p in rng.choices(catalog, weights, k=rng.randint(1, items_per_order * 2 - 1))}
+                lines = []
+                for product in picked.values():
+                    qty = rng.randint(1, 5)
+                    lines.append(OrderedItem(
+                        product=product,
+                        product_name=product.name,
+                        qty=qty,
+                        subtotal=float(product.selling_price * qty),
+                        cost_price=product.cost_price,
+                        selling_price=product.selling_price,
+                    ))
+                pending = rng.random() < pending_ratio
+                batch.append(OrderProducts(
+                    status="Pending" if pending else "Paid",
+                    cus_name=rng.choice(customers),
+                    contact_num=f"09{rng.randint(0, 10 ** 9 - 1):09d}",
+                    total_amt=sum(line.subtotal for line in lines),
+                    due_date=today + timedelta(days=rng.randint(1, 30)) if pending else None,
+                    order_date=today - timedelta(days=rng.randint(0, days - 1)),
+                ))
+                lines_per_order.append(lines)
+
+            created = OrderProducts.objects.bulk_create(batch)
+            for order, lines in zip(created, lines_per_order):
+                for line in lines:
+                    line.order = order
+            items = [line for lines in lines_per_order for line in lines]
+            OrderedItem.objects.bulk_create(items, batch_size=SEED_CHUNK)
+            items_total += len(items)
+
+            DebtPayments.objects.bulk_create([
+                DebtPayments(
+                    cus_name=order.cus_name,
+                    order=order,
+                    amount_paid=Decimal(str(round(order.total_amt * rng.uniform(0.1, 0.4), 2))),
+                    date=order.order_date,
+                )
+                for order in created if order.status == "Pending"
+                for _ in range(payments_per_debt)
+            ])
+        log(f"{start + len(batch)} orders, {items_total} items")
+
+    rollups.rebuild()
+    basket.rebuild()
+    log("rollups and basket pairs rebuilt")
+    return {"categories": len(cats), "products": len(catalog), "orders": orders, "items": items_total}
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+class Scenario:
+    def __init__(self, name, method, path, body=None, max_queries=None):
+        self.name = name
+        self.method = method
+        self.path = path            # str, or callable(rng) -> str
+        self.body = body            # None, or callable(rng) -> dict
+        self.max_queries = max_queries
+
+    def request(self, client, rng):
+        path = self.path(rng) if callable(self.path) else self.path
+        if self.method == "GET":
+            return client.get(path)
+        body = self.body(rng) if self.body else {}
+        return client.generic(self.method, path, json.dumps(body), content_type="application/json")
+
+
+class _Sample:
+    # ids looked up once, so scenarios do not pay for it per request
+    order_ids = []
+    products = []
+
+    @classmethod
+    def load(cls):
+        last = OrderProducts.objects.order_by("-order_id").values_list("order_id", flat=True)[:1000]
+        cls.order_ids = list(last)
+        cls.products = list(
+            Product.objects.filter(is_active=True).values("id", "name", "cost_price", "selling_price")[:200]
+        )
+
+
+def _order_items_path(rng):
+    return f"/api/orders/{rng.choice(_Sample.order_ids)}/items/"
+
+
+def _new_order(rng):
+    picked = rng.sample(_Sample.products, k=min(3, len(_Sample.products)))
+    items = [
+        {
+            "product_id": p["id"],
+            "product_name": p["name"],
+            "qty": 1,
+            "cost_price": str(p["cost_price"]),
+            "selling_price": str(p["selling_price"]),
+            "subtotal": float(p["selling_price"]),
+        }
+        for p in picked
+    ]
+    return {
+        "status": "Paid",
+        "cus_name": "benchmark",
+        "total_amt": sum(i["subtotal"] for i in items),
+        "items": items,
+    }
+
+
+# Query budgets double as the CI assertion: a scenario that issues more
+# queries than ``max_queries`` fails ``run_benchmarks --check``.
+SCENARIOS = [
+    Scenario("product_list", "GET", "/api/products/", max_queries=2),
+    Scenario("product_search", "GET", "/api/products/search/?q=prodct", max_queries=2),
+    Scenario("order_list", "GET", "/api/orders/?limit=50", max_queries=1),
+    Scenario("orderitem_list", "GET", "/api/ordereditem/", max_queries=1),
+    Scenario("order_items", "GET", _order_items_path, max_queries=2),
+    Scenario("analytics", "GET", "/api/analytics/", max_queries=4),
+    Scenario("create_order", "POST", "/api/create-order/", body=_new_order, max_queries=16),
+    Scenario("debtpayments", "GET", "/api/debtpayments/", max_queries=1),
+]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def _run_one(scenario, iterations, rng):
+    http = client()
+    timings, queries, errors = [], [], 0
+    try:
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = scenario.request(http, rng)
+                if getattr(response, "streaming", False):
+                    b"".join(response.streaming_content)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+            if response.status_code >= 400:
+                errors += 1
+    finally:
+        close_old_connections()
+    return timings, queries, errors
+
+
+def run(scenarios=None, iterations=20, warmup=2, concurrency=1, rng_seed=0):
+    """
+    Time every scenario through the full Django stack (middleware, DRF,
+    rendering) and count its queries. With ``concurrency`` > 1 the
+    iterations are split over that many threads, each with its own
+    client and database connection, to measure throughput under load.
+    """
+    _Sample.load()
+    results = {}
+    # Measure requests as production serves them: background work is
+    # queued for a worker, not run eagerly as DEBUG would by default
+    with override_settings(ATTN_JOBS_EAGER=False):
+        for scenario in scenarios or SCENARIOS:
+            results[scenario.name] = _run_scenario(scenario, iterations, warmup, concurrency, rng_seed)
+    return results
+
+
+def _run_scenario(scenario, iterations, warmup, concurrency, rng_seed):
+    rng = random.Random(rng_seed)
+    _run_one(scenario, warmup, rng)
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        per_thread = max(1, iterations // concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            parts = list(pool.map(
+                lambda i: _run_one(scenario, per_thread, random.Random(rng_seed + i)),
+                range(concurrency),
+            ))
+    else:
+        parts = [_run_one(scenario, iterations, rng)]
+    elapsed = time.perf_counter() - start
+
+    timings = sorted(t for part in parts for t in part[0])
+    queries = [q for part in parts for q in part[1]]
+    return {
+        "requests": len(timings),
+        "concurrency": concurrency,
+        "errors": sum(part[2] for part in parts),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(_percentile(timings, 0.50), 2),
+        "p95_ms": round(_percentile(timings, 0.95), 2),
+        "max_ms": round(timings[-1], 2),
+        "throughput_rps": round(len(timings) / elapsed, 1),
+        "queries": max(queries),
+        "max_queries": scenario.max_queries,
+    }
+
+
+def over_budget(results):
+    """
+    {scenario: problems} for scenarios that had failing requests (status
+    400 or above) or issued more queries than their budget. A failing
+    request proves nothing about speed or query counts, so it always counts.
+    """
+    failures = {}
+    for name, r in results.items():
+        problems = []
+        if r["errors"]:
+            problems.append(f"{r['errors']} of {r['requests']} requests failed")
+        if r["max_queries"] is not None and r["queries"] > r["max_queries"]:
+            problems.append(f"{r['queries']} queries (budget {r['max_queries']})")
+        if problems:
+            failures[name] = problems
+    return failures
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Regressions against an earlier results file: more queries, or a p50
+    more than ``tolerance`` (fractional) slower.
+    """
+    regressions = {}
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        problems = []
+        if current["queries"] > before["queries"]:
+            problems.append(f"queries {before['queries']} -> {current['queries']}")
+        if current["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            problems.append(f"p50 {before['p50_ms']} ms -> {current['p50_ms']} ms")
+        if problems:
+            regressions[name] = problems
+    return regressions
+
+
+# ---------------------------------------------------------------------------
+# Serializer fast path
+# ---------------------------------------------------------------------------
+
+def compare_serializers(rows=10_000, repeat=3):
+    """
+    Time the DRF serializers + stock JSONRenderer against the RowMapper
+    fast path + ORJSONRenderer on the first ``rows`` rows of each list
+    endpoint's queryset, query included, and check the bytes match.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from .fastpath import mapper
+    from .renderers import ORJSONRenderer
+    from .serializers import ProductSerializer, OrderProductsSerializer, OrderedItemSerializer
+
+    cases = [
+        ("product", ProductSerializer, Product.objects.select_related("category").order_by("id")),
+        ("order", OrderProductsSerializer, OrderProducts.objects.order_by("order_id")),
+        ("ordered_item", OrderedItemSerializer, OrderedItem.objects.select_related("order").order_by("id")),
+    ]
+
+    def best_of(render):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = render()
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings), body
+
+    results = {}
+    for name, serializer_class, queryset in cases:
+        queryset = queryset[:rows]
+        drf_ms, drf_body = best_of(lambda: JSONRenderer().render(serializer_class(queryset.all(), many=True).data))
+        fast_ms, fast_body = best_of(lambda: ORJSONRenderer().render(mapper(serializer_class)(queryset.all())))
+        results[name] = {
+            "rows": queryset.count(),
+            "drf_ms": round(drf_ms, 1),
+            "fast_ms": round(fast_ms, 1),
+            "speedup": round(drf_ms / fast_ms, 1) if fast_ms else None,
+            "identical": drf_body == fast_body,
+        }
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Login storm
+# ---------------------------------------------------------------------------
+
+STORM_PASSWORD = "storm-password"
+
+
+def _storm(logins, concurrency, body):
+    def worker(i):
+        http = client()
+        statuses = []
+        try:
+            for n in range(i, logins, concurrency):
+                response = http.post("/api/login/", json.dumps(body(n)), content_type="application/json")
+                statuses.append(response.status_code)
+        finally:
+            close_old_connections()
+        return statuses
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    return [pool.submit(worker, i) for i in range(concurrency)], pool
+
+
+def login_storm(logins=64, concurrency=16, workers=2, probe="/api/orders/?limit=50"):
+    """
+    Fire ``logins`` logins from ``concurrency`` threads and, meanwhile,
+    time a cheap GET (``probe``) over and over, to see how responsive the
+    rest of the site stays. Runs three ways: hashing on the request
+    threads, on the bounded pool of ``workers``, and on the pool with the
+    login throttle on while the storm guesses passwords for two accounts.
+    Every mode lists the responses it did not expect under "problems":
+    the honest logins must all succeed, the guesses must all be refused,
+    some of them by the throttle, and the probe must keep answering 200.
+    """
+    from collections import Counter
+
+    from django.contrib.auth.hashers import make_password
+
+    from . import passwords
+    from .models import Account
+
+    encoded = make_password(STORM_PASSWORD)
+    accounts = Account.objects.bulk_create([
+        Account(USERNAME=f"storm-{i:04d}", FIRST_NAME="storm", LAST_NAME="user", PASSWORD=encoded)
+        for i in range(logins)
+    ])
+    unthrottled = {"ATTN_LOGIN_USER_ATTEMPTS": 10 ** 9, "ATTN_LOGIN_IP_ATTEMPTS": 10 ** 9}
+    honest = lambda n: {"USERNAME": f"storm-{n:04d}", "PASSWORD": STORM_PASSWORD}
+    guesses = lambda n: {"USERNAME": f"storm-{n % 2:04d}", "PASSWORD": f"guess-{n}"}
+    # mode, settings, request body, allowed statuses, statuses that must appear
+    modes = [
+        ("inline", {"ATTN_PASSWORD_HASH_WORKERS": 0, **unthrottled}, honest, {200}, {200}),
+        ("pool", {"ATTN_PASSWORD_HASH_WORKERS": workers, **unthrottled}, honest, {200}, {200}),
+        ("pool+throttle", {"ATTN_PASSWORD_HASH_WORKERS": workers}, guesses, {400, 429}, {429}),
+    ]
+
+    results = {}
+    probe_client = client()
+    try:
+        for name, overrides, body, allowed, required in modes:
+            keys = [passwords._key("ip", "127.0.0.1")] + [passwords._key("user", a.USERNAME) for a in accounts]
+            passwords.cache.delete_many(keys + [f"{key}:start" for key in keys])
+
+            with override_settings(**overrides):
+                timings, probe_statuses = [], Counter()
+                start = time.perf_counter()
+                futures, pool = _storm(logins, concurrency, body)
+                while not all(f.done() for f in futures):
+                    probe_start = time.perf_counter()
+                    probe_statuses[probe_client.get(probe).status_code] += 1
+                    timings.append((time.perf_counter() - probe_start) * 1000)
+                elapsed = time.perf_counter() - start
+                pool.shutdown()
+
+            statuses = Counter(s for f in futures for s in f.result())
+            problems = [f"{count} login(s) answered {code}" for code, count in sorted(statuses.items())
+                        if code not in allowed]
+            problems += [f"no login answered {code}" for code in sorted(required - statuses.keys())]
+            problems += [f"{count} probe(s) answered {code}" for code, count in sorted(probe_statuses.items())
+                         if code != 200]
+            timings.sort()
+            results[name] = {
+                "logins": logins,
+                "seconds": round(elapsed, 2),
+                "logins_per_s": round(logins / elapsed, 1),
+                "statuses": dict(sorted(statuses.items())),
+                "probes": len(timings),
+                "probe_p50_ms": round(_percentile(timings, 0.50), 1) if timings else None,
+                "probe_p95_ms": round(_percentile(timings, 0.95), 1) if timings else None,
+                "probe_max_ms": round(timings[-1], 1) if timings else None,
+                "problems": problems,
+            }
+    finally:
+        Account.objects.filter(pk__in=[a.pk for a in accounts]).delete()
+    return results
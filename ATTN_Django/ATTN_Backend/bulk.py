@@ -0,0 +1,404 @@
+import csv
+import json
+from itertools import groupby, islice
+
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import basket, catalog, ledger, rollups, search
+from .models import Category, Product, OrderProducts, OrderedItem, Ewallet, StockMovement
+from .serializers import ProductSerializer, OrderProductsSerializer, OrderedItemSerializer, EwalletSerializer
+
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ("csv", "jsonl")
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Import serializers: the regular ones, minus per-row FK queries
+# ---------------------------------------------------------------------------
+
+class ProductImportSerializer(ProductSerializer):
+    id = serializers.IntegerField(required=False)
+    category_id = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = None
+        exclude = ["image", "image_variants", "created_at", "updated_at"]
+
+    def validate_category_id(self, value):
+        if value is not None and value not in self.context["category_ids"]:
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return value
+
+
+class OrderedItemImportSerializer(OrderedItemSerializer):
+    product_id = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta(OrderedItemSerializer.Meta):
+        fields = None
+        exclude = ["order", "product", "updated_at"]
+
+
+class OrderImportSerializer(OrderProductsSerializer):
+    items = OrderedItemImportSerializer(many=True, required=False)
+
+    class Meta(OrderProductsSerializer.Meta):
+        fields = None
+        exclude = ["order_id", "updated_at"]
+
+
+# ---------------------------------------------------------------------------
+# Readers / writers
+# ---------------------------------------------------------------------------
+
+def _decoded_lines(stream):
+    # Decoded line by line (not by TextIOWrapper's 8 KB blocks) so an
+    # encoding error can be pinned to the line it is on
+    for line_no, line in enumerate(stream, start=1):
+        try:
+            yield line.decode("utf-8-sig" if line_no == 1 else "utf-8")
+        except UnicodeDecodeError:
+            raise ImportFormatError(f"Line {line_no} is not valid UTF-8")
+
+
+def read_records(stream, file_format, required_columns=()):
+    """
+    Yield (line number, dict) from a binary CSV or JSONL stream.
+
+    A row that fails to parse is yielded as the exception instead of a
+    dict. Problems with the file itself (not UTF-8, broken CSV quoting, a
+    CSV header without ``required_columns``) raise ImportFormatError.
+    """
+    lines = _decoded_lines(stream)
+    if file_format == "csv":
+        reader = csv.DictReader(lines)
+        try:
+            missing = [c for c in required_columns if c not in (reader.fieldnames or [])]
+            if missing:
+                raise ImportFormatError(f"The CSV header has no {', '.join(missing)} column")
+            for row in reader:
+                # empty cells mean "not given" so serializer defaults apply
+                yield reader.line_num, {k: v for k, v in row.items() if k is not None and v != ""}
+        except csv.Error as exc:
+            raise ImportFormatError(f"Line {reader.line_num + 1}: {exc}")
+    elif file_format == "jsonl":
+        for line_no, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_no, exc
+                continue
+            yield line_no, record
+    else:
+        raise ImportFormatError(f"Unsupported format '{file_format}'")
+
+
+ORDER_FIELDS = ("status", "cus_name", "contact_num", "total_amt", "due_date", "order_date")
+ITEM_FIELDS = ("product_id", "product_name", "qty", "subtotal", "cost_price", "selling_price")
+
+
+def group_order_rows(records):
+    """
+    CSV orders come one line per item; consecutive lines sharing an
+    ``order_ref`` are folded into one order record with ``items``.
+    """
+    def key(pair):
+        line_no, row = pair
+        if isinstance(row, dict) and row.get("order_ref"):
+            return row["order_ref"]
+        return ("error", line_no)
+
+    for ref, lines in groupby(records, key=key):
+        lines = list(lines)
+        first_line, first = lines[0]
+        if not isinstance(first, dict):
+            yield first_line, first
+            continue
+        if not first.get("order_ref"):
+            # Without it the line cannot be told apart from its neighbours' orders
+            yield first_line, ValueError("order_ref is required")
+            continue
+        order = {f: first[f] for f in ORDER_FIELDS if f in first}
+        order["items"] = [
+            {f: row[f] for f in ITEM_FIELDS if f in row}
+            for _, row in lines
+            if row.get("product_name")
+        ]
+        yield first_line, order
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+class ImportReport:
+    def __init__(self, dataset, dry_run):
+        self.dataset = dataset
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, line_no, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line_no, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "dataset": self.dataset,
+            "dry_run": self.dry_run,
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def _validate(chunk, serializer_class, report, context=None):
+    valid = []
+    for line_no, record in chunk:
+        report.rows += 1
+        if not isinstance(record, dict):
+            report.error(line_no, {"non_field_errors": [str(record) or "Malformed row"]})
+            continue
+        serializer = serializer_class(data=record, context=context or {})
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            report.error(line_no, serializer.errors)
+    return valid
+
+
+def _import_products(chunk, report):
+    context = {"category_ids": set(Category.objects.values_list("id", flat=True))}
+    rows = _validate(chunk, ProductImportSerializer, report, context)
+    if report.dry_run or not rows:
+        return
+
+    with transaction.atomic():
+        # Rows with a known id update that product. They are validated like
+        # new products, so name and cost_price are required; optional
+        # columns that are left out keep their current value.
+        # The rows stay locked until commit, so a checkout cannot change
+        # their stock between reading it here and writing it back.
+        existing = Product.objects.select_for_update().in_bulk([r["id"] for r in rows if "id" in r])
+        now = timezone.now()
+        to_create, to_update, update_fields, adjustments = [], [], set(), []
+        for data in rows:
+            data = dict(data)
+            data["name"] = data["name"].lower()  # what Product.save() would do
+            product = existing.get(data.get("id"))
+            if product is None:
+                to_create.append(Product(**data))
+                continue
+            if "stock" in data:
+                adjustments.append(StockMovement(
+                    product_id=product.id, kind=StockMovement.ADJUSTMENT, qty=data["stock"] - product.stock,
+                    note="bulk import",
+                ))
+            for field, value in data.items():
+                setattr(product, field, value)
+            product.updated_at = now
+            update_fields.update(k for k in data if k != "id")
+            to_update.append(product)
+
+        explicit_ids = any(product.id is not None for product in to_create)
+        Product.objects.bulk_create(to_create)
+        if explicit_ids:
+            # Rows restored with their old id skip the sequence; move it past them
+            _reset_sequence(Product)
+        if to_update:
+            Product.objects.bulk_update(to_update, sorted(update_fields | {"updated_at"}))
+        ledger.record(adjustments)
+        ledger.opening(to_create, note="bulk import")
+        catalog.invalidate()
+        search.invalidate()
+    report.created += len(to_create)
+    report.updated += len(to_update)
+
+
+def _reset_sequence(model):
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def _import_orders(chunk, report):
+    rows = _validate(chunk, OrderImportSerializer, report)
+    if report.dry_run or not rows:
+        return
+
+    # Resolve products once per chunk: by id when given, else by name
+    items = [item for data in rows for item in data.get("items", [])]
+    product_ids = {i["product_id"] for i in items if i.get("product_id")}
+    by_id = Product.objects.in_bulk(list(product_ids))
+    names = {i["product_name"].lower() for i in items if not i.get("product_id")}
+    by_name = {}
+    for product in Product.objects.filter(name__in=names).order_by("id"):
+        by_name.setdefault(product.name, product)
+
+    with transaction.atomic():
+        orders = OrderProducts.objects.bulk_create([
+            OrderProducts(**{k: v for k, v in data.items() if k != "items"})
+            for data in rows
+        ])
+        ordered = []
+        for order, data in zip(orders, rows):
+            lines = []
+            for item in data.get("items", []):
+                item = dict(item)
+                product_id = item.pop("product_id", None)
+                product = by_id.get(product_id) if product_id else by_name.get(item["product_name"].lower())
+                lines.append(OrderedItem(order=order, product=product, **item))
+            ordered.append((order, lines))
+        OrderedItem.objects.bulk_create([line for _, lines in ordered for line in lines])
+
+        # Historical sales: stock is left alone, but the rollups must include them
+        rollups.record_orders(ordered)
+        basket.record_orders([lines for _, lines in ordered])
+
+    report.created += len(orders)
+
+
+def _import_ewallets(chunk, report):
+    rows = _validate(chunk, EwalletSerializer, report)
+    if report.dry_run or not rows:
+        return
+    with transaction.atomic():
+        Ewallet.objects.bulk_create([Ewallet(**data) for data in rows])
+    report.created += len(rows)
+
+
+IMPORTERS = {
+    "products": _import_products,
+    "orders": _import_orders,
+    "ewallets": _import_ewallets,
+}
+
+
+def import_stream(dataset, stream, file_format, dry_run=False, chunk_size=CHUNK_SIZE):
+    """
+    Validate and write ``stream`` in chunks of ``chunk_size`` rows, one
+    transaction per chunk. Invalid rows are skipped and reported; valid
+    rows in the same chunk are still written. A file that cannot be read
+    raises ImportFormatError at the offending line, after the chunks
+    before it have been written.
+    """
+    if dataset not in IMPORTERS:
+        raise ImportFormatError(f"Unknown dataset '{dataset}'")
+
+    if dataset == "orders" and file_format == "csv":
+        records = group_order_rows(read_records(stream, file_format, required_columns=["order_ref"]))
+    else:
+        records = read_records(stream, file_format)
+
+    report = ImportReport(dataset, dry_run)
+    for chunk in _chunks(records, chunk_size):
+        IMPORTERS[dataset](chunk, report)
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+EXPORT_CHUNK = 2000
+
+PRODUCT_COLUMNS = ["id", "name", "category_id", "stock", "cost_price", "selling_price",
+                   "stock_status", "is_active", "created_at"]
+EWALLET_COLUMNS = [f.attname for f in Ewallet._meta.concrete_fields]
+ORDER_ROW_COLUMNS = ["order_ref", *ORDER_FIELDS, *ITEM_FIELDS]
+
+
+def _product_rows():
+    return Product.objects.order_by("id").values_list(*PRODUCT_COLUMNS).iterator(chunk_size=EXPORT_CHUNK)
+
+
+def _ewallet_rows():
+    return Ewallet.objects.order_by("EWALL_ID").values_list(*EWALLET_COLUMNS).iterator(chunk_size=EXPORT_CHUNK)
+
+
+def _order_item_rows():
+    # One row per item (orders without items still get one row)
+    return (
+        OrderProducts.objects.order_by("order_id", "items__id")
+        .values_list("order_id", *ORDER_FIELDS, *[f"items__{f}" for f in ITEM_FIELDS])
+        .iterator(chunk_size=EXPORT_CHUNK)
+    )
+
+
+EXPORTS = {
+    "products": (PRODUCT_COLUMNS, _product_rows),
+    "ewallets": (EWALLET_COLUMNS, _ewallet_rows),
+    "orders": (ORDER_ROW_COLUMNS, _order_item_rows),
+}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_lines(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(["" if v is None else v for v in row])
+
+
+def _jsonl_lines(dataset, columns, rows):
+    if dataset != "orders":
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + "\n"
+        return
+
+    # Fold item rows back into one JSON object per order
+    for order_id, lines in groupby(rows, key=lambda r: r[0]):
+        lines = list(lines)
+        first = dict(zip(columns, lines[0]))
+        order = {"order_ref": order_id, **{f: first[f] for f in ORDER_FIELDS}}
+        order["items"] = [
+            {f: v for f, v in zip(ITEM_FIELDS, line[1 + len(ORDER_FIELDS):])}
+            for line in lines
+            if line[1 + len(ORDER_FIELDS) + ITEM_FIELDS.index("product_name")] is not None
+        ]
+        yield json.dumps(order, cls=DjangoJSONEncoder) + "\n"
+
+
+def export_lines(dataset, file_format):
+    """Lazily yield the lines of an export; memory use does not grow with the table."""
+    if dataset not in EXPORTS:
+        raise ImportFormatError(f"Unknown dataset '{dataset}'")
+    if file_format not in FORMATS:
+        raise ImportFormatError(f"Unsupported format '{file_format}'")
+
+    columns, rows = EXPORTS[dataset]
+    if file_format == "csv":
+        return _csv_lines(columns, rows())
+    return _jsonl_lines(dataset, columns, rows())
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from . import versions
+from .models import Product
+from .fastpath import mapper
+from .serializers import ProductSerializer
+
+
+VERSION_NAME = "catalog"
+PAYLOAD_KEY = "catalog:payload:{}"
+PAYLOAD_TIMEOUT = 60 * 60
+
+
+def current_version():
+    """
+    (etag, last_modified) of the active product catalog. The version is
+    shared by all workers through the database (see ATTN_Backend.versions),
+    so a change made in one of them reaches the others' ETags too.
+    """
+    return _as_etag(*versions.current(VERSION_NAME))
+
+
+async def acurrent_version():
+    """current_version() for async views."""
+    return _as_etag(*await versions.acurrent(VERSION_NAME))
+
+
+def headers(version):
+    etag, last_modified = version
+    return {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": "no-cache",
+    }
+
+
+def not_modified(request, version):
+    """Whether the client's conditional headers already match ``version``."""
+    etag, last_modified = version
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        return etag in parse_etags(if_none_match) or if_none_match.strip() == "*"
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return bool(if_modified_since) and int(last_modified) <= if_modified_since
+
+
+def invalidate():
+    """Bump the catalog version once the current transaction commits."""
+    versions.bump(VERSION_NAME)
+
+
+def _as_etag(version, bumped_at):
+    return f'"{version:x}.{int(bumped_at.timestamp() * 1e6):x}"', bumped_at.timestamp()
+
+
+def payload(version):
+    """Serialized active catalog for ``version``, built on a cache miss."""
+    key = PAYLOAD_KEY.format(version[0].strip('"'))
+    data = cache.get(key)
+    if data is None:
+        data = mapper(ProductSerializer)(_active_products())
+        cache.set(key, data, PAYLOAD_TIMEOUT)
+    return data
+
+
+async def apayload(version):
+    """payload() for async views."""
+    key = PAYLOAD_KEY.format(version[0].strip('"'))
+    data = await cache.aget(key)
+    if data is None:
+        serialize = mapper(ProductSerializer)
+        data = serialize.map([row async for row in serialize.queryset(_active_products())])
+        await cache.aset(key, data, PAYLOAD_TIMEOUT)
+    return data
+
+
+def _active_products():
+    return Product.objects.filter(is_active=True).select_related("category")
@@ -0,0 +1,57 @@
+import os
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+def web_workers():
+    """
+    Worker processes the server was asked for. uvicorn and gunicorn both
+    take their default --workers from WEB_CONCURRENCY, so set that rather
+    than passing --workers for these checks to see it.
+    """
+    try:
+        return int(os.environ.get("WEB_CONCURRENCY", 1))
+    except ValueError:
+        return 1
+
+
+@register()
+def check_events_backend(app_configs, **kwargs):
+    backend = getattr(settings, "ATTN_EVENTS_BACKEND", "ATTN_Backend.events.InMemoryBroker")
+    if web_workers() > 1 and backend == "ATTN_Backend.events.InMemoryBroker":
+        return [Error(
+            "The in-memory events broker only reaches clients of the worker that published.",
+            hint="Use ATTN_Backend.events.PostgresBroker, or run a single worker.",
+            id="ATTN_Backend.E001",
+        )]
+    return []
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if web_workers() > 1 and backend == "django.core.cache.backends.locmem.LocMemCache":
+        return [Error(
+            "The login throttle counts attempts in the default cache, which is per process "
+            "with LocMemCache: each worker would allow the full limit.",
+            hint="Point CACHES['default'] at a shared backend (Redis, Memcached, database), or run a single worker.",
+            id="ATTN_Backend.E002",
+        )]
+    return []
+
+
+@register()
+def check_async_connections(app_configs, **kwargs):
+    if not getattr(settings, "ATTN_ASYNC_VIEWS", False):
+        return []
+    persistent = [alias for alias, db in settings.DATABASES.items() if db.get("CONN_MAX_AGE")]
+    if persistent:
+        return [Error(
+            f"Persistent connections (CONN_MAX_AGE) are set on {', '.join(persistent)} while the async "
+            "views are on. Connections are per thread and under ASGI the threads running a request's "
+            "queries change, so connections pile up instead of being reused.",
+            hint="Set ATTN_DB_CONNECTIONS=pool (asgi.py does unless it is already set) or none.",
+            id="ATTN_Backend.E003",
+        )]
+    return []
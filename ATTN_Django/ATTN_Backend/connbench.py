@@ -0,0 +1,127 @@
+import copy
+import socket
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.db.utils import ConnectionHandler
+
+
+MODES = ("none", "persistent", "pool")
+
+
+class LatencyProxy:
+    """
+    TCP forwarder that delays every chunk by ``delay_ms`` / 2 in each
+    direction, so a local database behaves like one a round trip of
+    ``delay_ms`` away. Counts the connections opened through it.
+    """
+
+    def __init__(self, upstream_host, upstream_port, delay_ms):
+        self.upstream = (upstream_host, int(upstream_port))
+        self.delay = delay_ms / 2000
+        self.connections = 0
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        self._closed = False
+
+    def __enter__(self):
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._closed = True
+        self._server.close()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            upstream = socket.create_connection(self.upstream)
+            for src, dst in ((client, upstream), (upstream, client)):
+                threading.Thread(target=self._pump, args=(src, dst), daemon=True).start()
+
+    def _pump(self, src, dst):
+        try:
+            while True:
+                data = src.recv(65536)
+                if not data:
+                    break
+                time.sleep(self.delay)
+                dst.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (src, dst):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+def database_settings(mode, host, port, overrides=None):
+    """``DATABASES['default']`` rewritten for ``mode`` and pointed at host:port."""
+    db = copy.deepcopy(settings.DATABASES["default"])
+    db.update(copy.deepcopy(overrides or {}))
+    db.update(HOST=host, PORT=str(port), CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False)
+    options = db.setdefault("OPTIONS", {})
+    options.pop("pool", None)
+    if mode == "persistent":
+        db.update(CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True)
+    elif mode == "pool":
+        options["pool"] = {"min_size": 1, "max_size": 4}
+    return db
+
+
+def _request(connection, queries):
+    # What Django does around every request: close_old_connections() on
+    # request_started and request_finished, with the view's queries between
+    connection.close_if_unusable_or_obsolete()
+    with connection.cursor() as cursor:
+        for _ in range(queries):
+            cursor.execute("SELECT 1")
+    connection.close_if_unusable_or_obsolete()
+
+
+def run(mode, requests=50, queries=3, delay_ms=0, overrides=None):
+    """
+    Issue ``requests`` simulated requests of ``queries`` queries each in
+    connection mode ``mode`` through a LatencyProxy. Returns timings in ms
+    and how many server connections were opened.
+    """
+    db = {**settings.DATABASES["default"], **(overrides or {})}
+    if "postgresql" not in db["ENGINE"]:
+        raise ValueError("Connection benchmarks need a PostgreSQL database")
+
+    with LatencyProxy(db["HOST"] or "localhost", db["PORT"] or 5432, delay_ms) as proxy:
+        alias = f"connbench_{mode}"  # pools are keyed by alias
+        handler = ConnectionHandler({alias: database_settings(mode, "127.0.0.1", proxy.port, overrides)})
+        connection = handler[alias]
+        try:
+            _request(connection, 1)  # warm up (opens the pool, if any)
+            opened_before = proxy.connections
+            timings = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                _request(connection, queries)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+            if mode == "pool":
+                connection.close_pool()
+
+    timings.sort()
+    return {
+        "mode": mode,
+        "requests": requests,
+        "queries_per_request": queries,
+        "injected_rtt_ms": delay_ms,
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        "connections_opened": proxy.connections - opened_before,
+    }
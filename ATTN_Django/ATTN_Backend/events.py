@@ -0,0 +1,197 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.utils.module_loading import import_string
+
+from .checks import web_workers
+
+logger = logging.getLogger(__name__)
+
+
+ORDER_CREATED = "order_created"
+ORDER_STATUS_CHANGED = "order_status_changed"
+STOCK_CHANGED = "stock_changed"
+DEBT_PAYMENT_CREATED = "debt_payment_created"
+NOTIFICATION_CREATED = "notification_created"
+
+
+class Event:
+    def __init__(self, id, type, data):
+        self.id = id
+        self.type = type
+        self.data = data
+
+    def to_sse(self):
+        payload = json.dumps(self.data, cls=DjangoJSONEncoder)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """A single listener; events are handed to its own event loop."""
+
+    def __init__(self, loop, maxsize=1000):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop the event, it can resync via /api/sync/
+            logger.warning("Dropping event %s for slow subscriber", event.id)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class InMemoryBroker:
+    """
+    In-process fan-out broker. Only clients connected to the same process
+    see events, so it refuses to start when WEB_CONCURRENCY asks for more
+    than one worker; use PostgresBroker there.
+    """
+
+    def __init__(self, history=500):
+        if web_workers() > 1 and type(self) is InMemoryBroker:
+            raise ImproperlyConfigured(
+                "InMemoryBroker only reaches clients of its own worker; set "
+                "ATTN_EVENTS_BACKEND to ATTN_Backend.events.PostgresBroker to run several."
+            )
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._subscribers = set()
+        self._history = deque(maxlen=history)
+
+    def publish(self, type, data):
+        with self._lock:
+            event = Event(next(self._ids), type, data)
+        self._fan_out(event)
+        return event
+
+    def _fan_out(self, event):
+        with self._lock:
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.push(event)
+            except RuntimeError:
+                # loop already closed
+                self.unsubscribe(subscriber)
+
+    def subscribe(self, last_event_id=None):
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+            missed = [e for e in self._history if last_event_id is not None and e.id > last_event_id]
+        for event in missed:
+            subscription.queue.put_nowait(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+class PostgresBroker(InMemoryBroker):
+    """
+    Fans events out across workers and hosts with Postgres LISTEN/NOTIFY.
+    publish() sends a NOTIFY; each process that has subscribers keeps one
+    extra connection LISTENing on a background thread and hands what
+    arrives to them. Ids come from a database sequence (migration 0017),
+    so Last-Event-ID means the same thing on every worker.
+    """
+
+    CHANNEL = "attn_events"
+    SEQUENCE = "attn_event_id"
+
+    def __init__(self, history=500):
+        if connection.vendor != "postgresql":
+            raise ImproperlyConfigured("PostgresBroker needs a PostgreSQL default database.")
+        super().__init__(history)
+        self._listener = None
+
+    def publish(self, type, data):
+        payload = json.dumps({"type": type, "data": data}, cls=DjangoJSONEncoder)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_notify(%s, nextval(%s)::text || ' ' || %s)",
+                    [self.CHANNEL, self.SEQUENCE, payload],
+                )
+        except DatabaseError:
+            # e.g. a payload over NOTIFY's 8000 bytes; clients resync via /api/sync/
+            logger.exception("Could not publish %s event", type)
+
+    def subscribe(self, last_event_id=None):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name="attn-events", daemon=True)
+                self._listener.start()
+        return super().subscribe(last_event_id)
+
+    def _listen(self):
+        import psycopg
+
+        params = connection.get_connection_params()
+        while True:
+            try:
+                with psycopg.connect(**params, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {self.CHANNEL}")
+                    for notify in conn.notifies():
+                        event_id, payload = notify.payload.split(" ", 1)
+                        message = json.loads(payload)
+                        self._fan_out(Event(int(event_id), message["type"], message["data"]))
+            except Exception:
+                # anything published while reconnecting is lost; clients resync
+                logger.exception("Event listener lost its connection; reconnecting")
+                time.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, "ATTN_EVENTS_BACKEND", "ATTN_Backend.events.InMemoryBroker")
+                _broker = import_string(path)()
+    return _broker
+
+
+def publish(type, data):
+    """Publish once the surrounding transaction (if any) commits."""
+    transaction.on_commit(lambda: get_broker().publish(type, data))
+
+
+async def stream(last_event_id=None, heartbeat=15):
+    broker = get_broker()
+    subscription = broker.subscribe(last_event_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await subscription.get(timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # comment line keeps proxies from closing the connection
+                yield ": keep-alive\n\n"
+                continue
+            yield event.to_sse()
+    finally:
+        broker.unsubscribe(subscription)
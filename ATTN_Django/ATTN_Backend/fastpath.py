@@ -0,0 +1,200 @@
+import decimal
+from functools import cache
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+from rest_framework.settings import api_settings
+
+
+# Field types whose to_representation() returns the database value as-is
+# (for the values the ORM hands back), so the mapper can skip the call
+PASSTHROUGH = (
+    drf_fields.BooleanField,
+    drf_fields.CharField,
+    drf_fields.IntegerField,
+    drf_fields.JSONField,
+)
+
+
+class _Row(dict):
+    # Lets SerializerMethodField methods use obj.attr on a .values() row
+    __getattr__ = dict.__getitem__
+
+
+class RowMapper:
+    """
+    Read-only fast path for a ModelSerializer: the rows come from
+    ``.values()`` instead of model instances, and each field is turned
+    into a (key, getter) step once, up front, instead of walking the DRF
+    field machinery for every row. The output is the same as
+    ``serializer_class(instances, many=True).data``.
+
+    Handles plain model fields, FK primary keys, dotted sources through
+    FKs, nested serializers, file/image fields and SerializerMethodFields
+    (which see the row through attribute access, so they may only read
+    fields the serializer itself exposes).
+    """
+
+    def __init__(self, serializer_class, context=None):
+        self.serializer = serializer_class(context=context or {})
+        self.model = self.serializer.Meta.model
+        self.lookups = []
+        self._compiled = {}  # current time zone -> steps
+        self._steps(self._current_timezone())
+
+    def queryset(self, queryset):
+        """``queryset`` as the ``.values()`` rows this mapper reads."""
+        return queryset.values(*self.lookups)
+
+    def map(self, rows):
+        steps = self._steps(self._current_timezone())
+        return [{key: get(row) for key, get in steps} for row in rows]
+
+    @staticmethod
+    def _current_timezone():
+        # What DateTimeField.enforce_timezone() converts to, looked up once
+        # per call instead of once per value
+        return timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def _steps(self, tz):
+        steps = self._compiled.get(tz)
+        if steps is None:
+            lookups = []
+            steps = self._compiled[tz] = self._compile(self.serializer, self.model, "", tz, lookups)
+            self.lookups = lookups
+        return steps
+
+    def __call__(self, queryset):
+        return self.map(self.queryset(queryset))
+
+    def _compile(self, serializer, model, prefix, tz, lookups):
+        steps = []
+        for field in serializer._readable_fields:
+            if isinstance(field, serializers.SerializerMethodField):
+                method = getattr(serializer, field.method_name)
+                steps.append((field.field_name, self._method(method, prefix)))
+                continue
+
+            lookup = prefix + "__".join(field.source_attrs)
+            if isinstance(field, serializers.BaseSerializer):
+                nested = self._compile(field, model._meta.get_field(field.source).related_model, lookup + "__", tz, lookups)
+                pk = f"{lookup}__{field.Meta.model._meta.pk.attname}"
+                if pk not in lookups:
+                    lookups.append(pk)
+                steps.append((field.field_name, self._nested(pk, nested)))
+                continue
+
+            lookups.append(lookup)
+            if isinstance(field, relations.PrimaryKeyRelatedField):
+                # .values("fk") already gives the related primary key
+                steps.append((field.field_name, itemgetter(lookup)))
+            elif isinstance(field, drf_fields.FileField):
+                steps.append((field.field_name, self._file(field, model, lookup)))
+            elif isinstance(field, PASSTHROUGH):
+                steps.append((field.field_name, itemgetter(lookup)))
+            elif isinstance(field, drf_fields.DateTimeField):
+                steps.append((field.field_name, self._datetime(field, lookup, tz)))
+            elif isinstance(field, drf_fields.DateField) and _is_iso(field, api_settings.DATE_FORMAT):
+                steps.append((field.field_name, self._convert(lambda value: value.isoformat(), lookup)))
+            elif isinstance(field, drf_fields.DecimalField):
+                steps.append((field.field_name, self._decimal(field, lookup)))
+            else:
+                steps.append((field.field_name, self._convert(field.to_representation, lookup)))
+        return steps
+
+    @staticmethod
+    def _convert(to_representation, lookup):
+        def get(row):
+            value = row[lookup]
+            return None if value is None else to_representation(value)
+        return get
+
+    @classmethod
+    def _datetime(cls, field, lookup, tz):
+        tz = field.timezone if hasattr(field, "timezone") else tz
+        if not _is_iso(field, api_settings.DATETIME_FORMAT) or tz is None:
+            return cls._convert(field.to_representation, lookup)
+
+        def get(row):
+            value = row[lookup]
+            if not value:
+                return None
+            if value.tzinfo is None:
+                value = field.enforce_timezone(value)
+            else:
+                value = value.astimezone(tz)
+            value = value.isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+        return get
+
+    @classmethod
+    def _decimal(cls, field, lookup):
+        if (
+            not getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+            or field.localize or field.normalize_output or field.decimal_places is None
+        ):
+            return cls._convert(field.to_representation, lookup)
+
+        # DecimalField.quantize(), with its context built once
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        if field.rounding is not None:
+            context.rounding = field.rounding
+        exponent = decimal.Decimal(".1") ** field.decimal_places
+
+        def get(row):
+            value = row[lookup]
+            if value is None:
+                return None
+            if not isinstance(value, decimal.Decimal):
+                value = decimal.Decimal(str(value).strip())
+            return f"{value.quantize(exponent, context=context):f}"
+        return get
+
+    @staticmethod
+    def _nested(pk, steps):
+        def get(row):
+            if row[pk] is None:
+                return None
+            return {key: step(row) for key, step in steps}
+        return get
+
+    @staticmethod
+    def _method(method, prefix):
+        def get(row):
+            if prefix:
+                row = {k[len(prefix):]: v for k, v in row.items() if k.startswith(prefix)}
+            return method(_Row(row))
+        return get
+
+    @staticmethod
+    def _file(field, model, lookup):
+        storage = model._meta.get_field(field.source).storage
+        request = field.context.get("request")
+        use_url = getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+
+        def get(row):
+            name = row[lookup]
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return get
+
+
+def _is_iso(field, default):
+    output_format = getattr(field, "format", default)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+@cache
+def mapper(serializer_class):
+    """Shared RowMapper for ``serializer_class`` (no request context)."""
+    return RowMapper(serializer_class)
@@ -0,0 +1,146 @@
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Product, Notification, DailyProductSales
+
+
+FORECAST_TYPES = ("low_stock", "out_of_stock", "restock_soon")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def weekly_sales(product_names=None):
+    """
+    Units sold per (product name, ISO week) from the daily rollup.
+    Names are lower-cased the same way Product.save() stores them.
+    """
+    rows = DailyProductSales.objects.all()
+    if product_names is not None:
+        # OrderedItem.product_name keeps whatever case the POS sent
+        match = Q(pk__in=[])
+        for name in product_names:
+            match |= Q(product_name__iexact=name)
+        rows = rows.filter(match)
+
+    weeks = defaultdict(lambda: defaultdict(int))
+    for day, name, qty in rows.values_list("day", "product_name", "qty").iterator():
+        weeks[name.lower().strip()][day.isocalendar()[:2]] += qty
+    return weeks
+
+
+def predict_next_week(matrix):
+    """
+    Next-week demand for every row of ``matrix`` (products x weeks) at once.
+
+    Mirrors the old predictNextWeek in pages/analytics.jsx: only weeks with
+    sales count, one week is repeated, up to three are averaged, otherwise
+    a least-squares trend is extrapolated and clamped to [0, 2 x mean].
+    """
+    import numpy as np
+
+    y = np.asarray(matrix, dtype=float)
+    if y.size == 0:
+        return np.zeros(len(y), dtype=np.int64)
+
+    observed = y > 0
+    n = observed.sum(axis=1)
+    x = np.cumsum(observed, axis=1) * observed  # 1..n over observed weeks
+
+    sum_x = n * (n + 1) / 2
+    sum_xx = n * (n + 1) * (2 * n + 1) / 6
+    sum_y = y.sum(axis=1)
+    sum_xy = (x * y).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(n > 0, sum_y / n, 0)
+        denominator = n * sum_xx - sum_x ** 2
+        slope = np.where(denominator != 0, (n * sum_xy - sum_x * sum_y) / denominator, 0)
+        intercept = np.where(n > 0, (sum_y - slope * sum_x) / n, 0)
+    trend = np.clip(slope * (n + 1) + intercept, 0, 2 * mean)
+    trend = np.where(denominator != 0, trend, mean)
+
+    prediction = np.select([n == 0, n == 1, n <= 3], [0, sum_y, mean], default=trend)
+    return np.floor(prediction + 0.5).astype(np.int64)  # Math.round semantics
+
+
+def stock_alert(product, weekly_demand):
+    """Return (type, days_until_stockout, message) or None for one product."""
+    label = product.name.title()
+    days = math.floor(product.stock / (weekly_demand / 7)) if weekly_demand > 0 else None
+
+    if product.stock <= 0:
+        return "out_of_stock", days, f"{label} is OUT OF STOCK! Restock immediately!"
+    if days is not None and 0 < days <= _setting("ATTN_RESTOCK_SOON_DAYS", 5):
+        plural = "s" if days != 1 else ""
+        return "restock_soon", days, f"{label} will likely be out of stock in {days} day{plural}. Restock soon!"
+    if product.stock <= _setting("ATTN_LOW_STOCK_THRESHOLD", 5):
+        return "low_stock", days, f"{label} is running low ({product.stock} left)."
+    return None
+
+
+def run(product_ids=None):
+    """
+    Forecast demand for the given products (all active products when None)
+    and sync their unread stock notifications. Returns (created, updated,
+    removed) counts.
+    """
+    products = Product.objects.filter(is_active=True)
+    if product_ids is not None:
+        products = products.filter(id__in=product_ids)
+    products = list(products)
+    if not products:
+        return 0, 0, 0
+
+    names = [p.name.lower().strip() for p in products]
+    history = weekly_sales(None if product_ids is None else names)
+    weeks = sorted({week for sales in history.values() for week in sales})
+    matrix = [[history.get(name, {}).get(week, 0) for week in weeks] for name in names]
+    demand = predict_next_week(matrix)
+
+    alerts = {
+        product: stock_alert(product, int(weekly))
+        for product, weekly in zip(products, demand)
+    }
+    return _sync_notifications(alerts)
+
+
+@transaction.atomic
+def _sync_notifications(alerts):
+    # keyed by the loaded products, so the new notifications carry them and
+    # the notification_created event does not look each one up again
+    created = updated = removed = 0
+    existing = {}
+    for notification in Notification.objects.select_for_update().filter(
+        product_id__in=[p.id for p in alerts], is_read=False, notification_type__in=FORECAST_TYPES
+    ):
+        existing.setdefault(notification.product_id, []).append(notification)
+
+    for product, alert in alerts.items():
+        current = existing.get(product.id, [])
+        keep = None
+        if alert:
+            kind, days, message = alert
+            keep = next((n for n in current if n.notification_type == kind), None)
+            if keep is None:
+                Notification.objects.create(
+                    product=product, notification_type=kind,
+                    message=message, days_until_stockout=days,
+                )
+                created += 1
+            elif (keep.message, keep.days_until_stockout) != (message, days):
+                keep.message, keep.days_until_stockout = message, days
+                keep.save(update_fields=["message", "days_until_stockout", "updated_at"])
+                updated += 1
+
+        # Unread alerts that no longer apply (or duplicates) are dropped
+        stale = [n.id for n in current if n is not keep]
+        if stale:
+            removed += Notification.objects.filter(id__in=stale).delete()[0]
+
+    return created, updated, removed
@@ -0,0 +1,139 @@
+import hashlib
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from . import catalog, jobs
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+
+# name -> bounding box; each gets a JPEG/PNG and a WebP file
+VARIANT_SIZES = {
+    "thumb": (160, 160),
+    "medium": (480, 480),
+}
+VARIANT_DIR = "products/variants/"
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def render_variants(data):
+    """
+    Resize raw image bytes into every variant.
+    Returns {variant name: (file name, bytes)} with content-hashed names.
+    """
+    from PIL import Image, ImageOps
+
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    with Image.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        has_alpha = source.mode in ("RGBA", "LA") or (source.mode == "P" and "transparency" in source.info)
+        base = source.convert("RGBA" if has_alpha else "RGB")
+
+    files = {}
+    for name, size in VARIANT_SIZES.items():
+        image = base.copy()
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+
+        out = io.BytesIO()
+        if has_alpha:
+            image.save(out, "PNG", optimize=True)
+            ext = "png"
+        else:
+            image.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            ext = "jpg"
+        files[name] = (f"{VARIANT_DIR}{digest}_{name}.{ext}", out.getvalue())
+
+        out = io.BytesIO()
+        image.save(out, "WEBP", quality=WEBP_QUALITY, method=4)
+        files[f"{name}_webp"] = (f"{VARIANT_DIR}{digest}_{name}.webp", out.getvalue())
+    return files
+
+
+def generate(product_id):
+    """Build and store the variants for one product's current image."""
+    product = Product.objects.filter(pk=product_id).only("id", "image").first()
+    if product is None or not product.image:
+        return {}
+
+    with product.image.open("rb") as f:
+        data = f.read()
+
+    variants = {}
+    for name, (path, content) in render_variants(data).items():
+        # identical content => identical name, so re-uploads are free
+        if not default_storage.exists(path):
+            path = default_storage.save(path, ContentFile(content))
+        variants[name] = path
+
+    # Only record the variants if the image was not replaced meanwhile
+    Product.objects.filter(pk=product_id, image=product.image.name).update(
+        image_variants=variants, updated_at=timezone.now()
+    )
+    catalog.invalidate()
+    return variants
+
+
+def _generate_safely(product_id):
+    try:
+        generate(product_id)
+    except Exception:
+        logger.exception("Thumbnail generation failed for product %s", product_id)
+
+
+def clear(product):
+    """
+    Drop ``product``'s variants along with its image; the caller saves.
+    The files are deleted once the transaction commits, unless another
+    product uploaded the same image bytes and still uses them.
+    """
+    variants = product.image_variants or {}
+    product.image_variants = {}
+    if variants:
+        product_id = product.id
+        transaction.on_commit(lambda: _delete_unused(product_id, variants))
+
+
+def _delete_unused(product_id, variants):
+    # Every variant name carries the source digest, so checking one is enough
+    name, path = next(iter(variants.items()))
+    if Product.objects.exclude(pk=product_id).filter(**{f"image_variants__{name}": path}).exists():
+        return
+    for path in variants.values():
+        try:
+            default_storage.delete(path)
+        except OSError:
+            logger.exception("Could not delete image variant %s", path)
+
+
+def schedule(product):
+    """
+    Generate the variants for ``product`` once the current transaction
+    commits. Small images are done inline; large ones become a job for
+    manage.py runworker so the upload request returns right away.
+    """
+    if not product.image:
+        return
+
+    try:
+        size = product.image.size
+    except (OSError, ValueError):
+        size = 0
+    inline = size <= _setting("ATTN_IMAGE_INLINE_MAX_BYTES", 256 * 1024)
+    product_id = product.id
+
+    if inline:
+        transaction.on_commit(lambda: _generate_safely(product_id))
+    else:
+        jobs.enqueue("thumbnails", product_id)
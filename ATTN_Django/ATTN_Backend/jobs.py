@@ -0,0 +1,270 @@
+import logging
+import os
+import signal
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ---------------------------------------------------------------------------
+# Tasks
+# ---------------------------------------------------------------------------
+
+_tasks = {}
+
+
+def task(name):
+    """Register the decorated function as the task ``name``."""
+    def register(func):
+        _tasks[name] = func
+        return func
+    return register
+
+
+def enqueue(name, *args, delay=None, run_at=None, max_attempts=None):
+    """
+    Queue ``name(*args)`` for a worker. The job is written in the caller's
+    transaction, so it only exists if that commits; ``args`` must be
+    JSON-serialisable. With ATTN_JOBS_EAGER the task runs in-process once
+    the transaction commits instead (development, tests).
+    """
+    if name not in _tasks:
+        raise KeyError(f"Unknown task {name!r}")
+
+    if _setting("ATTN_JOBS_EAGER", False):
+        transaction.on_commit(lambda: _run_eagerly(name, args))
+        return None
+
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+    return Job.objects.create(
+        task=name,
+        args=list(args),
+        run_at=run_at,
+        max_attempts=max_attempts or _setting("ATTN_JOB_MAX_ATTEMPTS", 5),
+    )
+
+
+def _run_eagerly(name, args):
+    try:
+        _tasks[name](*args)
+    except Exception:
+        logger.exception("Task %s failed", name)
+
+
+# ---------------------------------------------------------------------------
+# Claiming and running
+# ---------------------------------------------------------------------------
+
+def claim(worker, limit=1):
+    """
+    Mark up to ``limit`` due jobs as running for ``worker`` and return them.
+    On Postgres SKIP LOCKED lets concurrent workers pass over each other's
+    rows instead of queueing behind them; the conditional UPDATE keeps
+    backends without row locks (SQLite) from handing a job out twice.
+    """
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        due = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by("run_at", "id")[:limit]
+        )
+        for job in due:
+            taken = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+                status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F("attempts") + 1,
+            )
+            if taken:
+                job.status, job.locked_by, job.locked_at = Job.RUNNING, worker, now
+                job.attempts += 1
+                claimed.append(job)
+    return claimed
+
+
+def _owned(job):
+    """
+    ``job``'s row, as long as it is still the run this worker claimed.
+    requeue_stale() may have handed a slow job to another worker meanwhile;
+    the outcome is then that worker's to record.
+    """
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by, locked_at=job.locked_at)
+
+
+def _lost(job):
+    logger.warning("Job %s (%s) was requeued while %s ran it; its outcome is not recorded",
+                   job.pk, job.task, job.locked_by)
+
+
+def run(job):
+    """
+    Run one claimed job and record the outcome. Returns True when it
+    succeeded and was marked done.
+    """
+    func = _tasks.get(job.task)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task {job.task!r}")
+        func(*job.args)
+    except Exception:
+        _failed(job, traceback.format_exc())
+        return False
+
+    done = _owned(job).update(
+        status=Job.DONE, finished_at=timezone.now(), locked_by="", locked_at=None, last_error="",
+    )
+    if not done:
+        _lost(job)
+    return bool(done)
+
+
+def _failed(job, error):
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        # Exponential backoff: base, 2 x base, 4 x base, ...
+        delay = _setting("ATTN_JOB_RETRY_SECONDS", 30) * 2 ** (job.attempts - 1)
+        if not _owned(job).update(
+            status=Job.QUEUED, run_at=now + timedelta(seconds=delay),
+            locked_by="", locked_at=None, last_error=error,
+        ):
+            _lost(job)
+            return
+        logger.warning("Job %s (%s) failed, attempt %d of %d; retrying in %ds",
+                       job.pk, job.task, job.attempts, job.max_attempts, delay)
+    else:
+        if not _owned(job).update(
+            status=Job.FAILED, finished_at=now, locked_by="", locked_at=None, last_error=error,
+        ):
+            _lost(job)
+            return
+        logger.error("Job %s (%s) failed for good after %d attempts:\n%s",
+                     job.pk, job.task, job.attempts, error)
+
+
+def requeue_stale(timeout=None):
+    """
+    Jobs left running longer than ``timeout`` seconds belong to a worker
+    that died; queue them again, or fail them if they are out of attempts.
+    """
+    timeout = timeout or _setting("ATTN_JOB_TIMEOUT_SECONDS", 600)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED, finished_at=timezone.now(), locked_by="", locked_at=None,
+        last_error="worker lost while running the job",
+    )
+    requeued = stale.update(status=Job.QUEUED, locked_by="", locked_at=None)
+    return requeued, failed
+
+
+def prune(days=7):
+    """Delete jobs that finished successfully more than ``days`` days ago."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status=Job.DONE, finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def stats():
+    """
+    Unfinished jobs for /api/_metrics: counts by status and how long the
+    oldest due job has been waiting. A growing wait means no worker is
+    running (see ATTN_JOBS_EAGER).
+    """
+    now = timezone.now()
+    counts = dict(
+        Job.objects.filter(status__in=[Job.QUEUED, Job.RUNNING, Job.FAILED])
+        .values_list("status").annotate(n=Count("id"))
+    )
+    oldest = (
+        Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+        .order_by("run_at").values_list("run_at", flat=True).first()
+    )
+    return {
+        "eager": _setting("ATTN_JOBS_EAGER", False),
+        "queued": counts.get(Job.QUEUED, 0),
+        "running": counts.get(Job.RUNNING, 0),
+        "failed": counts.get(Job.FAILED, 0),
+        "oldest_due_seconds": round((now - oldest).total_seconds(), 1) if oldest else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+def work(name, stop, poll=1.0, burst=False):
+    """
+    Claim and run due jobs until ``stop`` is set, sleeping ``poll`` seconds
+    whenever nothing is due. With ``burst`` return as soon as the queue has
+    nothing due instead.
+    """
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                jobs = claim(name)
+            except DatabaseError:
+                # e.g. the database restarting; keep the worker alive
+                logger.exception("Worker %s could not claim jobs", name)
+                connection.close()
+                stop.wait(poll)
+                continue
+            if not jobs:
+                if burst:
+                    break
+                stop.wait(poll)
+                continue
+            for job in jobs:
+                run(job)
+    finally:
+        connection.close()
+
+
+def serve(threads=1, poll=1.0, burst=False, stop=None):
+    """
+    Run ``threads`` workers in this process until SIGINT/SIGTERM (or
+    ``stop``), requeueing jobs abandoned by dead workers every so often.
+    """
+    stop = stop or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    workers = [
+        threading.Thread(target=work, args=(f"{prefix}:{i}", stop, poll, burst), name=f"attn-worker-{i}")
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+
+    interval = max(poll, _setting("ATTN_JOB_TIMEOUT_SECONDS", 600) / 10)
+    try:
+        if burst:
+            for worker in workers:
+                worker.join()
+        else:
+            while True:
+                close_old_connections()
+                requeue_stale()
+                if stop.wait(interval):
+                    break
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+        connection.close()
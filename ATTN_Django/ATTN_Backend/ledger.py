@@ -0,0 +1,221 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, IntegerField, Q, Sum, When
+from django.utils import timezone
+
+from .models import Product, StockMovement, StockSnapshot
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+# The ledger is the history of stock; Product.stock stays the running total
+# that checkout tests and decrements, because refusing to oversell needs one
+# row per product to serialise on. What the ledger buys checkout is that the
+# decrement is a single guarded UPDATE issued just before commit, instead of
+# row locks taken when the order starts and held while it is written.
+
+class OutOfStock(Exception):
+    """A guarded apply() found a product without enough stock left."""
+
+
+def record(movements):
+    """
+    Insert ``movements`` into the ledger without touching Product.stock,
+    for callers that already wrote the new stock themselves (new products,
+    bulk imports).
+    """
+    movements = [m for m in movements if m.qty]
+    if movements:
+        StockMovement.objects.bulk_create(movements)
+    return movements
+
+
+def apply(movements, require_stock=False):
+    """
+    Insert ``movements`` and add them onto the cached Product.stock /
+    stock_status in one UPDATE. Deltas are applied with F() so concurrent
+    writers add up instead of overwriting each other. With
+    ``require_stock`` no product may go below zero: if one would, nothing
+    is updated and OutOfStock is raised (roll the transaction back).
+    """
+    movements = record(movements)
+    deltas = defaultdict(int)
+    for movement in movements:
+        deltas[movement.product_id] += movement.qty
+    if not deltas:
+        return deltas
+
+    products = Product.objects.filter(id__in=list(deltas))
+    if require_stock:
+        products = products.filter(reduce(or_, (
+            Q(id=pid, stock__gte=-delta) if delta < 0 else Q(id=pid) for pid, delta in deltas.items()
+        )))
+    updated = products.update(
+        stock=Case(
+            *[When(id=pid, then=F("stock") + delta) for pid, delta in deltas.items()],
+            output_field=IntegerField(),
+        ),
+        # SET sees the old stock, so compare it against the negated delta
+        stock_status=Case(
+            *[When(id=pid, then=Q(stock__gt=-delta)) for pid, delta in deltas.items()],
+            output_field=BooleanField(),
+        ),
+        updated_at=timezone.now(),
+    )
+    if updated != len(deltas):
+        if require_stock:
+            raise OutOfStock()
+        raise RuntimeError("Stock update touched an unexpected number of products")
+    return deltas
+
+
+def opening(products, note="opening balance"):
+    """Ledger rows for products created with a non-zero stock."""
+    return record(
+        StockMovement(product_id=p.id, kind=StockMovement.ADJUSTMENT, qty=p.stock, note=note)
+        for p in products
+    )
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+# Intervals are half-open: a snapshot taken at T holds every movement with
+# created_at < T, and stock_at(T) means the same.
+
+def end_of_day(day):
+    """The first instant after ``day`` in the current time zone."""
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def _latest_snapshot(when):
+    return (
+        StockSnapshot.objects.filter(taken_at__lte=when)
+        .order_by("-taken_at").values_list("taken_at", flat=True).first()
+    )
+
+
+def _movements(start, end, product_ids):
+    movements = StockMovement.objects.filter(created_at__lt=end)
+    if start is not None:
+        movements = movements.filter(created_at__gte=start)
+    if product_ids is not None:
+        movements = movements.filter(product_id__in=product_ids)
+    return movements
+
+
+def stock_at(when, product_ids=None):
+    """
+    {product_id: stock} as of ``when``: the last snapshot before it plus
+    the movements since, so the scan never reaches further back than one
+    snapshot interval.
+    """
+    taken_at = _latest_snapshot(when)
+    stock = {}
+    if taken_at is not None:
+        snapshot = StockSnapshot.objects.filter(taken_at=taken_at)
+        if product_ids is not None:
+            snapshot = snapshot.filter(product_id__in=product_ids)
+        stock.update(snapshot.values_list("product_id", "stock"))
+
+    since = _movements(taken_at, when, product_ids).values("product_id").annotate(total=Sum("qty"))
+    for row in since:
+        stock[row["product_id"]] = stock.get(row["product_id"], 0) + row["total"]
+    return stock
+
+
+def movement_report(start, end, product_ids=None):
+    """
+    Per product: opening stock at ``start``, the movements in
+    [start, end) summed by kind, and the closing stock at ``end``.
+    """
+    opening_stock = stock_at(start, product_ids)
+    kinds = [kind for kind, _ in StockMovement.KINDS]
+    totals = (
+        _movements(start, end, product_ids).values("product_id")
+        .annotate(**{kind: Sum("qty", filter=Q(kind=kind), default=0) for kind in kinds})
+    )
+    moved = {row.pop("product_id"): row for row in totals}
+
+    names = dict(Product.objects.filter(id__in=opening_stock.keys() | moved.keys()).values_list("id", "name"))
+    report = []
+    for product_id in sorted(names):
+        kind_totals = moved.get(product_id, dict.fromkeys(kinds, 0))
+        opened = opening_stock.get(product_id, 0)
+        report.append({
+            "product_id": product_id,
+            "product_name": names[product_id],
+            "opening": opened,
+            **kind_totals,
+            "closing": opened + sum(kind_totals.values()),
+        })
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Snapshots and consistency
+# ---------------------------------------------------------------------------
+
+def snapshot(as_of=None):
+    """
+    Store every product's stock as of ``as_of``. The default stays
+    ATTN_STOCK_SNAPSHOT_LAG_SECONDS behind now, so a transaction that
+    stamped its movements just before the snapshot but committed just
+    after is not left out of it. Returns the number of rows written.
+    """
+    if as_of is None:
+        as_of = timezone.now() - timedelta(seconds=_setting("ATTN_STOCK_SNAPSHOT_LAG_SECONDS", 300))
+
+    with transaction.atomic():
+        if StockSnapshot.objects.filter(taken_at__gte=as_of).exists():
+            return 0
+        stock = stock_at(as_of)
+        StockSnapshot.objects.bulk_create(
+            (StockSnapshot(product_id=pid, taken_at=as_of, stock=qty) for pid, qty in stock.items()),
+            batch_size=1000,
+        )
+    return len(stock)
+
+
+def prune_snapshots(keep):
+    """Delete all but the newest ``keep`` snapshots."""
+    cutoff = (
+        StockSnapshot.objects.values_list("taken_at", flat=True)
+        .distinct().order_by("-taken_at")[keep:keep + 1]
+    )
+    cutoff = list(cutoff)
+    if not cutoff:
+        return 0
+    deleted, _ = StockSnapshot.objects.filter(taken_at__lte=cutoff[0]).delete()
+    return deleted
+
+
+def drift():
+    """{product_id: (cached stock, ledger stock)} where the two disagree."""
+    ledger = dict(
+        StockMovement.objects.values("product_id").annotate(total=Sum("qty")).values_list("product_id", "total")
+    )
+    return {
+        pid: (stock, ledger.get(pid, 0))
+        for pid, stock in Product.objects.values_list("id", "stock").iterator()
+        if stock != ledger.get(pid, 0)
+    }
+
+
+@transaction.atomic
+def repair():
+    """Reset the cached Product.stock of drifted products to the ledger total."""
+    drifted = drift()
+    for pid, (_, stock) in drifted.items():
+        Product.objects.filter(id=pid).update(stock=stock, stock_status=stock > 0, updated_at=timezone.now())
+    return drifted
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ATTN_Backend import asyncbench
+
+
+DEFAULT_PATHS = [
+    "/api/products/",
+    "/api/orders/?limit=50",
+    "/api/ordereditem/",
+    "/api/notifications/",
+    "/api/analytics/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the list endpoints under many concurrent clients: "
+        "DRF views on a threaded WSGI server vs. async views on one ASGI event loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS)
+        parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint.")
+        parser.add_argument("--concurrency", type=int, default=50, help="Simultaneous clients.")
+        parser.add_argument("--wsgi-workers", type=int, default=4, help="WSGI worker threads.")
+        parser.add_argument("--latency-ms", type=float, default=20,
+                            help="Added to every query to mimic the remote database (0 to disable).")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        # Each mode runs in its own process, since ATTN_ASYNC_VIEWS picks the URLconf at startup
+        parser.add_argument("--mode", choices=asyncbench.MODES, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["mode"]:
+            return self._run_mode(options)
+
+        results = []
+        for mode in asyncbench.MODES:
+            results += self._spawn(mode, options)
+
+        self.stdout.write(f"{'mode':<6}{'path':<28}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        for r in results:
+            self.stdout.write(
+                f"{r['mode']:<6}{r['path']:<28}{r['throughput_rps']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['errors']:>8}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(options['paths'])} endpoint(s) in both modes."))
+
+    def _spawn(self, mode, options):
+        with tempfile.NamedTemporaryFile(suffix=".json") as out:
+            command = [
+                sys.executable, sys.argv[0], "benchmark_asgi", *options["paths"],
+                "--mode", mode, "--output", out.name,
+                "--requests", str(options["requests"]),
+                "--concurrency", str(options["concurrency"]),
+                "--wsgi-workers", str(options["wsgi_workers"]),
+                "--latency-ms", str(options["latency_ms"]),
+            ]
+            env = {**os.environ, "ATTN_ASYNC_VIEWS": "1" if mode == "asgi" else "0"}
+            finished = subprocess.run(command, env=env, capture_output=True, text=True)
+            if finished.returncode:
+                raise CommandError(f"{mode} run failed:\n{finished.stderr}")
+            return json.load(out)
+
+    def _run_mode(self, options):
+        mode = options["mode"]
+        if settings.ATTN_ASYNC_VIEWS != (mode == "asgi"):
+            raise CommandError(f"ATTN_ASYNC_VIEWS does not match --mode {mode}")
+
+        asyncbench.inject_latency(options["latency_ms"])
+        results = []
+        for path in options["paths"]:
+            if mode == "asgi":
+                results.append(asyncbench.run_asgi(path, options["requests"], options["concurrency"]))
+            else:
+                results.append(asyncbench.run_wsgi(
+                    path, options["requests"], options["concurrency"], options["wsgi_workers"]
+                ))
+        with open(options["output"], "w") as f:
+            json.dump(results, f)
@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ATTN_Backend import connbench
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request database overhead with fresh, persistent and pooled "
+        "connections, through a proxy that injects network latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", choices=connbench.MODES, default=list(connbench.MODES))
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--queries", type=int, default=3, help="Queries per simulated request.")
+        parser.add_argument("--latency-ms", type=float, default=0,
+                            help="Round-trip time to add, e.g. 60 to mimic a cross-region database.")
+        parser.add_argument("--host", help="Benchmark this Postgres instead of the configured one.")
+        parser.add_argument("--port")
+        parser.add_argument("--name")
+        parser.add_argument("--user")
+        parser.add_argument("--password")
+        parser.add_argument("--sslmode", help="e.g. 'disable' for a local Postgres without SSL.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        overrides = {
+            key.upper(): options[key]
+            for key in ("host", "port", "name", "user", "password")
+            if options[key]
+        }
+        if options["sslmode"]:
+            overrides["OPTIONS"] = {"sslmode": options["sslmode"]}
+
+        results = []
+        for mode in options["modes"]:
+            try:
+                results.append(connbench.run(
+                    mode, requests=options["requests"], queries=options["queries"],
+                    delay_ms=options["latency_ms"], overrides=overrides,
+                ))
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        self.stdout.write(f"{'mode':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'connections':>13}")
+        for r in results:
+            self.stdout.write(
+                f"{r['mode']:<12}{r['mean_ms']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['connections_opened']:>13}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(results)} connection mode(s)."))
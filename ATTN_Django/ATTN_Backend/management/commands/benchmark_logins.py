@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ATTN_Backend import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how responsive the API stays during a login storm, with password "
+        "hashing inline, on the bounded pool, and with the login throttle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=64)
+        parser.add_argument("--concurrency", type=int, default=16, help="Threads sending logins at once.")
+        parser.add_argument("--workers", type=int, default=2, help="Hashing pool size for the pooled runs.")
+        parser.add_argument("--probe", default="/api/orders/?limit=50",
+                            help="Path timed repeatedly while the storm runs.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--yes", action="store_true",
+                            help="Run even though the database is not on this machine.")
+
+    def handle(self, *args, **options):
+        local, database = benchmark.local_database()
+        if not local and not options["yes"]:
+            raise CommandError(
+                f"Refusing to benchmark {database}: it is not a local database and the "
+                "storm creates accounts. Pass --yes to run there anyway."
+            )
+        results = benchmark.login_storm(
+            logins=options["logins"],
+            concurrency=options["concurrency"],
+            workers=options["workers"],
+            probe=options["probe"],
+        )
+
+        self.stdout.write(
+            f"{'mode':<15}{'seconds':>9}{'logins/s':>10}{'probes':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}  statuses"
+        )
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<15}{r['seconds']:>9}{r['logins_per_s']:>10}{r['probes']:>8}"
+                f"{r['probe_p50_ms']!s:>9}{r['probe_p95_ms']!s:>9}{r['probe_max_ms']!s:>9}  {r['statuses']}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        failures = [f"{name}: {problem}" for name, r in results.items() for problem in r["problems"]]
+        for failure in failures:
+            self.stderr.write(self.style.WARNING(failure))
+        if failures:
+            raise CommandError("The storm did not get the responses it expected; the timings are not meaningful.")
+        self.stdout.write(self.style.SUCCESS(f"Ran {len(results)} mode(s)."))
@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ATTN_Backend import benchmark
+
+
+class Command(BaseCommand):
+    help = "Compare the DRF serializers with the .values() fast path on large lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        results = benchmark.compare_serializers(rows=options["rows"], repeat=options["repeat"])
+
+        self.stdout.write(f"{'serializer':<14}{'rows':>8}{'drf ms':>10}{'fast ms':>10}{'speedup':>9}{'identical':>11}")
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<14}{r['rows']:>8}{r['drf_ms']:>10}{r['fast_ms']:>10}{r['speedup']:>9}{str(r['identical']):>11}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if not all(r["identical"] for r in results.values()):
+            raise CommandError("Fast path output differs from the DRF serializers.")
+        self.stdout.write(self.style.SUCCESS("Fast path output matches the DRF serializers."))
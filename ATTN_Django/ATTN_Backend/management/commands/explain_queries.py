@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ATTN_Backend import query_plans
+
+
+class Command(BaseCommand):
+    help = "Print EXPLAIN plans for the hot API queries and check they use their indexes."
+
+    def add_arguments(self, parser):
+        names = [q.name for q in query_plans.HOT_QUERIES]
+        parser.add_argument("queries", nargs="*", metavar="query",
+                            help=f"Subset to explain (default: all of {', '.join(names)}).")
+        parser.add_argument("--check", action="store_true",
+                            help="Fail when a plan does not use its expected index (Postgres only). "
+                                 "Run against realistically sized data, e.g. after seed_data.")
+
+    def handle(self, *args, **options):
+        names = {q.name for q in query_plans.HOT_QUERIES}
+        for name in options["queries"]:
+            if name not in names:
+                raise CommandError(f"Unknown query {name!r}; choose from {', '.join(sorted(names))}.")
+
+        failures = []
+        for hot_query in query_plans.HOT_QUERIES:
+            if options["queries"] and hot_query.name not in options["queries"]:
+                continue
+            plan = hot_query.explain()
+            ok = query_plans.check(hot_query, plan)
+            heading = hot_query.name
+            if hot_query.expect_index:
+                heading += f" (expects {hot_query.expect_index})"
+            self.stdout.write(self.style.MIGRATE_HEADING(heading))
+            self.stdout.write(plan)
+            self.stdout.write("")
+            if not ok:
+                failures.append(f"{hot_query.name}: plan does not use {hot_query.expect_index}")
+
+        if connection.vendor != "postgresql":
+            self.stdout.write(self.style.WARNING(
+                f"Index checks are Postgres-only; plans from {connection.vendor} were not checked."
+            ))
+        for failure in failures:
+            self.stderr.write(self.style.WARNING(failure))
+        if failures and options["check"]:
+            raise CommandError(f"{len(failures)} query plan(s) missed their index.")
+        self.stdout.write(self.style.SUCCESS("Query plans OK." if not failures else "Done."))
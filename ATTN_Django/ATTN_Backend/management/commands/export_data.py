@@ -0,0 +1,25 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ATTN_Backend import bulk
+
+
+class Command(BaseCommand):
+    help = "Stream products, orders or ewallets to a CSV or JSONL file (stdout by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(bulk.EXPORTS))
+        parser.add_argument("path", nargs="?")
+        parser.add_argument("--format", dest="file_format", choices=bulk.FORMATS, default="csv")
+
+    def handle(self, *args, **options):
+        try:
+            lines = bulk.export_lines(options["dataset"], options["file_format"])
+            if options["path"]:
+                with open(options["path"], "w", encoding="utf-8", newline="") as out:
+                    out.writelines(lines)
+            else:
+                sys.stdout.writelines(lines)
+        except (OSError, bulk.ImportFormatError) as exc:
+            raise CommandError(str(exc))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ATTN_Backend import forecast
+
+
+class Command(BaseCommand):
+    help = "Forecast weekly demand for all active products and refresh stock notifications."
+
+    def handle(self, *args, **options):
+        created, updated, removed = forecast.run()
+        self.stdout.write(self.style.SUCCESS(
+            f"Notifications: {created} created, {updated} updated, {removed} cleared."
+        ))
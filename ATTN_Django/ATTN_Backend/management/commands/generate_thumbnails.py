@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ATTN_Backend import images
+from ATTN_Backend.models import Product
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnail and WebP variants for product images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--missing", action="store_true",
+                            help="Only products that have no variants yet.")
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(image="").exclude(image__isnull=True)
+        if options["missing"]:
+            products = products.filter(image_variants={})
+
+        done = 0
+        for product_id in products.values_list("id", flat=True).iterator():
+            try:
+                images.generate(product_id)
+                done += 1
+            except Exception as exc:
+                self.stderr.write(f"product {product_id}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Generated variants for {done} product(s)."))
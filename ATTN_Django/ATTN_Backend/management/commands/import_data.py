@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ATTN_Backend import bulk
+
+
+class Command(BaseCommand):
+    help = "Bulk-import products, orders or ewallets from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(bulk.IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--format", dest="file_format", choices=bulk.FORMATS,
+                            help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=bulk.CHUNK_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing.")
+
+    def handle(self, *args, **options):
+        file_format = options["file_format"] or options["path"].rsplit(".", 1)[-1].lower()
+        try:
+            with open(options["path"], "rb") as stream:
+                report = bulk.import_stream(
+                    options["dataset"], stream, file_format,
+                    dry_run=options["dry_run"], chunk_size=options["chunk_size"],
+                )
+        except (OSError, bulk.ImportFormatError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report.errors:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        summary = f"{report.rows} row(s): {report.created} created, {report.updated} updated, {report.error_count} error(s)"
+        if report.dry_run:
+            summary += " (dry run)"
+        self.stdout.write(self.style.SUCCESS(summary) if not report.error_count else self.style.WARNING(summary))
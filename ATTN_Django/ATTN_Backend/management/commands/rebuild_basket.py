@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ATTN_Backend import basket
+
+
+class Command(BaseCommand):
+    help = "Recompute market basket co-occurrence counts from all ordered items."
+
+    def handle(self, *args, **options):
+        baskets, pairs = basket.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Counted {pairs} product pair(s) across {baskets} basket(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ATTN_Backend import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales rollup tables from the full order history."
+
+    def handle(self, *args, **options):
+        days = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups for {days} day(s)."))
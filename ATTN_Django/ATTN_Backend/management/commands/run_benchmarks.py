@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ATTN_Backend import benchmark
+
+
+class Command(BaseCommand):
+    help = "Measure latency, throughput and query counts of the main API endpoints."
+
+    def add_arguments(self, parser):
+        names = [s.name for s in benchmark.SCENARIOS]
+        parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                            help=f"Subset to run (default: all of {', '.join(names)}).")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=1, help="Threads issuing requests at once.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--baseline", help="Results file from an earlier run to compare against.")
+        parser.add_argument("--tolerance", type=float, default=0.2,
+                            help="Allowed p50 slowdown against --baseline (0.2 = 20%%).")
+        parser.add_argument("--check", action="store_true",
+                            help="Fail if a scenario has failing requests, exceeds its query budget "
+                                 "or regresses against --baseline.")
+        parser.add_argument("--yes", action="store_true",
+                            help="Run even though the database is not on this machine (create_order writes orders).")
+
+    def handle(self, *args, **options):
+        names = {s.name for s in benchmark.SCENARIOS}
+        for name in options["scenarios"]:
+            if name not in names:
+                raise CommandError(f"Unknown scenario {name!r}; choose from {', '.join(sorted(names))}.")
+        local, database = benchmark.local_database()
+        if not local and not options["yes"]:
+            raise CommandError(
+                f"Refusing to benchmark {database}: it is not a local database and the "
+                "create_order scenario writes orders. Pass --yes to run there anyway."
+            )
+
+        scenarios = [s for s in benchmark.SCENARIOS if not options["scenarios"] or s.name in options["scenarios"]]
+        results = benchmark.run(
+            scenarios,
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            concurrency=options["concurrency"],
+        )
+
+        self.stdout.write(f"{'scenario':<16}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}{'queries':>10}{'errors':>8}")
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<16}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['throughput_rps']:>10}"
+                f"{r['queries']:>10}{r['errors']:>8}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        failures = [
+            f"{name}: {', '.join(problems)}"
+            for name, problems in benchmark.over_budget(results).items()
+        ]
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline: {exc}")
+            failures += [
+                f"{name}: {', '.join(problems)}"
+                for name, problems in benchmark.compare(results, baseline, options["tolerance"]).items()
+            ]
+
+        for failure in failures:
+            self.stderr.write(self.style.WARNING(failure))
+        if failures and options["check"]:
+            raise CommandError(f"{len(failures)} benchmark check(s) failed.")
+        self.stdout.write(self.style.SUCCESS(f"Ran {len(results)} scenario(s)."))
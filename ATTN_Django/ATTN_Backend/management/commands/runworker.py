@@ -0,0 +1,55 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ATTN_Backend import jobs
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (ATTN_Backend.jobs) until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=2, help="Worker threads per process.")
+        parser.add_argument("--processes", type=int, default=1,
+                            help="Worker processes; use more than one for CPU-bound jobs.")
+        parser.add_argument("--poll", type=float, default=1.0,
+                            help="Seconds an idle worker waits before looking for jobs again.")
+        parser.add_argument("--burst", action="store_true",
+                            help="Exit once no job is due instead of waiting for more.")
+        parser.add_argument("--prune-days", type=int,
+                            help="First delete jobs that finished more than N days ago.")
+
+    def handle(self, *args, **options):
+        threads, processes = options["threads"], options["processes"]
+        if threads < 1 or processes < 1:
+            raise CommandError("--threads and --processes must be at least 1")
+
+        if options["prune_days"] is not None:
+            self.stdout.write(f"Pruned {jobs.prune(options['prune_days'])} finished job(s).")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Running {processes} process(es) x {threads} thread(s); Ctrl+C to stop."
+        ))
+        serve_args = (threads, options["poll"], options["burst"])
+        if processes == 1:
+            jobs.serve(*serve_args)
+            return
+
+        # Forked children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        children = [context.Process(target=jobs.serve, args=serve_args) for _ in range(processes)]
+        for child in children:
+            child.start()
+
+        def stop(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()  # SIGTERM: finish the current job, then exit
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        for child in children:
+            child.join()
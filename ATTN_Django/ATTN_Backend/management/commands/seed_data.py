@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ATTN_Backend import benchmark
+from ATTN_Backend.models import OrderProducts, Product
+
+
+class Command(BaseCommand):
+    help = "Seed the database with generated products, orders and debts for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=5000)
+        parser.add_argument("--orders", type=int, default=100_000)
+        parser.add_argument("--items-per-order", type=int, default=5, help="Average lines per order.")
+        parser.add_argument("--days", type=int, default=365, help="Spread orders over this many days.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same data.")
+        parser.add_argument("--append", action="store_true", help="Allow seeding a database that already has data.")
+        parser.add_argument("--yes", action="store_true",
+                            help="Seed even though the database is not on this machine.")
+
+    def handle(self, *args, **options):
+        local, database = benchmark.local_database()
+        if not local and not options["yes"]:
+            raise CommandError(
+                f"Refusing to seed {database}: it is not a local database. "
+                "Point DATABASES at a scratch database, or pass --yes to write generated data there anyway."
+            )
+        if not options["append"] and (Product.objects.exists() or OrderProducts.objects.exists()):
+            raise CommandError("Database already has products or orders; use --append to add to it anyway.")
+
+        counts = benchmark.seed(
+            products=options["products"],
+            orders=options["orders"],
+            items_per_order=options["items_per_order"],
+            days=options["days"],
+            rng_seed=options["seed"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {counts['products']} products, {counts['orders']} orders and {counts['items']} items."
+        ))
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ATTN_Backend import ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot every product's stock from the stock ledger so stock-at-date "
+        "reports only scan movements since the last snapshot."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--as-of", help="ISO datetime to snapshot at (default: now minus the snapshot lag).")
+        parser.add_argument("--keep", type=int, help="Delete all but the newest N snapshots afterwards.")
+        parser.add_argument("--verify", action="store_true",
+                            help="Report products whose cached stock disagrees with the ledger.")
+        parser.add_argument("--repair", action="store_true",
+                            help="With --verify, reset drifted products' stock to the ledger total.")
+
+    def handle(self, *args, **options):
+        as_of = None
+        if options["as_of"]:
+            try:
+                as_of = datetime.fromisoformat(options["as_of"])
+            except ValueError as exc:
+                raise CommandError(f"--as-of: {exc}")
+            if timezone.is_naive(as_of):
+                as_of = timezone.make_aware(as_of)
+
+        rows = ledger.snapshot(as_of)
+        if rows:
+            self.stdout.write(self.style.SUCCESS(f"Snapshot of {rows} product(s) written."))
+        else:
+            self.stdout.write("A snapshot at or after that time already exists; nothing written.")
+
+        if options["keep"] is not None:
+            deleted = ledger.prune_snapshots(options["keep"])
+            self.stdout.write(f"Pruned {deleted} snapshot row(s).")
+
+        if options["verify"]:
+            drifted = ledger.repair() if options["repair"] else ledger.drift()
+            for product_id, (cached, total) in sorted(drifted.items()):
+                self.stdout.write(f"  product {product_id}: stock {cached}, ledger {total}")
+            verb = "repaired" if options["repair"] else "drifted"
+            style = self.style.SUCCESS if not drifted or options["repair"] else self.style.WARNING
+            self.stdout.write(style(f"{len(drifted)} product(s) {verb}."))
@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class RequestStats:
+    """Rolling per-endpoint samples kept in process memory."""
+
+    def __init__(self, window):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts = defaultdict(int)
+
+    def record(self, endpoint, total_ms, db_ms, queries, encode_ms):
+        with self._lock:
+            self._samples[endpoint].append((total_ms, db_ms, queries, encode_ms))
+            self._counts[endpoint] += 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def report(self):
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._samples.items()}
+            counts = dict(self._counts)
+
+        report = {}
+        for endpoint, samples in sorted(snapshot.items()):
+            columns = list(zip(*samples))
+            report[endpoint] = {
+                "requests": counts[endpoint],
+                "window": len(samples),
+                "total_ms": _percentiles(columns[0]),
+                "db_ms": _percentiles(columns[1]),
+                "queries": _percentiles(columns[2]),
+                "encode_ms": _percentiles(columns[3]),
+            }
+        return report
+
+
+def _percentiles(values):
+    ordered = sorted(values)
+    last = len(ordered) - 1
+
+    def pick(p):
+        return round(ordered[min(last, int(p * len(ordered)))], 2)
+
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": round(ordered[last], 2)}
+
+
+stats = RequestStats(_setting("ATTN_METRICS_WINDOW", 1000))
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryTimingMiddleware:
+    """
+    Measures DB query count, DB time, response encoding time and total
+    latency per URL name. Adds a Server-Timing header, keeps rolling
+    percentiles for /api/_metrics and logs requests over budget.
+    Works in front of both sync and async views.
+
+    "encode" is DRF rendering the finished Response to JSON after the view
+    returns. Building the data (serializer.data, the fast path mappers)
+    happens inside the view, so it counts under "app", together with any
+    queries it triggers under "db".
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        counter = _QueryCounter()
+        request._attn_encode = [0.0]
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            self._wrap_connections(stack, counter)
+            response = self.get_response(request)
+        return self._record(request, response, counter, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        counter = _QueryCounter()
+        request._attn_encode = [0.0]
+        start = time.perf_counter()
+        # Connections are per thread, and async views run their queries on
+        # the request's sync thread, so the wrappers have to go on there
+        stack = ExitStack()
+        await sync_to_async(self._wrap_connections)(stack, counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._record(request, response, counter, time.perf_counter() - start)
+
+    def _wrap_connections(self, stack, counter):
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(counter))
+
+    def _record(self, request, response, counter, seconds):
+        total_ms = seconds * 1000
+        db_ms = counter.seconds * 1000
+        encode_ms = request._attn_encode[0] * 1000
+
+        match = getattr(request, "resolver_match", None)
+        endpoint = match.view_name if match else "unresolved"
+        stats.record(endpoint, total_ms, db_ms, counter.count, encode_ms)
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={db_ms:.1f};desc="{counter.count} queries"',
+            f"encode;dur={encode_ms:.1f}",
+            f"app;dur={max(0.0, total_ms - db_ms - encode_ms):.1f}",
+            f"total;dur={total_ms:.1f}",
+        ])
+
+        query_budget = _setting("ATTN_QUERY_BUDGET", 20)
+        latency_budget = _setting("ATTN_LATENCY_BUDGET_MS", 500)
+        if counter.count > query_budget or total_ms > latency_budget:
+            logger.warning(
+                "%s %s over budget: %d queries (budget %d), %.0f ms (budget %d ms), db %.0f ms",
+                request.method, endpoint, counter.count, query_budget, total_ms, latency_budget, db_ms,
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF Responses are encoded after the view returns; time that step
+        started = time.perf_counter()
+
+        def rendered(resp):
+            request._attn_encode[0] += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
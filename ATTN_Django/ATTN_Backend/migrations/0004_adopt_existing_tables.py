@@ -0,0 +1,100 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# DebtPayments and Notification were added to models.py, and
+# OrderedItem.price taken out of it, without a migration. Databases that
+# were synced by hand already have the two tables, so this migration
+# records them in the migration state and only touches the schema where
+# something is actually missing. The price column is kept (made nullable
+# so inserts that no longer set it succeed) rather than dropped with its data.
+
+ADOPTED_FIELDS = [
+    ('DebtPayments', 'order'),
+    ('Notification', 'product'),
+]
+
+
+def _columns(schema_editor, table):
+    with schema_editor.connection.cursor() as cursor:
+        return {
+            column.name
+            for column in schema_editor.connection.introspection.get_table_description(cursor, table)
+        }
+
+
+def relax_price(apps, schema_editor):
+    OrderedItem = apps.get_model('ATTN_Backend', 'OrderedItem')
+    if 'price' not in _columns(schema_editor, OrderedItem._meta.db_table):
+        return
+    old_field = OrderedItem._meta.get_field('price')
+    new_field = models.FloatField(null=True)
+    new_field.set_attributes_from_name('price')
+    new_field.model = OrderedItem
+    schema_editor.alter_field(OrderedItem, old_field, new_field)
+
+
+def create_missing_tables(apps, schema_editor):
+    tables = set(schema_editor.connection.introspection.table_names())
+    for model_name, field_name in ADOPTED_FIELDS:
+        model = apps.get_model('ATTN_Backend', model_name)
+        if model._meta.db_table not in tables:
+            schema_editor.create_model(model)
+            continue
+        field = model._meta.get_field(field_name)
+        if field.column not in _columns(schema_editor, model._meta.db_table):
+            schema_editor.add_field(model, field)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0003_orderproducts_order_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(relax_price, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='DebtPayments',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('cus_name', models.CharField(max_length=255)),
+                        ('amount_paid', models.DecimalField(decimal_places=2, max_digits=10)),
+                        ('date', models.DateField()),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                    ],
+                ),
+                migrations.CreateModel(
+                    name='Notification',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('notification_type', models.CharField(choices=[('low_stock', 'Low Stock Warning'), ('out_of_stock', 'Out of Stock Alert'), ('restock_soon', 'Restock Soon')], max_length=20)),
+                        ('message', models.TextField()),
+                        ('days_until_stockout', models.IntegerField(blank=True, null=True)),
+                        ('is_read', models.BooleanField(default=False)),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                    ],
+                    options={
+                        'ordering': ['-created_at'],
+                    },
+                ),
+                migrations.RemoveField(
+                    model_name='ordereditem',
+                    name='price',
+                ),
+                migrations.AddField(
+                    model_name='debtpayments',
+                    name='order',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='ATTN_Backend.orderproducts'),
+                ),
+                migrations.AddField(
+                    model_name='notification',
+                    name='product',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ATTN_Backend.product'),
+                ),
+            ],
+        ),
+        migrations.RunPython(create_missing_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0003_orderproducts_order_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderproducts',
+            index=models.Index(fields=['-order_date', '-order_id'], name='order_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderproducts',
+            index=models.Index(fields=['status', '-order_date', '-order_id'], name='order_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderproducts',
+            index=models.Index(fields=['cus_name', '-order_date', '-order_id'], name='order_cus_date_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0005_debtpayments_updated_at_notification_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordereditem',
+            name='product',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ordered_items', to='ATTN_Backend.product'),
+        ),
+    ]
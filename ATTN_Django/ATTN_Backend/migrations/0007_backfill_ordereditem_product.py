@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:39
+
+from django.db import migrations
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_products(apps, schema_editor):
+    Product = apps.get_model('ATTN_Backend', 'Product')
+    OrderedItem = apps.get_model('ATTN_Backend', 'OrderedItem')
+
+    # Same rule order_items used: case-insensitive name match, first product wins
+    by_name = {}
+    for pk, name in Product.objects.order_by('id').values_list('id', 'name'):
+        by_name.setdefault(name.lower(), pk)
+
+    batch = []
+    for item in OrderedItem.objects.filter(product__isnull=True).only('id', 'product_name').iterator():
+        product_id = by_name.get((item.product_name or '').lower())
+        if product_id is None:
+            continue
+        item.product_id = product_id
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            OrderedItem.objects.bulk_update(batch, ['product'])
+            batch = []
+    if batch:
+        OrderedItem.objects.bulk_update(batch, ['product'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0006_ordereditem_product'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_products, migrations.RunPython.noop),
+    ]
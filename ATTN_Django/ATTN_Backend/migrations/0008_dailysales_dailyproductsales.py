@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0007_backfill_ordereditem_product'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('orders', models.IntegerField(default=0)),
+                ('total_amt', models.FloatField(default=0)),
+                ('paid_amt', models.FloatField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('product_name', models.CharField(max_length=255)),
+                ('qty', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'product_name'), name='daily_product_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0008_dailysales_dailyproductsales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BasketPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_a', models.CharField(max_length=255)),
+                ('item_b', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-count'], name='basket_pair_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item_a', 'item_b'), name='basket_pair_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0009_basketpair'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='debtpayments',
+            index=models.Index(fields=['order', 'cus_name'], name='debt_order_cus_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderproducts',
+            index=models.Index(fields=['status', 'cus_name'], name='order_status_cus_idx'),
+        ),
+    ]
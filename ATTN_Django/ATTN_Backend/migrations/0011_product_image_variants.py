@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0010_debtpayments_debt_order_cus_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:51
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0011_product_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyproductsales',
+            index=models.Index(django.db.models.functions.text.Upper('product_name'), models.F('day'), name='daily_product_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='debtpayments',
+            index=models.Index(fields=['-created_at'], name='debt_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='debtpayments',
+            index=models.Index(fields=['cus_name', '-created_at'], name='debt_cus_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['-created_at'], name='notif_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['product', 'notification_type'], name='notif_unread_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordereditem',
+            index=models.Index(fields=['product_name', 'order'], name='item_product_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='product_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'name'], name='product_active_cat_idx'),
+        ),
+    ]
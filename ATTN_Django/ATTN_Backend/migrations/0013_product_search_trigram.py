@@ -0,0 +1,43 @@
+from django.db import migrations, transaction
+
+
+# GIN trigram indexes behind /api/products/search/. pg_trgm needs
+# CREATE privilege on the database; without it the migration leaves the
+# schema alone and search falls back to the in-process n-gram index.
+
+# Product.name is stored lower-case and searched as-is; category names are
+# matched with icontains, which Django compiles to UPPER(name) LIKE UPPER(...)
+INDEXES = [
+    ("product_name_trgm_idx", '"ATTN_Backend_product"', "name gin_trgm_ops"),
+    ("category_name_trgm_idx", '"ATTN_Backend_category"', '(UPPER("name"::text)) gin_trgm_ops'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except Exception:
+        return
+    for name, table, column in INDEXES:
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column})")
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, *_ in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0012_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def opening_balances(apps, schema_editor):
+    # The ledger starts from today's stock: one adjustment per product
+    Product = apps.get_model('ATTN_Backend', 'Product')
+    StockMovement = apps.get_model('ATTN_Backend', 'StockMovement')
+    now = django.utils.timezone.now()
+    StockMovement.objects.bulk_create(
+        (
+            StockMovement(product_id=pk, kind='adjustment', qty=stock, note='opening balance', created_at=now)
+            for pk, stock in Product.objects.exclude(stock=0).values_list('id', 'stock').iterator()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0013_product_search_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sale', 'Sale'), ('restock', 'Restock'), ('adjustment', 'Adjustment'), ('return', 'Return')], max_length=20)),
+                ('qty', models.IntegerField()),
+                ('note', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='ATTN_Backend.orderproducts')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='ATTN_Backend.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'product'], name='movement_created_idx'), models.Index(fields=['product', 'created_at'], name='movement_product_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('stock', models.IntegerField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='ATTN_Backend.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('taken_at', 'product'), name='snapshot_taken_product_unique')],
+            },
+        ),
+        migrations.RunPython(opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0015_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ewallet',
+            index=models.Index(fields=['EWALL_DATE', 'EWALL_APP', 'EWALL_TYPE'], name='ewallet_date_app_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ewallet',
+            index=models.Index(fields=['EWALL_APP', 'EWALL_TYPE', '-EWALL_ID'], name='ewallet_app_type_id_idx'),
+        ),
+    ]
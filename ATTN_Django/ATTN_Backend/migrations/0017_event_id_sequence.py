@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+# Event ids for ATTN_Backend.events.PostgresBroker, shared by every worker
+# so a client's Last-Event-ID can be replayed wherever it reconnects.
+
+def create_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE SEQUENCE IF NOT EXISTS attn_event_id")
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP SEQUENCE IF EXISTS attn_event_id")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0016_ewallet_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
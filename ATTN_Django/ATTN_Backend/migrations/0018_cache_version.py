@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ATTN_Backend', '0017_event_id_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=1)),
+                ('bumped_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
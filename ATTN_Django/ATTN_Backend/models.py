@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
 from django.utils import timezone
 from datetime import date
 from django.contrib.auth.hashers import make_password, check_password
@@ -21,10 +23,19 @@ class Product(models.Model):
     is_active = models.BooleanField(default=True)
 
     image = models.ImageField(upload_to='products/', blank=True, null=True)
+    # {"thumb": "products/variants/<hash>_thumb.jpg", "thumb_webp": ...}; see ATTN_Backend.images
+    image_variants = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'ATTN_Backend_product'
+        indexes = [
+            # name__iexact compiles to UPPER(name) = UPPER(%s) on Postgres
+            models.Index(Upper('name'), name='product_name_upper_idx'),
+            # POS / inventory screens only ever browse active products
+            models.Index(fields=['category', 'name'], condition=Q(is_active=True), name='product_active_cat_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -34,6 +45,50 @@ class Product(models.Model):
         super().save(*args, **kwargs)
 
 
+class StockMovement(models.Model):
+    # Append-only stock ledger, written by ATTN_Backend.ledger. Product.stock
+    # is the running total of a product's movements; rows are never updated.
+    SALE = 'sale'
+    RESTOCK = 'restock'
+    ADJUSTMENT = 'adjustment'
+    RETURN = 'return'
+    KINDS = [
+        (SALE, 'Sale'),
+        (RESTOCK, 'Restock'),
+        (ADJUSTMENT, 'Adjustment'),
+        (RETURN, 'Return'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='movements')
+    kind = models.CharField(max_length=20, choices=KINDS)
+    qty = models.IntegerField()  # signed: sales are negative
+    order = models.ForeignKey(
+        'OrderProducts', on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements'
+    )
+    note = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # stock-at-date and movement reports scan a time window
+            models.Index(fields=['created_at', 'product'], name='movement_created_idx'),
+            models.Index(fields=['product', 'created_at'], name='movement_product_idx'),
+        ]
+
+
+class StockSnapshot(models.Model):
+    # Every product's stock as of taken_at (movements before taken_at), so
+    # stock-at-date queries only add up the movements since the last one
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='snapshots')
+    taken_at = models.DateTimeField()
+    stock = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['taken_at', 'product'], name='snapshot_taken_product_unique'),
+        ]
+
+
 class OrderProducts(models.Model):
     order_id = models.AutoField(primary_key=True)
     status = models.CharField(max_length=50)
@@ -42,6 +97,17 @@ class OrderProducts(models.Model):
     total_amt = models.FloatField()
     due_date = models.DateField(null=True, blank=True)
     order_date = models.DateField(default=date.today)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # keyset pagination + filters used by order_list
+            models.Index(fields=['-order_date', '-order_id'], name='order_date_id_idx'),
+            models.Index(fields=['status', '-order_date', '-order_id'], name='order_status_date_idx'),
+            models.Index(fields=['cus_name', '-order_date', '-order_id'], name='order_cus_date_idx'),
+            # debt ledger: pending orders grouped by customer
+            models.Index(fields=['status', 'cus_name'], name='order_status_cus_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.order_id} - {self.cus_name}"
@@ -49,11 +115,66 @@ class OrderProducts(models.Model):
 
 class OrderedItem(models.Model):
     order = models.ForeignKey(OrderProducts, on_delete=models.CASCADE, related_name="items")
-    product_name = models.CharField(max_length=255)
+    product = models.ForeignKey(
+        Product, on_delete=models.SET_NULL, null=True, blank=True, related_name="ordered_items"
+    )
+    product_name = models.CharField(max_length=255)  # kept as the name at time of sale
     qty = models.IntegerField()
     subtotal = models.FloatField()
     cost_price = models.DecimalField(null=True, blank=True, max_digits=10, decimal_places=2)
     selling_price = models.DecimalField(null=True, blank=True, max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # per-product sales history and the rollup rebuild group on the name
+            models.Index(fields=['product_name', 'order'], name='item_product_name_idx'),
+        ]
+
+
+class DailySales(models.Model):
+    # Per-day rollup of OrderProducts, maintained by ATTN_Backend.rollups
+    day = models.DateField(unique=True)
+    orders = models.IntegerField(default=0)
+    total_amt = models.FloatField(default=0)
+    paid_amt = models.FloatField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+
+class DailyProductSales(models.Model):
+    # Per-day x product rollup of OrderedItem, maintained by ATTN_Backend.rollups
+    day = models.DateField()
+    product_name = models.CharField(max_length=255)
+    qty = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'product_name'], name='daily_product_unique'),
+        ]
+        indexes = [
+            # forecast history is looked up with product_name__iexact
+            models.Index(Upper('product_name'), 'day', name='daily_product_upper_idx'),
+        ]
+
+
+class BasketPair(models.Model):
+    # Co-occurrence counts for market basket analysis (see ATTN_Backend.basket).
+    # item_a == item_b holds the number of baskets containing that item, and
+    # the row with both names blank holds the total number of baskets.
+    item_a = models.CharField(max_length=255)
+    item_b = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['item_a', 'item_b'], name='basket_pair_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['-count'], name='basket_pair_count_idx'),
+        ]
 
 
 class Ewallet(models.Model):
@@ -69,6 +190,12 @@ class Ewallet(models.Model):
 
     class Meta:
         db_table = 'ATTN_Backend_ewallet'
+        indexes = [
+            # date-range listing and the per day / app / type summary
+            models.Index(fields=['EWALL_DATE', 'EWALL_APP', 'EWALL_TYPE'], name='ewallet_date_app_type_idx'),
+            # app/type-filtered listing, newest first
+            models.Index(fields=['EWALL_APP', 'EWALL_TYPE', '-EWALL_ID'], name='ewallet_app_type_id_idx'),
+        ]
 
 
 class Account(models.Model):
@@ -105,9 +232,16 @@ class Notification(models.Model):
     days_until_stockout = models.IntegerField(null=True, blank=True)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='notif_created_idx'),
+            # the forecast only ever touches unread alerts
+            models.Index(fields=['product', 'notification_type'], condition=Q(is_read=False),
+                         name='notif_unread_product_idx'),
+        ]
 
 class DebtPayments(models.Model):
     cus_name = models.CharField(max_length=255)  # Customer name
@@ -119,7 +253,76 @@ class DebtPayments(models.Model):
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2)  # Amount paid
     date = models.DateField()  # Date of payment
     created_at = models.DateTimeField(auto_now_add=True)  # Record creation timestamp
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order', 'cus_name'], name='debt_order_cus_idx'),
+            # debtpayments lists newest first, optionally for one customer
+            models.Index(fields=['-created_at'], name='debt_created_idx'),
+            models.Index(fields=['cus_name', '-created_at'], name='debt_cus_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.cus_name} - {self.amount_paid} on {self.date} (Order ID: {self.order.id})"
 
+
+
+class Job(models.Model):
+    # Background job queue, see ATTN_Backend.jobs and manage.py runworker
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)
+    args = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # workers poll for the oldest due job
+            models.Index(fields=['run_at', 'id'], condition=Q(status='queued'), name='job_due_idx'),
+            # stale running jobs are requeued, old finished ones pruned
+            models.Index(fields=['status', 'locked_at'], name='job_status_locked_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+
+class DeletedRecord(models.Model):
+    # Tombstones so /api/sync/ can tell clients which rows disappeared
+    model = models.CharField(max_length=50)
+    object_id = models.CharField(max_length=50)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='deleted_model_at_idx'),
+        ]
+
+
+class CacheVersion(models.Model):
+    # Version of data each worker derives and keeps for itself (the catalog
+    # payload, the search index), see ATTN_Backend.versions
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=1)
+    bumped_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
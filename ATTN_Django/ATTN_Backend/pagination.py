@@ -0,0 +1,96 @@
+import base64
+import json
+
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+    if not isinstance(values, list):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE):
+    if value in (None, ""):
+        return default
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise InvalidCursor("limit must be an integer")
+    if size < 1:
+        raise InvalidCursor("limit must be positive")
+    return min(size, MAX_PAGE_SIZE)
+
+
+def keyset_page(queryset, fields, cursor=None, limit=DEFAULT_PAGE_SIZE, parsers=None, descending=True):
+    """
+    Return one page of ``queryset`` ordered on ``fields`` (descending,
+    i.e. newest first, unless ``descending`` is False) plus the cursor for
+    the next page. Works for model instances and ``.values()`` rows.
+
+    The last field must be unique so that every row has a distinct
+    position. ``parsers`` optionally maps a field name to a callable that
+    turns the JSON cursor value back into a database value (e.g. dates).
+    """
+    queryset = _position(queryset, fields, cursor, parsers, descending)
+    return _page(list(queryset[:limit + 1]), fields, limit)
+
+
+async def akeyset_page(queryset, fields, cursor=None, limit=DEFAULT_PAGE_SIZE, parsers=None, descending=True):
+    """keyset_page() for async views."""
+    queryset = _position(queryset, fields, cursor, parsers, descending)
+    return _page([row async for row in queryset[:limit + 1]], fields, limit)
+
+
+def _position(queryset, fields, cursor, parsers, descending):
+    parsers = parsers or {}
+    direction, lookup = ("-", "lt") if descending else ("", "gt")
+    queryset = queryset.order_by(*[direction + f for f in fields])
+    if not cursor:
+        return queryset
+
+    values = decode_cursor(cursor)
+    if len(values) != len(fields):
+        raise InvalidCursor("Invalid cursor")
+    try:
+        values = [parsers.get(f, lambda v: v)(v) for f, v in zip(fields, values)]
+    except (TypeError, ValueError):
+        raise InvalidCursor("Invalid cursor")
+
+    # (a, b) < (x, y)  <=>  a < x OR (a = x AND b < y)
+    position = Q()
+    for i, field in enumerate(fields):
+        clause = Q(**{f"{field}__{lookup}": values[i]})
+        for prev, value in zip(fields[:i], values[:i]):
+            clause &= Q(**{prev: value})
+        position |= clause
+    return queryset.filter(position)
+
+
+def _page(rows, fields, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        get = last.get if isinstance(last, dict) else lambda f: getattr(last, f)
+        next_cursor = encode_cursor([get(f) for f in fields])
+    return rows, next_cursor
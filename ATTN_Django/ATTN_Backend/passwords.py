@@ -0,0 +1,133 @@
+import hashlib
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ---------------------------------------------------------------------------
+# Hashing on a bounded pool
+# ---------------------------------------------------------------------------
+# PBKDF2 is deliberately slow. Run inline, a burst of logins keeps every
+# request worker busy hashing; on the pool at most ATTN_PASSWORD_HASH_WORKERS
+# hashes run at once (hashlib releases the GIL, so they use real cores) and
+# the other requests keep being served. Beyond ATTN_PASSWORD_HASH_QUEUE
+# waiting hashes, new ones are turned away with Busy instead of piling up.
+
+class Busy(Exception):
+    """Too many password hashes queued already; the client should retry later."""
+
+
+_pool = None  # ((workers, queue), executor, slots)
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    # Rebuilt if the settings change (benchmark_logins compares several)
+    global _pool
+    config = (_setting("ATTN_PASSWORD_HASH_WORKERS", 2), _setting("ATTN_PASSWORD_HASH_QUEUE", 32))
+    if _pool is None or _pool[0] != config:
+        with _pool_lock:
+            if _pool is None or _pool[0] != config:
+                if _pool is not None:
+                    _pool[1].shutdown(wait=False)
+                workers, queue = config
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="attn-passwords")
+                _pool = (config, executor, threading.BoundedSemaphore(workers + queue))
+    return _pool[1], _pool[2]
+
+
+def _run(func, *args):
+    if _setting("ATTN_PASSWORD_HASH_WORKERS", 2) <= 0:
+        return func(*args)  # hash on the request thread
+
+    executor, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise Busy()
+    try:
+        return executor.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+def hash_password(raw_password):
+    return _run(make_password, raw_password)
+
+
+def verify_password(raw_password, encoded):
+    return _run(check_password, raw_password, encoded)
+
+
+# ---------------------------------------------------------------------------
+# Login throttling
+# ---------------------------------------------------------------------------
+# Attempts are counted per username and per client IP in the cache over a
+# fixed window, and checked before any hashing. A successful login clears
+# the username's count and takes itself back off the IP's, so only failures
+# add up there and users behind one NAT or proxy do not lock each other out.
+# The counters must be shared by every worker: with more than one, CACHES
+# needs a shared backend (Redis, Memcached, database), otherwise each
+# worker allows the full limit. `manage.py check` flags LocMemCache when
+# WEB_CONCURRENCY is above 1.
+
+def client_ip(request):
+    return request.META.get("REMOTE_ADDR") or "unknown"
+
+
+def _key(kind, value):
+    digest = hashlib.sha256(str(value).lower().encode()).hexdigest()[:32]
+    return f"login:{kind}:{digest}"
+
+
+def _hit(key, window):
+    # add() starts the window; incr() counts within it. When the window
+    # opened is kept next to the count, for the time left to report.
+    if cache.add(key, 1, window):
+        cache.set(f"{key}:start", time.time(), window)
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:  # expired between add() and incr()
+        if cache.add(key, 1, window):
+            cache.set(f"{key}:start", time.time(), window)
+        return 1
+
+
+def _remaining(key, window):
+    started = cache.get(f"{key}:start")
+    if started is None:  # evicted; the whole window is the safe answer
+        return window
+    return max(1, math.ceil(started + window - time.time()))
+
+
+def throttle(request, username=None):
+    """
+    Count one attempt for the client IP (and ``username``). Returns the
+    number of seconds until every counter that is over its limit resets,
+    else None.
+    """
+    window = _setting("ATTN_LOGIN_THROTTLE_WINDOW", 300)
+    limits = [(_key("ip", client_ip(request)), _setting("ATTN_LOGIN_IP_ATTEMPTS", 30))]
+    if username:
+        limits.append((_key("user", username), _setting("ATTN_LOGIN_USER_ATTEMPTS", 5)))
+
+    over = [key for key, limit in limits if _hit(key, window) > limit]
+    return max(_remaining(key, window) for key in over) if over else None
+
+
+def succeeded(request, username):
+    """Forget ``username``'s failures and uncount this attempt for the IP."""
+    user_key = _key("user", username)
+    cache.delete_many([user_key, f"{user_key}:start"])
+    try:
+        cache.decr(_key("ip", client_ip(request)))
+    except ValueError:  # the window already expired
+        pass
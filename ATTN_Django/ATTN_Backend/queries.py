@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+
+from django.db.models import Count, F, Q, Sum
+
+from .models import OrderedItem, DailySales, DailyProductSales, Notification
+
+
+# Read querysets shared by the sync views and their async twins in
+# async_views, so both return exactly the same rows.
+
+def filter_orders(orders, params):
+    """Apply order_list's query-string filters. Raises ValueError on bad dates."""
+    if params.get("status"):
+        orders = orders.filter(status=params["status"])
+    if params.get("cus_name"):
+        orders = orders.filter(cus_name=params["cus_name"])
+    if params.get("date_from"):
+        orders = orders.filter(order_date__gte=date.fromisoformat(params["date_from"]))
+    if params.get("date_to"):
+        orders = orders.filter(order_date__lte=date.fromisoformat(params["date_to"]))
+    return orders
+
+
+def filter_ewallets(ewallets, params):
+    """Apply ewallet_list's query-string filters. Raises ValueError on bad dates."""
+    if params.get("app"):
+        ewallets = ewallets.filter(EWALL_APP=params["app"])
+    if params.get("type"):
+        ewallets = ewallets.filter(EWALL_TYPE=params["type"])
+    if params.get("date_from"):
+        ewallets = ewallets.filter(EWALL_DATE__gte=date.fromisoformat(params["date_from"]))
+    if params.get("date_to"):
+        ewallets = ewallets.filter(EWALL_DATE__lte=date.fromisoformat(params["date_to"]))
+    if params.get("q"):
+        # same fields the history page used to search client-side
+        q = params["q"]
+        match = (
+            Q(EWALL_APP__icontains=q) | Q(EWALL_TYPE__icontains=q)
+            | Q(EWALL_ACC_NAME__icontains=q) | Q(EWAL_NUM__contains=q)
+        )
+        if q.isdigit():
+            match |= Q(EWALL_ID=int(q))
+        ewallets = ewallets.filter(match)
+    return ewallets
+
+
+def ewallet_summary(ewallets):
+    """Count and amount/fee/total sums per day, app and type, newest day first."""
+    return (
+        ewallets.values(day=F("EWALL_DATE"), app=F("EWALL_APP"), type=F("EWALL_TYPE"))
+        .annotate(
+            count=Count("EWALL_ID"),
+            amount=Sum("EWALL_AMOUNT", default=0),
+            fee=Sum("EWALL_FEE", default=0),
+            total=Sum("EWALL_TOTAL", default=0),
+        )
+        .order_by(F("EWALL_DATE").desc(nulls_last=True), "EWALL_APP", "EWALL_TYPE")
+    )
+
+
+def ordered_items():
+    return OrderedItem.objects.select_related("order").all()  # ✔ only valid FK
+
+
+def analytics(today):
+    """(daily sales for the past 7 days, top 5 products) from the rollups."""
+    week_ago = today - timedelta(days=6)
+    daily_sales = (
+        DailySales.objects.filter(day__gte=week_ago, orders__gt=0)
+        .values(order_date=F("day"), total=F("total_amt"))
+        .order_by("day")
+    )
+    top_products = (
+        DailyProductSales.objects.values("product_name")
+        .annotate(total_qty=Sum("qty"))
+        .order_by("-total_qty")[:5]
+    )
+    return daily_sales, top_products
+
+
+def notifications():
+    return Notification.objects.all().values(
+        'id', 'product__name', 'notification_type', 'message',
+        'days_until_stockout', 'is_read', 'created_at'
+    )
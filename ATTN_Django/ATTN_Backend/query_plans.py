@@ -0,0 +1,82 @@
+from datetime import date
+
+from django.db import connection
+from django.db.models import Q, Sum
+
+from . import queries
+from .forecast import FORECAST_TYPES
+from .models import Product, OrderProducts, OrderedItem, DailyProductSales, Notification, DebtPayments, Ewallet
+
+
+PAGE = 51  # keyset pages fetch limit + 1 rows
+
+
+class HotQuery:
+    def __init__(self, name, build, expect_index=None):
+        self.name = name
+        self.build = build                # () -> QuerySet, as the view issues it
+        self.expect_index = expect_index  # index the Postgres plan must use
+
+    def explain(self):
+        return self.build().explain()
+
+
+# The queries behind the busiest endpoints, in the shape the views run them
+HOT_QUERIES = [
+    HotQuery("product_catalog",
+             lambda: Product.objects.filter(is_active=True).select_related("category")),
+    HotQuery("product_by_name",
+             lambda: Product.objects.filter(name__iexact="sample"),
+             "product_name_upper_idx"),
+    HotQuery("products_in_category",
+             lambda: Product.objects.filter(is_active=True, category_id=1).order_by("name"),
+             "product_active_cat_idx"),
+    HotQuery("order_list_page",
+             lambda: OrderProducts.objects.order_by("-order_date", "-order_id")[:PAGE],
+             "order_date_id_idx"),
+    HotQuery("order_list_by_status",
+             lambda: OrderProducts.objects.filter(status="Pending").order_by("-order_date", "-order_id")[:PAGE],
+             "order_status_date_idx"),
+    HotQuery("order_list_by_customer",
+             lambda: OrderProducts.objects.filter(cus_name="sample").order_by("-order_date", "-order_id")[:PAGE],
+             "order_cus_date_idx"),
+    HotQuery("order_items",
+             lambda: OrderedItem.objects.filter(order_id=1).select_related("product__category").order_by("id")),
+    HotQuery("product_sales",
+             lambda: OrderedItem.objects.filter(product_name="sample").values("product_name").annotate(
+                 qty=Sum("qty")),
+             "item_product_name_idx"),
+    HotQuery("forecast_history",
+             lambda: DailyProductSales.objects.filter(Q(product_name__iexact="sample")).values_list(
+                 "day", "product_name", "qty"),
+             "daily_product_upper_idx"),
+    HotQuery("notification_list",
+             lambda: Notification.objects.values("id", "product__name", "created_at")[:PAGE],
+             "notif_created_idx"),
+    HotQuery("unread_alerts",
+             lambda: Notification.objects.filter(product_id__in=[1], is_read=False,
+                                                 notification_type__in=FORECAST_TYPES),
+             "notif_unread_product_idx"),
+    HotQuery("debtpayments",
+             lambda: DebtPayments.objects.order_by("-created_at")[:PAGE],
+             "debt_created_idx"),
+    HotQuery("debtpayments_by_customer",
+             lambda: DebtPayments.objects.filter(cus_name="sample").order_by("-created_at"),
+             "debt_cus_created_idx"),
+    HotQuery("ewallet_list_by_app_type",
+             lambda: Ewallet.objects.filter(EWALL_APP="GCash", EWALL_TYPE="Cash In").order_by("-EWALL_ID")[:PAGE],
+             "ewallet_app_type_id_idx"),
+    HotQuery("ewallet_summary",
+             lambda: queries.ewallet_summary(Ewallet.objects.filter(EWALL_DATE__gte=date(2025, 1, 1))),
+             "ewallet_date_app_type_idx"),
+]
+
+
+def check(hot_query, plan):
+    """
+    Whether ``plan`` uses the expected index. Only Postgres plans are
+    checked: the indexes (UPPER() expressions in particular) target it.
+    """
+    if hot_query.expect_index is None or connection.vendor != "postgresql":
+        return True
+    return hot_query.expect_index in plan
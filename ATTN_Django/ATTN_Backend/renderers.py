@@ -0,0 +1,38 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on top of orjson when it is installed. Produces the same
+    bytes as the stock renderer: compact separators, unescaped unicode,
+    U+2028/U+2029 escaped, and dates, decimals etc. still go through DRF's
+    encoder. The one known difference is float notation at the extremes
+    (1e16 vs 1e+16, 0.00001 vs 1e-05), which prices and amounts never hit.
+    Indented output (?format=json; indent=...) and the browsable API use the
+    stock renderer.
+    """
+
+    OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+        if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=self.OPTIONS)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
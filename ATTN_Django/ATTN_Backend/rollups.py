@@ -0,0 +1,152 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum, Count, F, Q, Value, Case, When, DecimalField, FloatField, IntegerField
+from django.db.models.functions import Coalesce
+
+from .models import OrderProducts, OrderedItem, DailySales, DailyProductSales
+
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+PAID = "Paid"
+
+
+def _money(value):
+    return Decimal(str(value or 0))
+
+
+def increment(model, key_field, increments):
+    """
+    Add ``increments`` ({key: {field: delta}}) onto rollup rows keyed by
+    ``key_field``, creating missing rows first. Every row is updated in a
+    single UPDATE so the cost does not grow with the number of keys and
+    concurrent orders on the same day simply add up.
+    """
+    if not increments:
+        return
+
+    model.objects.bulk_create(
+        [model(**dict(zip(key_field, key))) for key in increments],
+        ignore_conflicts=True,
+    )
+
+    def match(key):
+        return Q(**dict(zip(key_field, key)))
+
+    fields = {f for deltas in increments.values() for f in deltas}
+    updates = {}
+    for field in fields:
+        output = model._meta.get_field(field)
+        updates[field] = Case(
+            *[When(match(key), then=F(field) + Value(deltas.get(field, 0), output_field=output))
+              for key, deltas in increments.items()],
+            default=F(field),
+            output_field=output,
+        )
+
+    where = Q()
+    for key in increments:
+        where |= match(key)
+    model.objects.filter(where).update(**updates)
+
+
+def record_order(order, items):
+    """Add a newly created order and its items to the rollups."""
+    record_orders([(order, items)])
+
+
+def record_orders(orders):
+    """Add many (order, items) pairs to the rollups with two UPDATEs total."""
+    zero = lambda: {"orders": 0, "total_amt": 0.0, "paid_amt": 0.0, "revenue": Decimal(0), "cost": Decimal(0)}
+    days = defaultdict(zero)
+    products = defaultdict(lambda: {"qty": 0, "revenue": Decimal(0), "cost": Decimal(0)})
+
+    for order, items in orders:
+        day = days[(order.order_date,)]
+        total = float(order.total_amt or 0)
+        day["orders"] += 1
+        day["total_amt"] += total
+        if order.status == PAID:
+            day["paid_amt"] += total
+
+        for item in items:
+            line_revenue = _money(item.selling_price) * item.qty
+            line_cost = _money(item.cost_price) * item.qty
+            day["revenue"] += line_revenue
+            day["cost"] += line_cost
+
+            row = products[(order.order_date, item.product_name)]
+            row["qty"] += item.qty
+            row["revenue"] += line_revenue
+            row["cost"] += line_cost
+
+    increment(DailySales, ["day"], dict(days))
+    increment(DailyProductSales, ["day", "product_name"], dict(products))
+
+
+def record_status_change(order, old_status):
+    """Move an order's amount in or out of the paid total."""
+    if (old_status == PAID) == (order.status == PAID):
+        return
+    delta = float(order.total_amt or 0)
+    if order.status != PAID:
+        delta = -delta
+    increment(DailySales, ["day"], {(order.order_date,): {"paid_amt": delta}})
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute both rollup tables from the full order history."""
+    DailySales.objects.all().delete()
+    DailyProductSales.objects.all().delete()
+
+    sales = _item_sales()
+    item_totals = {
+        row["order__order_date"]: row
+        for row in OrderedItem.objects.values("order__order_date").annotate(**sales)
+    }
+
+    days = []
+    order_totals = OrderProducts.objects.values("order_date").annotate(
+        n=Count("order_id"),
+        total=Coalesce(Sum("total_amt"), Value(0.0), output_field=FloatField()),
+        paid=Coalesce(Sum("total_amt", filter=Q(status=PAID)), Value(0.0), output_field=FloatField()),
+    )
+    for row in order_totals.iterator():
+        items = item_totals.get(row["order_date"], {})
+        days.append(DailySales(
+            day=row["order_date"],
+            orders=row["n"],
+            total_amt=row["total"],
+            paid_amt=row["paid"],
+            revenue=items.get("revenue") or 0,
+            cost=items.get("cost") or 0,
+        ))
+    DailySales.objects.bulk_create(days, batch_size=1000)
+
+    per_product = (
+        OrderedItem.objects.values("order__order_date", "product_name")
+        .annotate(total_qty=Coalesce(Sum("qty"), Value(0), output_field=IntegerField()), **sales)
+    )
+    DailyProductSales.objects.bulk_create(
+        (
+            DailyProductSales(
+                day=row["order__order_date"],
+                product_name=row["product_name"],
+                qty=row["total_qty"],
+                revenue=row["revenue"] or 0,
+                cost=row["cost"] or 0,
+            )
+            for row in per_product.iterator()
+        ),
+        batch_size=1000,
+    )
+    return len(days)
+
+
+def _item_sales():
+    return {
+        "revenue": Sum(F("qty") * Coalesce("selling_price", Value(0), output_field=MONEY), output_field=MONEY),
+        "cost": Sum(F("qty") * Coalesce("cost_price", Value(0), output_field=MONEY), output_field=MONEY),
+    }
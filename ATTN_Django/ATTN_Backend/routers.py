@@ -0,0 +1,69 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+_replica_reads = ContextVar("attn_replica_reads", default=False)
+
+
+def replica_alias():
+    """The configured replica alias, or None when there is no replica."""
+    alias = getattr(settings, "ATTN_REPLICA_DATABASE", "replica")
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def replica_reads():
+    """Send the ORM reads made inside this block to the replica, if any."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_from_replica(view):
+    """
+    Run a read-only view's queries against the replica. Only for views
+    that can tolerate replication lag (reports, analytics, exports of
+    history); anything that reads its own writes stays on the primary.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapped(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+    else:
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            with replica_reads():
+                return view(*args, **kwargs)
+    return wrapped
+
+
+class ReplicaRouter:
+    """
+    Writes always go to the primary. Reads go to the replica only inside
+    ``replica_reads()`` / ``@read_from_replica``, only when a replica is
+    configured, and never while the primary has a transaction open (so a
+    transaction always sees its own writes).
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        alias = replica_alias()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as the primary
+        return True
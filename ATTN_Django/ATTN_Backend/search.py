@@ -0,0 +1,211 @@
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from . import versions
+from .fastpath import mapper
+from .models import Category, Product
+from .serializers import ProductSerializer
+
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+# Minimum share of the query's trigrams a name must contain to count as a
+# fuzzy match. 0.3 is pg_trgm's similarity_threshold default; its
+# word_similarity_threshold default (0.6) misses one-letter typos in short
+# words ("coka" shares 2 of 5 trigrams with "coca"), so the Postgres
+# backend sets it to this value for its query too.
+SIMILARITY_THRESHOLD = 0.3
+
+VERSION_NAME = "search"
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+# ---------------------------------------------------------------------------
+# Ranking shared by both backends
+# ---------------------------------------------------------------------------
+#   3  name starts with the query
+#   2  a word in the name starts with the query
+#   1  the query appears anywhere in the name
+#   0  category name match, or typo-tolerant (trigram) match only
+# ties are broken by similarity, then name.
+
+def normalize(term):
+    return " ".join(_WORD.findall(term.lower()))
+
+
+def _rank(name, term):
+    if name.startswith(term):
+        return 3
+    if f" {term}" in name:
+        return 2
+    if term in name:
+        return 1
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Postgres: pg_trgm + GIN index (migration 0013)
+# ---------------------------------------------------------------------------
+
+_has_trigram = None
+
+
+def trigram_available():
+    """Whether the database can serve searches from pg_trgm (checked once)."""
+    global _has_trigram
+    if _has_trigram is None:
+        _has_trigram = False
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                _has_trigram = cursor.fetchone() is not None
+    return _has_trigram
+
+
+def _trigram_search(term, category_id, limit):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    # Product.name is stored lower-case, so plain LIKE / %> use the GIN index
+    matches = Q(name__contains=term) | Q(name__trigram_word_similar=term)
+    category_ids = list(Category.objects.filter(name__icontains=term).values_list("id", flat=True))
+    if category_ids:
+        matches |= Q(category_id__in=category_ids)
+
+    products = Product.objects.filter(matches, is_active=True)
+    if category_id is not None:
+        products = products.filter(category_id=category_id)
+
+    products = products.annotate(
+        rank=Case(
+            When(name__startswith=term, then=Value(3)),
+            When(name__contains=f" {term}", then=Value(2)),
+            When(name__contains=term, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        similarity=TrigramWordSimilarity(term, "name"),
+    ).order_by("-rank", "-similarity", "name")
+
+    serialize = mapper(ProductSerializer)
+    with transaction.atomic():
+        # %> compares against word_similarity_threshold; set it for this transaction only
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(SIMILARITY_THRESHOLD)]
+            )
+        return serialize.map(serialize.queryset(products)[:limit])
+
+
+# ---------------------------------------------------------------------------
+# Fallback: in-process trigram index
+# ---------------------------------------------------------------------------
+
+def trigrams(text):
+    """pg_trgm-style trigrams: per word, padded with two spaces in front and one after."""
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """Trigram postings over the active catalog's product and category names."""
+
+    def __init__(self, version):
+        self.version = version
+        self.names = {}
+        self.categories = {}
+        self.postings = defaultdict(set)
+        self.by_category_name = defaultdict(set)
+
+        rows = Product.objects.filter(is_active=True).values_list("id", "name", "category_id", "category__name")
+        for product_id, name, category_id, category_name in rows.iterator():
+            name = normalize(name)
+            self.names[product_id] = name
+            self.categories[product_id] = category_id
+            for gram in trigrams(name):
+                self.postings[gram].add(product_id)
+            if category_name:
+                self.by_category_name[category_name.lower()].add(product_id)
+
+    def search(self, term, category_id=None, limit=DEFAULT_LIMIT):
+        grams = trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        category_hits = set()
+        for category_name, ids in self.by_category_name.items():
+            if term in category_name:
+                category_hits |= ids
+
+        scored = []
+        for product_id in shared.keys() | category_hits:
+            if category_id is not None and self.categories[product_id] != category_id:
+                continue
+            name = self.names[product_id]
+            rank = _rank(name, term)
+            similarity = shared[product_id] / len(grams) if grams else 0
+            if rank or similarity >= SIMILARITY_THRESHOLD or product_id in category_hits:
+                scored.append((-rank, -similarity, name, product_id))
+        scored.sort()
+        return [product_id for *_, product_id in scored[:limit]]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def current_version():
+    return versions.current(VERSION_NAME)[0]
+
+
+def invalidate():
+    """
+    Mark every worker's in-process index stale once the transaction
+    commits. The version is shared through the database (see
+    ATTN_Backend.versions), so other workers rebuild within
+    ATTN_CACHE_VERSION_TTL seconds.
+    """
+    versions.bump(VERSION_NAME)
+
+
+def get_index():
+    """The in-process index, rebuilt when a product or category changed."""
+    global _index
+    version = current_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = NgramIndex(version)
+            index = _index
+    return index
+
+
+def _ngram_search(term, category_id, limit):
+    ids = get_index().search(term, category_id, limit)
+    serialize = mapper(ProductSerializer)
+    rows = {row["id"]: row for row in serialize(Product.objects.filter(id__in=ids))}
+    return [rows[i] for i in ids if i in rows]
+
+
+# ---------------------------------------------------------------------------
+
+def search(query, category_id=None, limit=DEFAULT_LIMIT):
+    """
+    Active products matching ``query`` by name prefix, substring, category
+    name or approximate spelling, best matches first. Returns
+    (backend name, serialized products).
+    """
+    term = normalize(query)
+    if not term:
+        return None, []
+    if trigram_available():
+        return "trigram", _trigram_search(term, category_id, limit)
+    return "ngram", _ngram_search(term, category_id, limit)
@@ -1,3 +1,4 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from .models import Product, Category, OrderProducts, OrderedItem, Ewallet, Account, DebtPayments
 
@@ -16,14 +17,20 @@ class ProductSerializer(serializers.ModelSerializer):
         required=False
     )
     display_name = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = '__all__'
+        extra_kwargs = {'image_variants': {'read_only': True}}
 
     def get_display_name(self, obj):
         return obj.name.title()
 
+    def get_thumbnails(self, obj):
+        # {"thumb": url, "thumb_webp": url, "medium": url, "medium_webp": url}
+        return {name: default_storage.url(path) for name, path in (obj.image_variants or {}).items()}
+
 
 class EwalletSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,49 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import catalog, events, ledger, search
+from .models import DeletedRecord, Notification, Product, Category
+from .sync import SYNC_TABLES, model_label
+
+
+SYNCED_MODELS = tuple(model for model, _, _ in SYNC_TABLES.values())
+
+
+@receiver(post_delete)
+def record_deletion(sender, instance, **kwargs):
+    if sender not in SYNCED_MODELS:
+        return
+    DeletedRecord.objects.create(model=model_label(sender), object_id=str(instance.pk))
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification(sender, instance, created, **kwargs):
+    if not created:
+        return
+    events.publish(events.NOTIFICATION_CREATED, {
+        "id": instance.id,
+        "product__name": instance.product.name,
+        "notification_type": instance.notification_type,
+        "message": instance.message,
+        "days_until_stockout": instance.days_until_stockout,
+        "is_read": instance.is_read,
+        "created_at": instance.created_at,
+    })
+
+
+@receiver(post_save, sender=Product)
+def record_opening_stock(sender, instance, created, raw=False, **kwargs):
+    # Every way of creating a product (API, admin, Product.objects.create)
+    # books its starting stock, so the ledger adds up to Product.stock.
+    # bulk_create() sends no signals; its callers call ledger.opening().
+    if created and not raw:
+        ledger.opening([instance])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog(sender, **kwargs):
+    catalog.invalidate()
+    search.invalidate()
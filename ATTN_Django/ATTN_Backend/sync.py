@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+from .models import (
+    Product, OrderProducts, OrderedItem,
+    DebtPayments, Notification, DeletedRecord
+)
+from .pagination import InvalidCursor, encode_cursor, decode_cursor
+from .serializers import (
+    ProductSerializer, OrderProductsSerializer,
+    OrderedItemSerializer, DebtPaymentSerializer
+)
+
+
+# Rows committed by a transaction that started before the token was issued
+# can carry an updated_at slightly older than the token. Re-sending a short
+# window on every poll catches them; clients upsert by id so repeats are harmless.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def _notification_rows(queryset):
+    return list(queryset.values(
+        'id', 'product__name', 'notification_type', 'message',
+        'days_until_stockout', 'is_read', 'created_at'
+    ))
+
+
+# name -> (model, queryset factory, row serializer)
+SYNC_TABLES = {
+    "orders": (
+        OrderProducts,
+        lambda: OrderProducts.objects.all(),
+        lambda qs: OrderProductsSerializer(qs, many=True).data,
+    ),
+    "ordered_items": (
+        OrderedItem,
+        lambda: OrderedItem.objects.select_related("order"),
+        lambda qs: OrderedItemSerializer(qs, many=True).data,
+    ),
+    "products": (
+        Product,
+        lambda: Product.objects.select_related("category"),
+        lambda qs: ProductSerializer(qs, many=True).data,
+    ),
+    "debt_payments": (
+        DebtPayments,
+        lambda: DebtPayments.objects.all(),
+        lambda qs: DebtPaymentSerializer(qs, many=True).data,
+    ),
+    "notifications": (
+        Notification,
+        lambda: Notification.objects.all(),
+        _notification_rows,
+    ),
+}
+
+
+def model_label(model):
+    return model._meta.model_name
+
+
+def make_token(moment):
+    return encode_cursor([moment.isoformat()])
+
+
+def parse_token(token):
+    try:
+        moment = datetime.fromisoformat(decode_cursor(token)[0])
+    except (IndexError, TypeError, ValueError):
+        raise InvalidCursor("Invalid sync token")
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+def changes_since(token=None, tables=None):
+    """
+    Rows inserted/updated and ids deleted since ``token``.
+
+    With no token every row is returned (initial load). The response
+    carries a fresh token for the next call.
+    """
+    tables = tables or list(SYNC_TABLES)
+    unknown = [t for t in tables if t not in SYNC_TABLES]
+    if unknown:
+        raise InvalidCursor(f"Unknown table(s): {', '.join(unknown)}")
+
+    now = timezone.now()
+    since = parse_token(token) - SYNC_OVERLAP if token else None
+
+    result = {"token": make_token(now), "full": since is None}
+    for name in tables:
+        model, queryset, serialize = SYNC_TABLES[name]
+        changed = queryset()
+        deleted = []
+        if since is not None:
+            changed = changed.filter(updated_at__gt=since)
+            deleted = [
+                model._meta.pk.to_python(object_id)
+                for object_id in DeletedRecord.objects.filter(
+                    model=model_label(model), deleted_at__gt=since
+                ).values_list("object_id", flat=True)
+            ]
+        result[name] = {"changed": serialize(changed), "deleted": deleted}
+
+    return result
@@ -0,0 +1,14 @@
+# Background tasks run by manage.py runworker (see ATTN_Backend.jobs).
+# Registered when the app is ready; arguments are plain JSON values.
+
+from . import forecast, images, jobs
+
+
+@jobs.task("forecast")
+def refresh_forecast(product_ids=None):
+    forecast.run(product_ids)
+
+
+@jobs.task("thumbnails")
+def generate_thumbnails(product_id):
+    images.generate(product_id)
@@ -1,3 +1,891 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from . import basket, benchmark, bulk, catalog, checks, images, jobs, ledger, passwords, rollups, search
+from .fastpath import mapper
+from .renderers import ORJSONRenderer
+from .routers import replica_reads
+from .serializers import EwalletSerializer, OrderProductsSerializer, OrderedItemSerializer, ProductSerializer
+from .models import (
+    Account, BasketPair, CacheVersion, Category, DailyProductSales, DailySales, DebtPayments, DeletedRecord, Ewallet, Job,
+    OrderProducts, OrderedItem,
+    Product, StockMovement,
+)
+
+
+def _product(name="widget", stock=10, price="2.00"):
+    return Product.objects.create(name=name, stock=stock, cost_price=Decimal("1.00"), selling_price=Decimal(price))
+
+
+def _order_body(*lines):
+    items = [
+        {
+            "product_id": product.id,
+            "product_name": product.name,
+            "qty": qty,
+            "cost_price": str(product.cost_price),
+            "selling_price": str(product.selling_price),
+            "subtotal": float(product.selling_price * qty),
+        }
+        for product, qty in lines
+    ]
+    return {"status": "Paid", "cus_name": "test", "total_amt": sum(i["subtotal"] for i in items), "items": items}
+
+
+class OrderPaginationTests(TestCase):
+    def setUp(self):
+        # Three orders share a day so the order_id tie-break is exercised
+        days = [date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 2), date(2026, 3, 2), date(2026, 3, 3)]
+        self.orders = [
+            OrderProducts.objects.create(status="Paid", cus_name=f"c{i}", total_amt=1, order_date=day)
+            for i, day in enumerate(days)
+        ]
+
+    def get(self, **params):
+        return self.client.get("/api/orders/", params)
+
+    def walk(self, limit, **params):
+        ids, cursor = [], None
+        while True:
+            page = self.get(limit=limit, **({"cursor": cursor} if cursor else {}), **params).json()
+            ids += [row["order_id"] for row in page["results"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return ids
+
+    def test_pages_cover_every_order_once_newest_first(self):
+        expected = [o.order_id for o in sorted(self.orders, key=lambda o: (o.order_date, o.order_id), reverse=True)]
+        for limit in (1, 2, 3, 5):
+            self.assertEqual(self.walk(limit), expected)
+
+    def test_ties_on_the_date_keep_a_stable_order(self):
+        first = self.get(limit=2).json()
+        second = self.get(limit=2, cursor=first["next_cursor"]).json()
+        same_day = [o.order_id for o in self.orders if o.order_date == date(2026, 3, 2)]
+
+        ids = [row["order_id"] for row in first["results"] + second["results"]]
+        self.assertEqual(ids[1:4], sorted(same_day, reverse=True))
+        self.assertEqual(second, self.get(limit=2, cursor=first["next_cursor"]).json())
+
+    def test_filters_apply_across_pages(self):
+        OrderProducts.objects.create(status="Pending", cus_name="x", total_amt=1, order_date=date(2026, 3, 2))
+        self.assertEqual(len(self.walk(2, status="Paid")), len(self.orders))
+
+    def test_bad_cursor_or_limit_is_a_400(self):
+        for params in ({"cursor": "not-a-cursor"}, {"cursor": "WzFd"}, {"limit": "lots"}, {"limit": 0}):
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("error", response.json())
+
+    def test_without_cursor_or_limit_the_full_list_is_returned(self):
+        self.assertEqual(len(self.get().json()), len(self.orders))
+
+
+class SyncTests(TestCase):
+    def setUp(self):
+        self.kept, self.edited, self.removed = [
+            OrderProducts.objects.create(status="Pending", cus_name=name, total_amt=1) for name in ("a", "b", "c")
+        ]
+        self.token = self.sync()["token"]
+        # Everything above happened well before the token's overlap window
+        OrderProducts.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def sync(self, **params):
+        response = self.client.get("/api/sync/", {"tables": "orders", **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_sync_is_a_full_load(self):
+        data = self.sync()
+        self.assertTrue(data["full"])
+        self.assertEqual(len(data["orders"]["changed"]), 3)
+
+    def test_only_rows_changed_since_the_token_and_tombstones_come_back(self):
+        self.edited.status = "Paid"
+        self.edited.save()
+        removed_id = self.removed.pk
+        self.removed.delete()
+        DeletedRecord.objects.create(model="orderproducts", object_id="999")
+        DeletedRecord.objects.filter(object_id="999").update(deleted_at=timezone.now() - timedelta(hours=1))
+
+        data = self.sync(since=self.token)
+        self.assertFalse(data["full"])
+        self.assertEqual([row["order_id"] for row in data["orders"]["changed"]], [self.edited.pk])
+        self.assertEqual(data["orders"]["changed"][0]["status"], "Paid")
+        self.assertEqual(data["orders"]["deleted"], [removed_id])
+        self.assertNotEqual(data["token"], self.token)
+
+    def test_bad_token_or_table_is_a_400(self):
+        self.assertEqual(self.client.get("/api/sync/", {"since": "junk"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/sync/", {"tables": "nope"}).status_code, 400)
+
+
+class CreateOrderTests(TestCase):
+    def setUp(self):
+        self.pen = _product("pen", stock=5)
+        self.ink = _product("ink", stock=1)
+
+    def post(self, body):
+        return self.client.post("/api/create-order/", json.dumps(body), content_type="application/json")
+
+    def test_order_decrements_stock_and_books_sales(self):
+        response = self.post(_order_body((self.pen, 2), (self.ink, 1)))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Product.objects.get(pk=self.pen.pk).stock, 3)
+        self.assertEqual(Product.objects.get(pk=self.ink.pk).stock, 0)
+        self.assertFalse(Product.objects.get(pk=self.ink.pk).stock_status)
+        order = OrderProducts.objects.get()
+        self.assertEqual(OrderedItem.objects.filter(order=order).count(), 2)
+        self.assertEqual(
+            dict(StockMovement.objects.filter(order=order).values_list("product_id", "qty")),
+            {self.pen.pk: -2, self.ink.pk: -1},
+        )
+        self.assertEqual(ledger.drift(), {})
+
+    def test_short_stock_writes_nothing(self):
+        response = self.post(_order_body((self.pen, 1), (self.ink, 2)))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ink", response.json()["error"])
+        self.assertFalse(OrderProducts.objects.exists())
+        self.assertFalse(OrderedItem.objects.exists())
+        self.assertEqual(Product.objects.get(pk=self.pen.pk).stock, 5)
+
+    def test_unknown_product_writes_nothing(self):
+        body = _order_body((self.pen, 1))
+        body["items"][0]["product_id"] = 10 ** 6
+
+        self.assertEqual(self.post(body).status_code, 400)
+        self.assertFalse(OrderProducts.objects.exists())
+
+    def test_stock_taken_after_validation_rolls_the_order_back(self):
+        # Another checkout sold the ink after this one read it
+        stale = Product.objects.get(pk=self.ink.pk)
+        stale.stock = 5
+        with mock.patch("django.db.models.query.QuerySet.in_bulk", return_value={self.ink.pk: stale}):
+            response = self.post(_order_body((self.ink, 2)))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(OrderProducts.objects.exists())
+        self.assertFalse(StockMovement.objects.filter(kind=StockMovement.SALE).exists())
+        self.assertEqual(Product.objects.get(pk=self.ink.pk).stock, 1)
+
+
+ORDERS_CSV = """order_ref,status,cus_name,total_amt,order_date,product_name,qty,subtotal,cost_price,selling_price
+1,Paid,ann,7,2026-03-01,Pen,2,4,1,2
+1,Paid,ann,7,2026-03-01,Ink,1,3,2,3
+2,Pending,bob,5,2026-03-01,pen,1,2,1,2
+2,Pending,bob,5,2026-03-01,Paper,1,3,1,3
+3,Paid,cy,3,2026-03-02,ink,1,3,2,3
+"""
+
+
+def _import_orders():
+    return bulk.import_stream("orders", io.BytesIO(ORDERS_CSV.encode()), "csv").as_dict()
+
+
+class RollupTests(TestCase):
+    # The counters maintained on every write must always equal what a
+    # rebuild from the order history produces
+
+    def snapshot(self):
+        return (
+            sorted(DailySales.objects.values_list("day", "orders", "total_amt", "paid_amt", "revenue", "cost")),
+            sorted(DailyProductSales.objects.values_list("day", "product_name", "qty", "revenue", "cost")),
+        )
+
+    def test_incremental_rollups_match_a_rebuild(self):
+        report = _import_orders()
+        self.assertEqual((report["created"], report["error_count"]), (3, 0))
+        pen, ink = _product("pen", stock=10), _product("ink", stock=10, price="3.00")
+        response = self.client.post(
+            "/api/create-order/", json.dumps(_order_body((pen, 2), (ink, 1))), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        pending = OrderProducts.objects.get(cus_name="bob")
+        response = self.client.patch(
+            f"/api/orders/{pending.pk}/", json.dumps({"status": "Paid"}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        incremental = self.snapshot()
+        self.assertTrue(all(incremental))
+        rollups.rebuild()
+        self.assertEqual(self.snapshot(), incremental)
+
+
+class BasketTests(TestCase):
+    def setUp(self):
+        _import_orders()
+        pen, ink = _product("pen", stock=10), _product("ink", stock=10)
+        response = self.client.post(
+            "/api/create-order/", json.dumps(_order_body((pen, 1), (ink, 1))), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def counts(self):
+        return {(a, b): c for a, b, c in BasketPair.objects.values_list("item_a", "item_b", "count")}
+
+    def test_incremental_counts_match_a_rebuild(self):
+        incremental = self.counts()
+        basket.rebuild()
+        self.assertEqual(self.counts(), incremental)
+
+    def test_names_are_counted_case_insensitively(self):
+        counts = self.counts()
+        self.assertEqual(counts[basket.TOTAL], 4)
+        self.assertEqual((counts[("pen", "pen")], counts[("ink", "ink")]), (3, 3))
+        self.assertEqual((counts[("ink", "pen")], counts[("paper", "pen")]), (2, 1))
+
+    def test_endpoint_reports_pairs_above_the_lift_threshold(self):
+        results = self.client.get("/api/analytics/basket/", {"min_count": 1}).json()
+
+        self.assertEqual([(r["product1"], r["product2"]) for r in results], [("Paper", "Pen")])
+        self.assertAlmostEqual(results[0]["lift"], 4 / 3)
+        self.assertEqual(self.client.get("/api/analytics/basket/", {"limit": "x"}).status_code, 400)
+
+
+@override_settings(ATTN_CACHE_VERSION_TTL=0)
+class CatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _product("pen")
+
+    def test_unchanged_catalog_is_not_modified(self):
+        first = self.client.get("/api/products/")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([p["name"] for p in first.json()], ["pen"])
+
+        again = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_product_change_changes_the_etag(self):
+        etag = self.client.get("/api/products/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            _product("ink")
+
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(sorted(p["name"] for p in response.json()), ["ink", "pen"])
+
+    def test_version_bumped_elsewhere_is_seen(self):
+        # What another worker's invalidate() leaves behind: only the row changed
+        etag = catalog.current_version()[0]
+        CacheVersion.objects.filter(name=catalog.VERSION_NAME).update(version=100)
+        self.assertNotEqual(catalog.current_version()[0], etag)
+
+
+class DebtLedgerTests(TestCase):
+    def setUp(self):
+        def order(cus_name, total, day, status="Pending"):
+            return OrderProducts.objects.create(status=status, cus_name=cus_name, total_amt=total, order_date=day)
+
+        self.ann_old = order("ann", 10, date(2026, 3, 1))
+        self.ann_new = order("ann", 5, date(2026, 3, 2))
+        order("bob", 8, date(2026, 3, 1))
+        order(None, 4, date(2026, 3, 1))
+        paid = order("cy", 20, date(2026, 3, 1), status="Paid")
+        for target, amount in ((self.ann_old, 3), (self.ann_old, 2), (paid, 20)):
+            DebtPayments.objects.create(order=target, cus_name=target.cus_name, amount_paid=amount, date=target.order_date)
+
+    def get(self, **params):
+        response = self.client.get("/api/debts/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_balances_per_customer(self):
+        data = self.get()
+        self.assertEqual(data["total_pending"], 22)
+        self.assertEqual(
+            [(row["cus_name"], row["total_pending"], row["orders"]) for row in data["results"]],
+            [(None, 4, 1), ("ann", 10, 2), ("bob", 8, 1)],
+        )
+
+    def test_customers_page_and_search(self):
+        first = self.get(limit=2)
+        second = self.get(limit=2, cursor=first["next_cursor"])
+        self.assertEqual([row["cus_name"] for row in first["results"] + second["results"]], [None, "ann", "bob"])
+        self.assertIsNone(second["next_cursor"])
+
+        self.assertEqual([row["cus_name"] for row in self.get(search="AN")["results"]], ["ann"])
+
+    def test_one_customer_lists_pending_orders_newest_first(self):
+        first = self.get(customer="ann", limit=1)
+        second = self.get(customer="ann", limit=1, cursor=first["next_cursor"])
+        rows = first["results"] + second["results"]
+
+        self.assertEqual([row["order_id"] for row in rows], [self.ann_new.pk, self.ann_old.pk])
+        self.assertEqual([(row["paid"], row["remaining_amt"]) for row in rows], [(0, 5), (5, 5)])
+        self.assertEqual(first["total_pending"], 10)
+
+    def test_bad_cursor_is_a_400(self):
+        self.assertEqual(self.client.get("/api/debts/", {"cursor": "junk"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/debts/", {"customer": "ann", "cursor": "WzFd"}).status_code, 400)
+
+    def test_payments_filter_by_customer(self):
+        payments = self.client.get("/api/debtpayments/", {"customer": "ann"}).json()
+        self.assertEqual(sorted(float(p["amount_paid"]) for p in payments), [2, 3])
+
+
+class BulkImportTests(TestCase):
+    def run_import(self, text):
+        return bulk.import_stream("products", io.BytesIO(text.encode()), "csv").as_dict()
+
+    def test_update_books_the_stock_difference(self):
+        pen = _product("pen", stock=5)
+        report = self.run_import(f"id,name,stock,cost_price,selling_price\n{pen.pk},pen,8,1,2\n")
+
+        self.assertEqual((report["created"], report["updated"], report["error_count"]), (0, 1, 0))
+        self.assertEqual(Product.objects.get(pk=pen.pk).stock, 8)
+        self.assertEqual(
+            list(StockMovement.objects.filter(product=pen).order_by("id").values_list("qty", flat=True)),
+            [5, 3],
+        )
+        self.assertEqual(ledger.drift(), {})
+
+    def test_restored_ids_do_not_collide_with_new_products(self):
+        restored_id = _product("pen").pk + 50
+        report = self.run_import(f"id,name,stock,cost_price\n{restored_id},restored,4,1\n")
+
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(Product.objects.get(pk=restored_id).stock, 4)
+        self.assertGreater(_product("after").pk, restored_id)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        report = self.run_import("name,stock,cost_price\nok,1,1\nbroken,lots,1\n")
+
+        self.assertEqual((report["created"], report["error_count"]), (1, 1))
+        self.assertEqual(report["errors"][0]["row"], 3)
+        self.assertFalse(Product.objects.filter(name="broken").exists())
+
+    def test_columns_left_out_of_an_update_keep_their_value(self):
+        pen = _product("pen", stock=5, price="2.50")
+        report = self.run_import(f"id,name,cost_price\n{pen.pk},pen,1.20\n")
+
+        self.assertEqual((report["updated"], report["error_count"]), (1, 0))
+        pen.refresh_from_db()
+        self.assertEqual((pen.stock, pen.selling_price, pen.cost_price), (5, Decimal("2.50"), Decimal("1.20")))
+
+    def test_unreadable_files_are_a_400_naming_the_line(self):
+        upload = SimpleUploadedFile("products.csv", b"name,stock,cost_price\nok,1,1\nbr\xffoken,1,1\n")
+        response = self.client.post("/api/import/products/", {"file": upload})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Line 3", response.json()["error"])
+
+    def test_broken_csv_names_the_line(self):
+        with self.assertRaisesMessage(bulk.ImportFormatError, "Line 3"):
+            self.run_import("name,stock,cost_price\nok,1,1\n" + "x" * 200_000 + ",1,1\n")
+
+    def test_orders_need_an_order_ref(self):
+        with self.assertRaisesMessage(bulk.ImportFormatError, "order_ref"):
+            bulk.import_stream("orders", io.BytesIO(b"status,total_amt,product_name,qty,subtotal\nPaid,2,pen,1,2\n"), "csv")
+
+        csv_text = ORDERS_CSV.replace("3,Paid,cy", ",Paid,cy")
+        report = bulk.import_stream("orders", io.BytesIO(csv_text.encode()), "csv").as_dict()
+        self.assertEqual((report["created"], report["error_count"]), (2, 1))
+        self.assertEqual(report["errors"][0]["row"], 6)
+
+
+
+def _png(color):
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.new("RGB", (600, 400), color).save(out, "PNG")
+    return SimpleUploadedFile("photo.png", out.getvalue(), content_type="image/png")
+
+
+class ProductImageTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def upload(self, product, color):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f"/api/products/{product.pk}/", encode_multipart(BOUNDARY, {"image": _png(color)}),
+                content_type=MULTIPART_CONTENT,
+            )
+        self.assertEqual(response.status_code, 200)
+        product.refresh_from_db()
+        return product.image_variants
+
+    def test_upload_generates_hashed_variants(self):
+        variants = self.upload(_product("pen"), "red")
+
+        self.assertEqual(set(variants), {"thumb", "thumb_webp", "medium", "medium_webp"})
+        self.assertTrue(all(default_storage.exists(path) for path in variants.values()))
+
+    def test_clearing_the_image_drops_its_variants(self):
+        pen = _product("pen")
+        variants = self.upload(pen, "red")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f"/api/products/{pen.pk}/", json.dumps({"image": None}), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+        pen.refresh_from_db()
+        self.assertEqual((bool(pen.image), pen.image_variants), (False, {}))
+        self.assertFalse(any(default_storage.exists(path) for path in variants.values()))
+
+    def test_variants_shared_with_another_product_are_kept(self):
+        pen, ink = _product("pen"), _product("ink")
+        variants = self.upload(pen, "red")
+        self.assertEqual(self.upload(ink, "red"), variants)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pen.image = None
+            images.clear(pen)
+            pen.save()
+        self.assertTrue(all(default_storage.exists(path) for path in variants.values()))
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        self.client.delete("/api/_metrics")
+
+    def test_requests_are_timed_and_reported(self):
+        _product("pen")
+        response = self.client.get("/api/ordereditem/")
+        timings = {part.split(";")[0] for part in response["Server-Timing"].split(", ")}
+        self.assertEqual(timings, {"db", "encode", "app", "total"})
+
+        report = self.client.get("/api/_metrics").json()["endpoints"]["ordered_item"]
+        self.assertEqual(report["requests"], 1)
+        self.assertEqual(set(report), {"requests", "window", "total_ms", "db_ms", "queries", "encode_ms"})
+
+
+@override_settings(ALLOWED_HOSTS=[benchmark.HOST], ATTN_JOBS_EAGER=False)
+class BenchmarkSmokeTests(TestCase):
+    # The scenarios must reach the views: a 400 from host validation once
+    # made every scenario "pass" with zero queries. (Under the test runner
+    # DEBUG is off, so localhost is allowed explicitly.)
+    def test_scenarios_succeed_within_budget(self):
+        benchmark.seed(products=20, orders=40, categories=3, days=10)
+        results = benchmark.run(iterations=2, warmup=1)
+
+        self.assertEqual(set(results), {s.name for s in benchmark.SCENARIOS})
+        self.assertEqual(benchmark.over_budget(results), {})
+
+
+class AsyncConnectionCheckTests(TestCase):
+    def test_persistent_connections_are_refused_with_async_views(self):
+        with mock.patch.dict(settings.DATABASES["default"], CONN_MAX_AGE=600):
+            with override_settings(ATTN_ASYNC_VIEWS=True):
+                self.assertEqual([e.id for e in checks.check_async_connections(None)], ["ATTN_Backend.E003"])
+            with override_settings(ATTN_ASYNC_VIEWS=False):
+                self.assertEqual(checks.check_async_connections(None), [])
+        with mock.patch.dict(settings.DATABASES["default"], CONN_MAX_AGE=0), override_settings(ATTN_ASYNC_VIEWS=True):
+            self.assertEqual(checks.check_async_connections(None), [])
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    # TestCase wraps every test in a transaction, which by design keeps all
+    # reads on the primary; the replica is a second SQLite file added at
+    # runtime with only the product tables and rows of its own.
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        replica = {"ENGINE": "django.db.backends.sqlite3", "NAME": f"{tmp.name}/replica.sqlite3"}
+        connections.configure_settings({"default": settings.DATABASES["default"], "replica": replica})
+        self.enterContext(mock.patch.dict(settings.DATABASES, {"replica": replica}))
+        self.enterContext(mock.patch.object(type(self), "databases", {"default", "replica"}))
+        self.addCleanup(self.drop_replica_connection)
+        with connections["replica"].schema_editor() as editor:
+            editor.create_model(Category)
+            editor.create_model(Product)
+
+        _product("primary")
+        Product.objects.using("replica").create(name="replica", cost_price=1)
+
+    def drop_replica_connection(self):
+        connections["replica"].close()
+        del connections["replica"]
+
+    def names(self):
+        return list(Product.objects.values_list("name", flat=True))
+
+    def test_reads_go_to_the_replica_only_when_asked(self):
+        self.assertEqual(self.names(), ["primary"])
+        with replica_reads():
+            self.assertEqual(self.names(), ["replica"])
+
+    def test_transactions_read_from_the_primary(self):
+        with replica_reads(), transaction.atomic():
+            self.assertEqual(self.names(), ["primary"])
+
+    def test_marked_views_read_from_the_replica(self):
+        response = self.client.get("/ATTN_Backend/web_desc/")
+        self.assertEqual([p["name"] for p in response.json()["recipes"]], ["replica"])
+
+    def test_writes_go_to_the_primary(self):
+        with replica_reads():
+            _product("written")
+        self.assertEqual(sorted(self.names()), ["primary", "written"])
+
+
+class FastPathTests(TestCase):
+    # The .values() mapper + orjson must produce exactly DRF's bytes
+
+    def setUp(self):
+        drinks = Category.objects.create(name="Drinks")
+        cola = Product.objects.create(
+            name="Coca Cola\u2028Zero ☕", category=drinks, stock=3, cost_price=Decimal("0.5"),
+            selling_price=Decimal("12.345"), image="products/cola.png",
+            image_variants={"thumb": "products/variants/abc_thumb.jpg"},
+        )
+        Product.objects.create(name="loose", cost_price=1, stock_status=False)
+        order = OrderProducts.objects.create(status="Pending", cus_name="ann", contact_num=None, total_amt=0.1 + 0.2,
+                                             due_date=date(2026, 4, 1))
+        OrderedItem.objects.create(order=order, product=cola, product_name="Coca Cola", qty=2, subtotal=24.69,
+                                   cost_price=Decimal("0.50"), selling_price=Decimal("12.35"))
+        OrderedItem.objects.create(order=order, product=None, product_name="gone", qty=1, subtotal=1)
+        Ewallet.objects.create(EWALL_APP="GCash", EWALL_TYPE="Cash In", EWALL_AMOUNT=500, EWALL_FEE=None)
+        Ewallet.objects.create(EWALL_APP="Maya", EWALL_TYPE="Cash Out", EWALL_DATE=None)
+
+    def test_mapper_output_is_byte_identical_to_drf(self):
+        cases = [
+            (ProductSerializer, Product.objects.select_related("category").order_by("id")),
+            (OrderProductsSerializer, OrderProducts.objects.order_by("order_id")),
+            (OrderedItemSerializer, OrderedItem.objects.select_related("order").order_by("id")),
+            (EwalletSerializer, Ewallet.objects.order_by("EWALL_ID")),
+        ]
+        for serializer_class, queryset in cases:
+            with self.subTest(serializer_class.__name__):
+                drf = JSONRenderer().render(serializer_class(queryset, many=True).data)
+                self.assertEqual(ORJSONRenderer().render(mapper(serializer_class)(queryset)), drf)
+
+    def test_list_endpoints_match_drf(self):
+        drf = JSONRenderer().render(
+            OrderedItemSerializer(OrderedItem.objects.select_related("order").order_by("id"), many=True).data
+        )
+        self.assertEqual(self.client.get("/api/ordereditem/").content, drf)
+
+
+@override_settings(ATTN_CACHE_VERSION_TTL=0)
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        # The index outlives a test's rollback; start each test without one
+        self.enterContext(mock.patch.object(search, "_index", None))
+        colas = Category.objects.create(name="Colas")
+        for name in ("Coca Cola", "Cola Light", "Pepsicola", "Kola Nut", "Bread"):
+            _product(name)
+        Product.objects.create(name="Root Beer", category=colas, cost_price=1)
+
+    def names(self, q, **params):
+        response = self.client.get("/api/products/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["backend"], "ngram")
+        return [p["name"] for p in response.json()["results"]]
+
+    def test_results_are_ranked(self):
+        # prefix, word start, substring, then typo and category matches
+        self.assertEqual(self.names("Cola"), ["cola light", "coca cola", "pepsicola", "kola nut", "root beer"])
+        self.assertEqual(self.names("cola", limit=2), ["cola light", "coca cola"])
+
+    def test_typos_still_match(self):
+        self.assertEqual(self.names("coka"), ["coca cola", "cola light"])
+        self.assertEqual(self.names("bred"), ["bread"])
+
+    def test_new_products_are_found(self):
+        self.assertEqual(self.names("fanta"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            _product("Fanta")
+        self.assertEqual(self.names("fanta"), ["fanta"])
+
+    def test_bad_parameters_are_a_400(self):
+        for params in ({"q": " "}, {"q": "cola", "limit": "x"}, {"q": "cola", "limit": 0}):
+            self.assertEqual(self.client.get("/api/products/search/", params).status_code, 400)
+
+
+class LedgerTests(TestCase):
+    def test_created_products_open_with_their_stock(self):
+        pen = _product("pen", stock=7)
+        self.assertEqual(ledger.stock_at(timezone.now(), [pen.pk]), {pen.pk: 7})
+
+    def test_stock_endpoint_and_edits_keep_the_ledger_in_step(self):
+        pen = _product("pen", stock=7)
+        response = self.client.post(
+            f"/api/products/{pen.pk}/stock/", json.dumps({"kind": "restock", "qty": 5}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["stock"], 12)
+
+        response = self.client.patch(f"/api/products/{pen.pk}/", json.dumps({"stock": 9}),
+                                     content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Product.objects.get(pk=pen.pk).stock, 9)
+        self.assertEqual(ledger.drift(), {})
+        self.assertEqual(ledger.stock_at(timezone.now(), [pen.pk]), {pen.pk: 9})
+
+    def test_snapshot_plus_later_movements_match(self):
+        pen = _product("pen", stock=7)
+        ledger.snapshot(as_of=timezone.now())
+        ledger.apply([StockMovement(product_id=pen.pk, kind=StockMovement.SALE, qty=-3)])
+
+        self.assertEqual(ledger.stock_at(timezone.now() + timedelta(seconds=1), [pen.pk]), {pen.pk: 4})
+        self.assertEqual(ledger.drift(), {})
+
+    def test_guarded_apply_refuses_to_oversell(self):
+        pen = _product("pen", stock=2)
+        with self.assertRaises(ledger.OutOfStock):
+            ledger.apply([StockMovement(product_id=pen.pk, kind=StockMovement.SALE, qty=-3)], require_stock=True)
+        self.assertEqual(Product.objects.get(pk=pen.pk).stock, 2)
+
+    def test_drift_is_found_and_repaired(self):
+        pen = _product("pen", stock=7)
+        Product.objects.filter(pk=pen.pk).update(stock=100)
+
+        self.assertEqual(ledger.drift(), {pen.pk: (100, 7)})
+        ledger.repair()
+        self.assertEqual(Product.objects.get(pk=pen.pk).stock, 7)
+
+
+calls = []
+
+
+@jobs.task("test.flaky")
+def _flaky(fail):
+    calls.append(fail)
+    if fail:
+        raise RuntimeError("boom")
+
+
+@override_settings(ATTN_JOBS_EAGER=False, ATTN_JOB_RETRY_SECONDS=10)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claimed_job_is_not_handed_out_twice(self):
+        job = jobs.enqueue("test.flaky", False)
+
+        claimed = jobs.claim("worker-1")
+        self.assertEqual([j.pk for j in claimed], [job.pk])
+        self.assertEqual(jobs.claim("worker-2"), [])
+        self.assertTrue(jobs.run(claimed[0]))
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.DONE)
+        self.assertEqual(calls, [False])
+
+    def test_future_jobs_wait(self):
+        jobs.enqueue("test.flaky", False, delay=timedelta(minutes=5))
+        self.assertEqual(jobs.claim("worker"), [])
+
+    def test_failures_back_off_then_fail_for_good(self):
+        job = jobs.enqueue("test.flaky", True, max_attempts=2)
+
+        with self.assertLogs("ATTN_Backend.jobs", "WARNING"):
+            self.assertFalse(jobs.run(jobs.claim("worker")[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=5))
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs("ATTN_Backend.jobs", "ERROR"):
+            self.assertFalse(jobs.run(jobs.claim("worker")[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_jobs_of_a_dead_worker_are_requeued(self):
+        job = jobs.enqueue("test.flaky", False)
+        jobs.claim("worker")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(jobs.requeue_stale(timeout=60), (1, 0))
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.QUEUED)
+        self.assertEqual(jobs.stats()["queued"], 1)
+
+    def test_unknown_task_is_refused(self):
+        with self.assertRaises(KeyError):
+            jobs.enqueue("test.missing")
+
+    def test_a_job_taken_over_is_recorded_by_its_new_owner_only(self):
+        job = jobs.enqueue("test.flaky", False)
+        slow = jobs.claim("slow")[0]
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        jobs.requeue_stale(timeout=60)
+        fresh = jobs.claim("fresh")[0]
+
+        with self.assertLogs("ATTN_Backend.jobs", "WARNING") as logs:
+            self.assertFalse(jobs.run(slow))
+        self.assertIn("was requeued while slow ran it", logs.output[0])
+        self.assertEqual(Job.objects.values_list("status", "locked_by").get(pk=job.pk), (Job.RUNNING, "fresh"))
+        self.assertTrue(jobs.run(fresh))
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.DONE)
+
+    def test_a_late_failure_does_not_requeue_a_job_taken_over(self):
+        job = jobs.enqueue("test.flaky", True)
+        slow = jobs.claim("slow")[0]
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        jobs.requeue_stale(timeout=60)
+        jobs.claim("fresh")
+
+        with self.assertLogs("ATTN_Backend.jobs", "WARNING") as logs:
+            self.assertFalse(jobs.run(slow))
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("was requeued while slow ran it", logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.last_error), (Job.RUNNING, "fresh", ""))
+
+
+@override_settings(
+    ATTN_LOGIN_USER_ATTEMPTS=3, ATTN_LOGIN_IP_ATTEMPTS=5,
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],  # fast; only the flow is tested
+)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for name in ("alice", "bob"):
+            Account.objects.create(USERNAME=name, FIRST_NAME=name, LAST_NAME="test", PASSWORD=make_password("secret"))
+
+    def login(self, username, password):
+        return self.client.post(
+            "/api/login/", json.dumps({"USERNAME": username, "PASSWORD": password}), content_type="application/json"
+        )
+
+    def test_repeated_failures_are_throttled_before_hashing(self):
+        statuses = [self.login("alice", "wrong").status_code for _ in range(3)]
+        self.assertEqual(statuses, [400, 400, 400])
+
+        with mock.patch.object(passwords, "verify_password") as verify:
+            response = self.login("alice", "secret")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        verify.assert_not_called()
+
+    @override_settings(ATTN_LOGIN_THROTTLE_WINDOW=300)
+    def test_retry_after_is_the_time_left_in_the_window(self):
+        with mock.patch.object(passwords, "time") as clock:
+            clock.time.return_value = 1000.0
+            for _ in range(3):
+                self.login("alice", "wrong")
+            clock.time.return_value = 1100.0
+            response = self.login("alice", "wrong")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "200")
+
+    def test_success_clears_the_user_count(self):
+        self.login("alice", "wrong")
+        self.login("alice", "wrong")
+        self.assertEqual(self.login("alice", "secret").status_code, 200)
+        self.assertEqual(self.login("alice", "wrong").status_code, 400)
+        self.assertEqual(self.login("alice", "wrong").status_code, 400)
+
+    def test_successful_logins_do_not_use_up_the_ip_limit(self):
+        statuses = {self.login(name, "secret").status_code for _ in range(4) for name in ("alice", "bob")}
+        self.assertEqual(statuses, {200})
+
+    def test_busy_pool_answers_503(self):
+        with mock.patch.object(passwords, "verify_password", side_effect=passwords.Busy):
+            response = self.login("alice", "secret")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+    @override_settings(ATTN_PASSWORD_HASH_WORKERS=1, ATTN_PASSWORD_HASH_QUEUE=0)
+    def test_pool_turns_work_away_when_full(self):
+        executor, slots = passwords._get_pool()
+        slots.acquire()
+        try:
+            with self.assertRaises(passwords.Busy):
+                passwords.hash_password("secret")
+        finally:
+            slots.release()
+        self.assertTrue(passwords.verify_password("secret", passwords.hash_password("secret")))
+
+
+class EwalletListTests(TestCase):
+    def setUp(self):
+        rows = [
+            ("GCash", "Cash In", date(2024, 3, 1), "Ana Cruz", "09171234567", 500, 10),
+            ("GCash", "Cash In", date(2024, 3, 1), "Ben Reyes", "09181112222", 300, 5),
+            ("GCash", "Cash Out", date(2024, 3, 2), "Ana Cruz", "09171234567", 200, None),
+            ("Maya", "Cash In", date(2024, 3, 3), "Carla Lim", "09990001111", 1000, 20),
+        ]
+        self.ids = [
+            Ewallet.objects.create(
+                EWALL_APP=app, EWALL_TYPE=kind, EWALL_DATE=day, EWALL_ACC_NAME=name, EWAL_NUM=number,
+                EWALL_AMOUNT=amount, EWALL_FEE=fee, EWALL_TOTAL=amount + (fee or 0),
+            ).EWALL_ID
+            for app, kind, day, name, number, amount, fee in rows
+        ]
+
+    def ids_for(self, query=""):
+        response = self.client.get(f"/api/ewallets/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return sorted(row["EWALL_ID"] for row in response.json())
+
+    def test_filters(self):
+        first, second, third, fourth = self.ids
+        self.assertEqual(self.ids_for(), self.ids)
+        self.assertEqual(self.ids_for("app=GCash&type=Cash+In"), [first, second])
+        self.assertEqual(self.ids_for("date_from=2024-03-02"), [third, fourth])
+        self.assertEqual(self.ids_for("date_from=2024-03-01&date_to=2024-03-01"), [first, second])
+        self.assertEqual(self.ids_for("q=ana"), [first, third])
+        self.assertEqual(self.ids_for("q=0999"), [fourth])
+        self.assertIn(second, self.ids_for(f"q={second}"))  # by id, as well as any number containing it
+
+    def test_bad_date_is_refused(self):
+        for path in ("/api/ewallets/?date_from=03/01/2024", "/api/ewallets/summary/?date_to=yesterday"):
+            self.assertEqual(self.client.get(path).status_code, 400)
+
+    def test_pages_walk_newest_first(self):
+        seen, cursor = [], None
+        while True:
+            query = "limit=3" + (f"&cursor={cursor}" if cursor else "")
+            page = self.client.get(f"/api/ewallets/?{query}").json()
+            seen += [row["EWALL_ID"] for row in page["results"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, sorted(self.ids, reverse=True))
+
+    def test_pages_keep_the_filters(self):
+        page = self.client.get("/api/ewallets/?app=GCash&limit=2").json()
+        self.assertEqual([row["EWALL_ID"] for row in page["results"]], [self.ids[2], self.ids[1]])
+        page = self.client.get(f"/api/ewallets/?app=GCash&limit=2&cursor={page['next_cursor']}").json()
+        self.assertEqual([row["EWALL_ID"] for row in page["results"]], [self.ids[0]])
+        self.assertIsNone(page["next_cursor"])
+
+    def test_bad_cursor_or_limit_is_refused(self):
+        for query in ("cursor=not-a-cursor", "limit=0", "limit=many"):
+            self.assertEqual(self.client.get(f"/api/ewallets/?{query}").status_code, 400)
+
+    def test_summary_totals(self):
+        summary = self.client.get("/api/ewallets/summary/").json()
+        self.assertEqual(
+            [(row["day"], row["app"], row["type"], row["count"]) for row in summary["days"]],
+            [("2024-03-03", "Maya", "Cash In", 1), ("2024-03-02", "GCash", "Cash Out", 1),
+             ("2024-03-01", "GCash", "Cash In", 2)],
+        )
+        self.assertEqual(summary["by_app_type"], [
+            {"app": "GCash", "type": "Cash In", "count": 2, "amount": 800, "fee": 15, "total": 815},
+            {"app": "GCash", "type": "Cash Out", "count": 1, "amount": 200, "fee": 0, "total": 200},
+            {"app": "Maya", "type": "Cash In", "count": 1, "amount": 1000, "fee": 20, "total": 1020},
+        ])
+        self.assertEqual(summary["totals"], {"count": 4, "amount": 2000, "fee": 35, "total": 2035})
+
+    def test_summary_uses_the_list_filters(self):
+        summary = self.client.get("/api/ewallets/summary/?app=GCash&date_to=2024-03-01").json()
+        self.assertEqual(summary["totals"], {"count": 2, "amount": 800, "fee": 15, "total": 815})
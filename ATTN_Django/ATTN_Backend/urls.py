@@ -1,11 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Read-heavy list views: async under ASGI, DRF otherwise (see ATTN_ASYNC_VIEWS)
+list_views = async_views if settings.ATTN_ASYNC_VIEWS else views
 
 urlpatterns = [
     # PRODUCTS
     path('add-product/', views.add_product, name='add_product'),
-    path('products/', views.product_list, name='product_list'),
+    path('products/', list_views.product_list, name='product_list'),
+    path('products/search/', views.product_search, name='product_search'),
     path('products/<int:pk>/', views.product_detail),
+    path('products/<int:pk>/stock/', views.product_stock, name='product_stock'),
+
+    # STOCK LEDGER
+    path('stock/', views.stock_at_date, name='stock_at_date'),
+    path('stock/movements/', views.stock_movements, name='stock_movements'),
 
     # CATEGORY
     path('categories/', views.CategoryListCreateView.as_view()),
@@ -14,13 +24,14 @@ urlpatterns = [
     # EWALLET
     path('add-ewallet/', views.add_ewallet),
     path('ewallets/', views.ewallet_list),
+    path('ewallets/summary/', views.ewallet_summary, name='ewallet_summary'),
 
     # AUTH
     path('account/', views.signup),
     path('login/', views.login_account),
 
     # ORDERS
-    path('orders/', views.order_list),
+    path('orders/', list_views.order_list),
 
     # MUST COME BEFORE update_order_status
     path("orders/<int:order_id>/items/", views.order_items),
@@ -28,11 +39,14 @@ urlpatterns = [
     path('create-order/', views.create_order),
     path('orders/<int:pk>/', views.update_order_status),
     path('add-product/', views.add_product, name='add_product'),
-    path('products/', views.product_list, name='product_list'),
-    path('ordereditem/', views.orderitem_list, name='ordered_item'),
-    path("analytics/", views.analytics, name="analytics"),
+    path('products/', list_views.product_list, name='product_list'),
+    path('ordereditem/', list_views.orderitem_list, name='ordered_item'),
+    path("analytics/", list_views.analytics, name="analytics"),
+    path("analytics/basket/", views.basket_analysis, name="basket_analysis"),
+    path("dashboard/", views.dashboard, name="dashboard"),
     path("profile/<str:username>/", views.profile),
     path('debtpayments/', views.debtpayments, name='debtpayments'),
+    path('debts/', views.debts, name='debts'),
 
     
 
@@ -42,8 +56,21 @@ urlpatterns = [
 
    
 
-   path('notifications/', views.notification_list, name='notification_list'),
+   path('notifications/', list_views.notification_list, name='notification_list'),
    path('notifications/<int:id>/mark-read/', views.mark_notification_read, name='mark_notification_read'),
+
+   # BULK IMPORT / EXPORT (products, orders, ewallets)
+   path('import/<slug:dataset>/', views.import_data, name='import_data'),
+   path('export/<slug:dataset>.<slug:file_format>', views.export_data, name='export_data'),
+
+   # DELTA SYNC
+   path('sync/', views.sync, name='sync'),
+
+   # PERFORMANCE METRICS
+   path('_metrics', views.metrics, name='metrics'),
+
+   # LIVE UPDATES (SSE, ASGI only)
+   path('events/', views.event_stream, name='event_stream'),
     
 
 
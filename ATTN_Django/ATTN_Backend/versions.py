@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CacheVersion
+
+
+# Every worker process caches what it derives from the catalog in its own
+# memory, so the version that says whether that copy is still current has
+# to live somewhere they all see: a row per name in CacheVersion. Reads are
+# remembered for ATTN_CACHE_VERSION_TTL seconds, so an unchanged catalog
+# costs a worker at most one primary-key lookup per interval, and a change
+# made by another worker shows up within it.
+
+_seen = {}  # name -> (checked at, (version, bumped_at))
+
+
+def _ttl():
+    return getattr(settings, "ATTN_CACHE_VERSION_TTL", 2)
+
+
+def _fresh(name):
+    seen = _seen.get(name)
+    if seen is not None and time.monotonic() - seen[0] < _ttl():
+        return seen[1]
+    return None
+
+
+def current(name):
+    """(version, bumped_at) of ``name``."""
+    value = _fresh(name)
+    if value is None:
+        row = CacheVersion.objects.filter(name=name).values_list("version", "bumped_at").first()
+        if row is None:
+            row = CacheVersion.objects.get_or_create(name=name)[0]
+            row = (row.version, row.bumped_at)
+        value = row
+        _seen[name] = (time.monotonic(), value)
+    return value
+
+
+async def acurrent(name):
+    """current() for async views."""
+    value = _fresh(name)
+    if value is None:
+        row = await CacheVersion.objects.filter(name=name).values_list("version", "bumped_at").afirst()
+        if row is None:
+            row = (await CacheVersion.objects.aget_or_create(name=name))[0]
+            row = (row.version, row.bumped_at)
+        value = row
+        _seen[name] = (time.monotonic(), value)
+    return value
+
+
+def bump(name):
+    """
+    Move ``name`` to a new version once the current transaction commits.
+    Bumping after commit keeps busy writers (every checkout bumps the
+    catalog) from queueing on the version row's lock until they finish.
+    """
+    def _bump():
+        if not CacheVersion.objects.filter(name=name).update(version=F("version") + 1, bumped_at=timezone.now()):
+            CacheVersion.objects.get_or_create(name=name)
+        _seen.pop(name, None)
+    transaction.on_commit(_bump)
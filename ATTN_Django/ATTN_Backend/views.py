@@ -1,25 +1,30 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.conf import settings
+from django.views.static import serve
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework import status, generics
 from datetime import date, timedelta
-from django.db.models import Sum
+from django.db import transaction
+from django.db.models import Count, Sum, F, Q, Value, FloatField, CharField, OuterRef, Subquery
+from django.db.models.functions import Cast, Coalesce
+import calendar
 
 
 
 import json
-from django.contrib.auth.hashers import make_password, check_password
-print(make_password("123"))
 from django.views.decorators.csrf import csrf_exempt
 from .models import Notification
 
 from .models import (
-    Product, Category,
+    Product, Category, StockMovement,
     OrderProducts, OrderedItem,
-    Ewallet, Account, DebtPayments
+    Ewallet, Account, DebtPayments,
+    DailySales, DailyProductSales
 )
 
 from .serializers import (
@@ -27,6 +32,12 @@ from .serializers import (
     EwalletSerializer, AccountSerializer,
     OrderProductsSerializer, OrderedItemSerializer, OrderedItemSerializer, DebtPaymentSerializer
 )
+from .pagination import InvalidCursor, keyset_page, parse_page_size
+from .sync import changes_since
+from .fastpath import mapper
+from .routers import read_from_replica
+from .middleware import stats as request_stats
+from . import basket, bulk, catalog, events, images, jobs, ledger, passwords, queries, rollups, search
 import logging
 
 logger = logging.getLogger(__name__)
@@ -49,7 +60,10 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
 def add_product(request):
     serializer = ProductSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save()
+        with transaction.atomic():
+            # the opening stock movement is written by a post_save handler
+            product = serializer.save()
+        images.schedule(product)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     print(serializer.errors)
@@ -58,9 +72,31 @@ def add_product(request):
 
 @api_view(['GET'])
 def product_list(request):
-    products = Product.objects.filter(is_active=True)
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data)
+    # Cached catalog; an unchanged catalog costs no DB or serializer work
+    version = catalog.current_version()
+    headers = catalog.headers(version)
+    if catalog.not_modified(request, version):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(catalog.payload(version), headers=headers)
+
+
+@api_view(['GET'])
+def product_search(request):
+    query = request.GET.get("q", "")
+    if not search.normalize(query):
+        return Response({"error": "q is required"}, status=400)
+
+    try:
+        limit = min(int(request.GET.get("limit", search.DEFAULT_LIMIT)), search.MAX_LIMIT)
+        category_id = request.GET.get("category")
+        category_id = int(category_id) if category_id else None
+    except ValueError:
+        return Response({"error": "limit and category must be integers"}, status=400)
+    if limit < 1:
+        return Response({"error": "limit must be positive"}, status=400)
+
+    backend, results = search.search(query, category_id, limit)
+    return Response({"backend": backend, "results": results})
 
 
 @api_view(['GET', 'PATCH'])
@@ -75,106 +111,320 @@ def product_detail(request, pk):
         return Response(serializer.data)
 
     if request.method == "PATCH":
-        serializer = ProductSerializer(product, data=request.data, partial=True)
-        if serializer.is_valid():
+        with transaction.atomic():
+            # save() writes every column, stock included: hold the row so a
+            # checkout cannot change it in between
+            product = Product.objects.select_for_update().get(pk=pk)
+            serializer = ProductSerializer(product, data=request.data, partial=True)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            new_stock = serializer.validated_data.pop("stock", None)
+            if new_stock is not None:
+                # A stock edit is a count: book the difference as an adjustment
+                ledger.record([StockMovement(
+                    product=product, kind=StockMovement.ADJUSTMENT, qty=new_stock - product.stock,
+                    note="stock edited",
+                )])
+                product.stock = new_stock
+                if "stock_status" not in serializer.validated_data:
+                    product.stock_status = new_stock > 0
+                jobs.enqueue("forecast", [product.id])
+            if "image" in serializer.validated_data and not serializer.validated_data["image"]:
+                images.clear(product)
             serializer.save()
-            return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        if "image" in request.data:
+            images.schedule(product)
+        if "stock" in request.data or "stock_status" in request.data:
+            events.publish(events.STOCK_CHANGED, {
+                "product_id": product.id,
+                "stock": product.stock,
+                "stock_status": product.stock_status,
+            })
+        return Response(serializer.data)
+
+
+
+
+MANUAL_MOVEMENTS = {StockMovement.RESTOCK, StockMovement.ADJUSTMENT, StockMovement.RETURN}
+
+
+@api_view(["POST"])
+def product_stock(request, pk):
+    """Book a restock, return or adjustment: {"kind", "qty", "note"}."""
+    kind = request.data.get("kind")
+    if kind not in MANUAL_MOVEMENTS:
+        return Response({"error": f"kind must be one of {', '.join(sorted(MANUAL_MOVEMENTS))}"}, status=400)
+    try:
+        qty = int(request.data.get("qty"))
+    except (TypeError, ValueError):
+        return Response({"error": "qty must be an integer"}, status=400)
+    if qty == 0 or (kind != StockMovement.ADJUSTMENT and qty < 0):
+        return Response({"error": "qty must be positive (adjustments may be negative)"}, status=400)
+    if not Product.objects.filter(pk=pk).exists():
+        return Response(status=status.HTTP_404_NOT_FOUND)
 
+    with transaction.atomic():
+        ledger.apply([StockMovement(product_id=pk, kind=kind, qty=qty, note=request.data.get("note") or "")])
+        catalog.invalidate()
+        jobs.enqueue("forecast", [pk])
+    stock = Product.objects.values_list("stock", flat=True).get(pk=pk)
+
+    events.publish(events.STOCK_CHANGED, {"product_id": pk, "stock": stock, "stock_status": stock > 0})
+    return Response({"product_id": pk, "stock": stock}, status=status.HTTP_201_CREATED)
+
+
+def _product_ids(params):
+    product = params.get("product")
+    return [int(p) for p in product.split(",")] if product else None
+
+
+@api_view(["GET"])
+@read_from_replica
+def stock_at_date(request):
+    """Stock per product at the end of ?date=YYYY-MM-DD (default today)."""
+    try:
+        day = date.fromisoformat(request.query_params["date"]) if "date" in request.query_params else date.today()
+        product_ids = _product_ids(request.query_params)
+    except ValueError:
+        return Response({"error": "date must be YYYY-MM-DD and product a comma-separated list of ids"}, status=400)
+
+    stock = ledger.stock_at(ledger.end_of_day(day), product_ids)
+    return Response({
+        "date": day,
+        "stock": [{"product_id": pid, "stock": qty} for pid, qty in sorted(stock.items())],
+    })
+
+
+@api_view(["GET"])
+@read_from_replica
+def stock_movements(request):
+    """Opening stock, movements by kind and closing stock for ?start= to ?end= (inclusive days)."""
+    params = request.query_params
+    try:
+        end = date.fromisoformat(params["end"]) if "end" in params else date.today()
+        start = date.fromisoformat(params["start"]) if "start" in params else end
+        product_ids = _product_ids(params)
+    except ValueError:
+        return Response({"error": "Dates must be in YYYY-MM-DD format"}, status=400)
+    if start > end:
+        return Response({"error": "start must not be after end"}, status=400)
+
+    report = ledger.movement_report(ledger.end_of_day(start - timedelta(days=1)), ledger.end_of_day(end), product_ids)
+    return Response({"start": start, "end": end, "products": report})
 
 
 @api_view(['GET'])
 def order_list(request):
-    orders = OrderProducts.objects.all()
-    serializer = OrderProductsSerializer(orders, many=True)
-    return Response(serializer.data)
+    params = request.query_params
+    try:
+        orders = queries.filter_orders(OrderProducts.objects.all(), params)
+    except ValueError:
+        return Response({"error": "Dates must be in YYYY-MM-DD format"}, status=400)
+
+    # Without a cursor/limit keep the legacy "everything" response.
+    if "cursor" not in params and "limit" not in params:
+        return Response(mapper(OrderProductsSerializer)(orders))
+
+    # ---- KEYSET PAGINATION (newest first) ----
+    try:
+        limit = parse_page_size(params.get("limit"))
+        serialize = mapper(OrderProductsSerializer)
+        page, next_cursor = keyset_page(
+            serialize.queryset(orders),
+            ["order_date", "order_id"],
+            cursor=params.get("cursor"),
+            limit=limit,
+            parsers={"order_date": date.fromisoformat},
+        )
+    except InvalidCursor as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    return Response({
+        "results": serialize.map(page),
+        "next_cursor": next_cursor,
+    })
 
 @api_view(["POST"])
 def create_order(request):
     order_data = request.data
+    items = order_data.get("items") or []
 
-    # Create order record
-    order = OrderProducts.objects.create(
-        status=order_data["status"],
-        cus_name=order_data.get("cus_name"),
-        contact_num=order_data.get("contact_num"),
-        due_date=order_data.get("due_date"),
-        total_amt=order_data["total_amt"],
-    )
-
-    # Loop through ordered items
-    for item in order_data["items"]:
-        
-        
-        product_id = item["product_id"]
-
-        try:
-            product = Product.objects.get(id=product_id)
-        except Product.DoesNotExist:
+    # Total qty per product (the same product can appear on several lines)
+    wanted = {}
+    for item in items:
+        wanted[item["product_id"]] = wanted.get(item["product_id"], 0) + item["qty"]
+
+    # Validate everything before writing anything. Nothing is locked yet:
+    # this only turns away orders that cannot succeed, the guarded stock
+    # UPDATE below is what actually enforces the stock.
+    products = Product.objects.in_bulk(list(wanted))
+    for product_id, qty_ordered in wanted.items():
+        product = products.get(product_id)
+        if product is None:
             return Response({"error": f"Product ID {product_id} not found"}, status=400)
-
-        qty_ordered = item["qty"]
-
-        # Check stock
         if product.stock < qty_ordered:
             return Response(
                 {"error": f"Not enough stock for {product.name}. Only {product.stock} left."},
                 status=400,
             )
 
-        # Deduct stock
-        product.stock -= qty_ordered
-        product.stock_status = product.stock > 0
-        product.save()
-
-        # Save ordered item
-        OrderedItem.objects.create(
-            order=order,
-            product_name=item["product_name"],  # ok to store name for display
-            qty=item["qty"],
-            cost_price=item["cost_price"],
-            selling_price=item["selling_price"],
-            subtotal=item["subtotal"],
-        )
+    try:
+        with transaction.atomic():
+            # Create order record
+            order = OrderProducts.objects.create(
+                status=order_data["status"],
+                cus_name=order_data.get("cus_name"),
+                contact_num=order_data.get("contact_num"),
+                due_date=order_data.get("due_date"),
+                total_amt=order_data["total_amt"],
+            )
+
+            ordered_items = OrderedItem.objects.bulk_create([
+                OrderedItem(
+                    order=order,
+                    product=products[item["product_id"]],
+                    product_name=item["product_name"],  # ok to store name for display
+                    qty=item["qty"],
+                    cost_price=item["cost_price"],
+                    selling_price=item["selling_price"],
+                    subtotal=item["subtotal"],
+                )
+                for item in items
+            ])
+            # Refresh stockout forecasts for just the products that moved
+            jobs.enqueue("forecast", list(wanted))
+            catalog.invalidate()
+
+            # Rows every checkout shares are written last, so their locks
+            # are held only for these few statements before commit: one
+            # ledger insert plus one guarded stock UPDATE for all products,
+            # then the rollup and basket counters.
+            ledger.apply([
+                StockMovement(product_id=pid, kind=StockMovement.SALE, qty=-qty, order=order)
+                for pid, qty in wanted.items()
+            ], require_stock=True)
+            rollups.record_order(order, ordered_items)
+            basket.record_order(ordered_items)
+    except ledger.OutOfStock:
+        # Another checkout took the stock since validation; nothing was written
+        current = Product.objects.filter(id__in=list(wanted)).values_list("id", "name", "stock")
+        short = [(name, stock) for pid, name, stock in current if stock < wanted[pid]]
+        if not short:
+            return Response({"error": "Stock changed while the order was placed; please retry."}, status=409)
+        name, stock = short[0]
+        return Response({"error": f"Not enough stock for {name}. Only {stock} left."}, status=400)
+
+    for product_id, stock in Product.objects.filter(id__in=list(wanted)).values_list("id", "stock"):
+        events.publish(events.STOCK_CHANGED, {
+            "product_id": product_id,
+            "stock": stock,
+            "stock_status": stock > 0,
+        })
 
-    return Response(OrderProductsSerializer(order).data)
+    data = OrderProductsSerializer(order).data
+    events.publish(events.ORDER_CREATED, data)
+    return Response(data)
 
 @api_view(['GET'])
+@read_from_replica
 def orderitem_list(request):
-    items = OrderedItem.objects.select_related("order").all()  # ✔ only valid FK
-    serializer = OrderedItemSerializer(items, many=True)
-    return Response(serializer.data)
+    return Response(mapper(OrderedItemSerializer)(queries.ordered_items()))
 
 @api_view(["GET"])
+@read_from_replica
 def analytics(request):
+    daily_sales, top_products = queries.analytics(date.today())
+    return Response({
+        "daily_sales": list(daily_sales),
+        "top_products": list(top_products),
+    })
+
+
+
+
+@api_view(["GET"])
+@read_from_replica
+def basket_analysis(request):
+    params = request.query_params
+    try:
+        results = basket.associations(
+            min_count=int(params.get("min_count", 2)),
+            min_support=float(params.get("min_support", 0)),
+            min_lift=float(params.get("min_lift", 1)),
+            limit=min(int(params.get("limit", 10)), 100),
+        )
+    except ValueError:
+        return Response({"error": "Invalid filter value"}, status=400)
+
+    return Response(results)
+
+
+@api_view(["GET"])
+@read_from_replica
+def dashboard(request):
     today = date.today()
-    week_ago = today - timedelta(days=6)
-    month_ago = today - timedelta(days=29)
-
-    # ---- DAILY SALES FOR PAST 7 DAYS ----
-    daily_sales = (
-        OrderProducts.objects.filter(order_date__gte=week_ago)
-        .values("order_date")
-        .annotate(total=Sum("total_amt"))
-        .order_by("order_date")
+    try:
+        year = int(request.query_params.get("year", today.year))
+        month = int(request.query_params.get("month", today.month))
+        if not 1 <= month <= 12:
+            raise ValueError
+    except ValueError:
+        return Response({"error": "Invalid month or year"}, status=400)
+
+    # ---- PER-DAY TOTALS for the selected year, month and today (1 query) ----
+    month_start = date(year, month, 1)
+    month_end = date(year, month, calendar.monthrange(year, month)[1])
+    per_day = (
+        DailySales.objects.filter(
+            Q(day__year=year) | Q(day__range=(month_start, month_end)) | Q(day=today)
+        )
+        .values("day", "revenue", "cost")
     )
 
-    # ---- TOP 5 BEST SELLING PRODUCTS ----
-    top_products = (
-        OrderedItem.objects.values("product_name")
-        .annotate(total_qty=Sum("qty"))
-        .order_by("-total_qty")[:5]
+    today_totals = {"sales": 0.0, "profit": 0.0}
+    num_weeks = -(-month_end.day // 7)
+    weekly = [{"week": f"Week {i + 1}", "sales": 0.0, "profit": 0.0} for i in range(num_weeks)]
+    yearly = [{"month": calendar.month_abbr[i + 1], "sales": 0.0, "profit": 0.0} for i in range(12)]
+
+    for row in per_day:
+        day = row["day"]
+        sales, profit = float(row["revenue"]), float(row["revenue"] - row["cost"])
+        buckets = []
+        if day == today:
+            buckets.append(today_totals)
+        if month_start <= day <= month_end:
+            buckets.append(weekly[(day.day - 1) // 7])
+        if day.year == year:
+            buckets.append(yearly[day.month - 1])
+        for bucket in buckets:
+            bucket["sales"] += sales
+            bucket["profit"] += profit
+
+    # ---- TODAY'S TOP SELLER (1 query) ----
+    top = (
+        DailyProductSales.objects.filter(day=today, qty__gt=0)
+        .order_by("-qty")
+        .values("product_name")
+        .first()
     )
 
     return Response({
-        "daily_sales": list(daily_sales),
-        "top_products": list(top_products),
+        "today": {
+            "sales": today_totals["sales"],
+            "profit": today_totals["profit"],
+            "top_product": top["product_name"] if top else None,
+        },
+        "weekly": weekly,
+        "month_sales": sum(w["sales"] for w in weekly),
+        "month_profit": sum(w["profit"] for w in weekly),
+        "yearly": yearly,
+        "year_sales": sum(m["sales"] for m in yearly),
+        "year_profit": sum(m["profit"] for m in yearly),
     })
 
 
-
-
 @api_view(['POST'])
 def add_ewallet(request):
     serializer = EwalletSerializer(data=request.data)
@@ -188,15 +438,81 @@ def add_ewallet(request):
 
 @api_view(['GET'])
 def ewallet_list(request):
-    ewallets = Ewallet.objects.all()
-    serializer = EwalletSerializer(ewallets, many=True)
-    return Response(serializer.data)
+    params = request.query_params
+    try:
+        ewallets = queries.filter_ewallets(Ewallet.objects.all(), params)
+    except ValueError:
+        return Response({"error": "Dates must be in YYYY-MM-DD format"}, status=400)
+
+    # Without a cursor/limit keep the legacy "everything" response.
+    if "cursor" not in params and "limit" not in params:
+        return Response(mapper(EwalletSerializer)(ewallets))
+
+    # ---- KEYSET PAGINATION (newest first) ----
+    try:
+        limit = parse_page_size(params.get("limit"))
+        serialize = mapper(EwalletSerializer)
+        page, next_cursor = keyset_page(
+            serialize.queryset(ewallets), ["EWALL_ID"], cursor=params.get("cursor"), limit=limit,
+        )
+    except InvalidCursor as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    return Response({
+        "results": serialize.map(page),
+        "next_cursor": next_cursor,
+    })
+
+
+@api_view(['GET'])
+@read_from_replica
+def ewallet_summary(request):
+    """Totals per day, EWALL_APP and EWALL_TYPE for the same filters as ewallet_list."""
+    try:
+        ewallets = queries.filter_ewallets(Ewallet.objects.all(), request.query_params)
+    except ValueError:
+        return Response({"error": "Dates must be in YYYY-MM-DD format"}, status=400)
+
+    rows = list(queries.ewallet_summary(ewallets))
+    by_app_type = {}
+    for row in rows:
+        totals = by_app_type.setdefault((row["app"], row["type"]), {
+            "app": row["app"], "type": row["type"], "count": 0, "amount": 0, "fee": 0, "total": 0,
+        })
+        for field in ("count", "amount", "fee", "total"):
+            totals[field] += row[field]
+
+    return Response({
+        "days": rows,
+        "by_app_type": sorted(by_app_type.values(), key=lambda t: (t["app"], t["type"])),
+        "totals": {field: sum(row[field] for row in rows) for field in ("count", "amount", "fee", "total")},
+    })
+
 
 
 
+def _throttled(retry_after):
+    return Response(
+        {"error": "Too many attempts, try again later"},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def _busy():
+    return Response(
+        {"error": "Server busy, try again shortly"},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
+
 
 @api_view(["POST"])
 def signup(request):
+    retry_after = passwords.throttle(request)
+    if retry_after:
+        return _throttled(retry_after)
+
     first_name = request.data.get("FIRST_NAME")
     middle_name = request.data.get("MIDDLE_NAME")
     last_name = request.data.get("LAST_NAME")
@@ -214,7 +530,10 @@ def signup(request):
         LAST_NAME=last_name,
         DATE_OF_BIRTH=date_of_birth,
     )
-    account.set_password(password)
+    try:
+        account.PASSWORD = passwords.hash_password(password)
+    except passwords.Busy:
+        return _busy()
     account.save()
 
     return Response({"message": "Account created successfully"}, status=201)
@@ -225,13 +544,23 @@ def login_account(request):
     username = request.data.get("USERNAME")
     password = request.data.get("PASSWORD")
 
+    # Rejected before the account lookup and the (slow) hash
+    retry_after = passwords.throttle(request, username)
+    if retry_after:
+        return _throttled(retry_after)
+
     try:
         account = Account.objects.get(USERNAME=username)
     except Account.DoesNotExist:
         return Response({"error": "Invalid username or password"}, status=400)
 
-    if not account.check_password(password):
+    try:
+        valid = passwords.verify_password(password, account.PASSWORD)
+    except passwords.Busy:
+        return _busy()
+    if not valid:
         return Response({"error": "Invalid username or password"}, status=400)
+    passwords.succeeded(request, username)
 
     return Response({
         "message": "Login successful",
@@ -240,6 +569,7 @@ def login_account(request):
         "last_name": account.LAST_NAME
     })
 @api_view(['GET'])
+@read_from_replica
 def website_description(request):
     products = Product.objects.all().values()
     return Response({"recipes": list(products)})
@@ -256,8 +586,12 @@ def update_order_status(request, pk):
     if new_status not in ["Pending", "Paid"]:
         return Response({"error": "Invalid status"}, status=400)
 
-    order.status = new_status
-    order.save()
+    with transaction.atomic():
+        old_status = order.status
+        order.status = new_status
+        order.save()
+        rollups.record_status_change(order, old_status)
+    events.publish(events.ORDER_STATUS_CHANGED, {"order_id": order.order_id, "status": order.status})
 
     return Response({
         "message": "Order status updated",
@@ -268,26 +602,20 @@ def update_order_status(request, pk):
 
 @api_view(["GET"])
 def order_items(request, order_id):
-    try:
-        order = OrderProducts.objects.get(order_id=order_id)
-    except OrderProducts.DoesNotExist:
-        return Response({"error": "Order not found"}, status=404)
+    items = list(
+        OrderedItem.objects.filter(order_id=order_id)
+        .select_related("product__category")
+        .order_by("id")
+    )
 
-    items = OrderedItem.objects.filter(order=order)
+    # Only an empty result needs a second query to tell "no items" from "no order"
+    if not items and not OrderProducts.objects.filter(order_id=order_id).exists():
+        return Response({"error": "Order not found"}, status=404)
 
     response_data = []
 
     for item in items:
-       
-        product_qs = Product.objects.filter(name__iexact=item.product_name)
-        product_obj = product_qs.first()
-
-        if product_qs.count() > 1:
-            logger.warning(
-                "Multiple Product objects found for name=%s (order_item id=%s). Using the first match.",
-                item.product_name,
-                getattr(item, 'id', 'N/A'),
-            )
+        product_obj = item.product
 
         if product_obj:
             category = product_obj.category.name if product_obj.category else "N/A"
@@ -309,11 +637,7 @@ def order_items(request, order_id):
 @csrf_exempt
 def notification_list(request):
     if request.method == 'GET':
-        notifications = Notification.objects.all().values(
-            'id', 'product__name', 'notification_type', 'message', 
-            'days_until_stockout', 'is_read', 'created_at'
-        )
-        return JsonResponse(list(notifications), safe=False)
+        return JsonResponse(list(queries.notifications()), safe=False)
 
 @csrf_exempt
 def mark_notification_read(request, id):
@@ -347,7 +671,10 @@ def profile(request, username):
 
         
         if "PASSWORD" in data and data["PASSWORD"].strip() != "":
-            data["PASSWORD"] = make_password(data["PASSWORD"])
+            try:
+                data["PASSWORD"] = passwords.hash_password(data["PASSWORD"])
+            except passwords.Busy:
+                return _busy()
         else:
             
             data.pop("PASSWORD", None)
@@ -367,6 +694,8 @@ def debtpayments(request):
     # -----------------------------
     if request.method == "GET":
         payments = DebtPayments.objects.all().order_by("-created_at")
+        if request.query_params.get("customer"):
+            payments = payments.filter(cus_name=request.query_params["customer"])
         serializer = DebtPaymentSerializer(payments, many=True)
         return Response(serializer.data)
 
@@ -377,5 +706,146 @@ def debtpayments(request):
         serializer = DebtPaymentSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            events.publish(events.DEBT_PAYMENT_CREATED, serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["GET"])
+def sync(request):
+    # ?since=<token from the previous response>&tables=orders,products
+    tables = request.query_params.get("tables")
+    tables = [t.strip() for t in tables.split(",") if t.strip()] if tables else None
+
+    try:
+        data = changes_since(request.query_params.get("since"), tables)
+    except InvalidCursor as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    return Response(data)
+
+
+async def event_stream(request):
+    # Long-lived SSE connection; only usable when served through asgi.py.
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "Live updates require the ASGI server; poll /api/sync/ instead"},
+            status=501,
+        )
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    response = StreamingHttpResponse(events.stream(last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _pending_with_balance():
+    # Paid amount per order as a correlated subquery so it can be summed per customer
+    paid = (
+        DebtPayments.objects.filter(order=OuterRef("pk"))
+        .values("order")
+        .annotate(total=Sum("amount_paid"))
+        .values("total")
+    )
+    return OrderProducts.objects.filter(status="Pending").annotate(
+        paid=Coalesce(Cast(Subquery(paid), FloatField()), Value(0.0)),
+        remaining_amt=F("total_amt") - F("paid"),
+    )
+
+
+@api_view(["GET"])
+def debts(request):
+    params = request.query_params
+    pending = _pending_with_balance()
+
+    try:
+        limit = parse_page_size(params.get("limit"))
+
+        # ---- ONE CUSTOMER: outstanding balance per pending order ----
+        if params.get("customer"):
+            orders = pending.filter(cus_name=params["customer"]).values(
+                "order_id", "cus_name", "contact_num", "status", "total_amt",
+                "due_date", "order_date", "paid", "remaining_amt",
+            )
+            page, next_cursor = keyset_page(
+                orders, ["order_date", "order_id"],
+                cursor=params.get("cursor"), limit=limit,
+                parsers={"order_date": date.fromisoformat},
+            )
+            total = orders.aggregate(total=Sum("remaining_amt"))["total"] or 0
+            return Response({"results": page, "next_cursor": next_cursor, "total_pending": total})
+
+        # ---- ALL CUSTOMERS: outstanding balance per customer ----
+        customers = pending.annotate(customer=Coalesce("cus_name", Value(""), output_field=CharField()))
+        if params.get("search"):
+            customers = customers.filter(cus_name__icontains=params["search"])
+        total = customers.aggregate(total=Sum("remaining_amt"))["total"] or 0
+        customers = customers.values("customer").annotate(
+            total_pending=Sum("remaining_amt"),
+            orders=Count("order_id"),
+        )
+        page, next_cursor = keyset_page(
+            customers, ["customer"],
+            cursor=params.get("cursor"), limit=limit, descending=False,
+        )
+    except InvalidCursor as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    results = [
+        {"cus_name": row["customer"] or None, "total_pending": row["total_pending"], "orders": row["orders"]}
+        for row in page
+    ]
+    return Response({"results": results, "next_cursor": next_cursor, "total_pending": total})
+
+
+@api_view(["POST"])
+@parser_classes([MultiPartParser, FormParser])
+def import_data(request, dataset):
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"error": "Upload a CSV or JSONL file as 'file'"}, status=400)
+
+    file_format = request.data.get("file_format") or upload.name.rsplit(".", 1)[-1].lower()
+    dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+
+    try:
+        report = bulk.import_stream(dataset, upload, file_format, dry_run=dry_run)
+    except bulk.ImportFormatError as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    return Response(report.as_dict(), status=200 if dry_run or not report.error_count else 207)
+
+
+def export_data(request, dataset, file_format):
+    try:
+        lines = bulk.export_lines(dataset, file_format)
+    except bulk.ImportFormatError as exc:
+        return JsonResponse({"error": str(exc)}, status=404)
+
+    content_type = "text/csv" if file_format == "csv" else "application/x-ndjson"
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{dataset}.{file_format}"'
+    return response
+
+
+def media_variant(request, path):
+    # Variant file names are content hashes, so they can be cached forever
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+@api_view(["GET", "DELETE"])
+def metrics(request):
+    # Rolling per-endpoint latency/query percentiles from QueryTimingMiddleware,
+    # plus the background job queue's backlog
+    if request.method == "DELETE":
+        request_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response({"endpoints": request_stats.report(), "jobs": jobs.stats()})
@@ -2,6 +2,17 @@
 ASGI config for ATTN_Django project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serving through it also switches the list endpoints to their async views
+(ATTN_ASYNC_VIEWS), e.g.:
+
+    WEB_CONCURRENCY=4 uvicorn ATTN_Django.asgi:application
+
+Give the worker count through WEB_CONCURRENCY rather than --workers, so
+`manage.py check` can tell the process-local backends are not enough.
+Database connections default to psycopg's pool here (ATTN_DB_CONNECTIONS,
+needs psycopg[pool]). Persistent connections are per thread, and the
+thread running a request's queries changes from request to request, so
+they would pile up instead of being reused.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +23,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ATTN_Django.settings')
+os.environ.setdefault('ATTN_ASYNC_VIEWS', '1')
+os.environ.setdefault('ATTN_DB_CONNECTIONS', 'pool')
 
 application = get_asgi_application()
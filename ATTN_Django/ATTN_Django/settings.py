@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -38,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'ATTN_Backend',
     'rest_framework',
@@ -45,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'ATTN_Backend.middleware.QueryTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -75,6 +79,12 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'ATTN_Django.wsgi.application'
+ASGI_APPLICATION = 'ATTN_Django.asgi.application'
+
+# Serve the read-heavy list views (ATTN_Backend.async_views) as async views.
+# asgi.py turns this on, so it follows the server: WSGI keeps the DRF views,
+# ASGI (uvicorn/daphne) gets the async ones.
+ATTN_ASYNC_VIEWS = os.environ.get('ATTN_ASYNC_VIEWS') == '1'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -97,6 +107,72 @@ DATABASES = {
     }
 }   
 
+# Connection management (ATTN_DB_CONNECTIONS). Every new connection to the
+# remote pooler pays a TCP + TLS + auth round trip, so by default a worker
+# keeps its connection and pings it before reuse.
+#   persistent - reuse each worker's connection for ATTN_DB_CONN_MAX_AGE seconds
+#   pool       - psycopg's in-process pool (needs psycopg[pool]); suits
+#                threaded or ASGI workers that share a few connections
+#   none       - a fresh connection per request (the old behaviour)
+# asgi.py defaults to pool: with the async views on, `manage.py check`
+# rejects persistent connections.
+# `manage.py benchmark_connections` measures the difference.
+
+ATTN_DB_CONNECTIONS = os.environ.get('ATTN_DB_CONNECTIONS', 'persistent')
+
+if ATTN_DB_CONNECTIONS == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('ATTN_DB_CONN_MAX_AGE', 600))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif ATTN_DB_CONNECTIONS == 'pool':
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('ATTN_DB_POOL_MIN', 2)),
+        'max_size': int(os.environ.get('ATTN_DB_POOL_MAX', 10)),
+        'timeout': int(os.environ.get('ATTN_DB_POOL_TIMEOUT', 10)),
+    }
+elif ATTN_DB_CONNECTIONS != 'none':
+    raise ImproperlyConfigured(
+        f"ATTN_DB_CONNECTIONS must be 'persistent', 'pool' or 'none', not {ATTN_DB_CONNECTIONS!r}"
+    )
+
+# Read replica. When ATTN_DB_REPLICA_HOST is set, views marked with
+# @read_from_replica (analytics, reports, full listings) read from it;
+# everything else, and anything inside a transaction, uses the primary.
+# Without it every query goes to the primary as before.
+
+ATTN_REPLICA_DATABASE = 'replica'
+
+if os.environ.get('ATTN_DB_REPLICA_HOST'):
+    DATABASES[ATTN_REPLICA_DATABASE] = {
+        **DATABASES['default'],
+        'HOST': os.environ['ATTN_DB_REPLICA_HOST'],
+        'PORT': os.environ.get('ATTN_DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'USER': os.environ.get('ATTN_DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('ATTN_DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        # tests run against the primary's test database
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['ATTN_Backend.routers.ReplicaRouter']
+
+
+# Cache
+# Each worker keeps its own copy of the product catalog payload here; the
+# catalog and search index versions live in the database (CacheVersion)
+# and are re-read every ATTN_CACHE_VERSION_TTL seconds, so a change made
+# through one worker is served by all of them within that time.
+# The login throttle (ATTN_Backend.passwords) counts attempts here, so with
+# more than one worker this must be a shared backend (Redis, Memcached,
+# database); `manage.py check` fails on LocMemCache with WEB_CONCURRENCY > 1.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'attn-store',
+    }
+}
+
+ATTN_CACHE_VERSION_TTL = 2
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -146,6 +222,58 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    # Same output as the stock JSONRenderer, encoded with orjson when installed
+    'DEFAULT_RENDERER_CLASSES': (
+        'ATTN_Backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+# Live updates (/api/events/). PostgresBroker fans events out to every
+# worker through LISTEN/NOTIFY; ATTN_Backend.events.InMemoryBroker needs no
+# database but only reaches clients of one worker, so it refuses to run
+# with WEB_CONCURRENCY > 1.
+ATTN_EVENTS_BACKEND = os.environ.get('ATTN_EVENTS_BACKEND', 'ATTN_Backend.events.PostgresBroker')
+
+# Stock notifications generated by ATTN_Backend.forecast
+ATTN_LOW_STOCK_THRESHOLD = 5
+ATTN_RESTOCK_SOON_DAYS = 5
+
+# Stock ledger snapshots (manage.py snapshot_stock, run e.g. nightly). A
+# snapshot stays this far behind now so in-flight checkouts land in it.
+ATTN_STOCK_SNAPSHOT_LAG_SECONDS = 300
+
+# Product image thumbnails (ATTN_Backend.images). Uploads larger than
+# ATTN_IMAGE_INLINE_MAX_BYTES are resized by a background job.
+ATTN_IMAGE_INLINE_MAX_BYTES = 256 * 1024
+
+# Password hashing (ATTN_Backend.passwords) runs on a pool of
+# ATTN_PASSWORD_HASH_WORKERS threads (0 = on the request thread); past
+# ATTN_PASSWORD_HASH_QUEUE waiting hashes, signup/login answer 503.
+# Failed logins and signups per client IP, and failed logins per username,
+# are capped within ATTN_LOGIN_THROTTLE_WINDOW seconds (429 beyond that).
+ATTN_PASSWORD_HASH_WORKERS = 2
+ATTN_PASSWORD_HASH_QUEUE = 32
+ATTN_LOGIN_THROTTLE_WINDOW = 300
+ATTN_LOGIN_USER_ATTEMPTS = 5
+ATTN_LOGIN_IP_ATTEMPTS = 30
+
+# Background jobs (ATTN_Backend.jobs), run by `manage.py runworker`. Failed
+# jobs are retried after ATTN_JOB_RETRY_SECONDS, doubling each attempt;
+# jobs running longer than ATTN_JOB_TIMEOUT_SECONDS are assumed lost and
+# requeued. With ATTN_JOBS_EAGER jobs run in the web process after commit
+# instead; it defaults to on with DEBUG, so `runserver` alone still produces
+# forecasts and thumbnails. Set ATTN_JOBS_EAGER=0 to exercise the queue in
+# development. /api/_metrics shows how many jobs are waiting.
+ATTN_JOBS_EAGER = os.environ.get('ATTN_JOBS_EAGER', '1' if DEBUG else '0') == '1'
+ATTN_JOB_MAX_ATTEMPTS = 5
+ATTN_JOB_RETRY_SECONDS = 30
+ATTN_JOB_TIMEOUT_SECONDS = 600
+
+# Request instrumentation (ATTN_Backend.middleware.QueryTimingMiddleware).
+# Requests over either budget are logged as warnings; /api/_metrics shows
+# percentiles over the last ATTN_METRICS_WINDOW requests per endpoint.
+ATTN_QUERY_BUDGET = 20
+ATTN_LATENCY_BUDGET_MS = 500
+ATTN_METRICS_WINDOW = 1000
@@ -15,7 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from django.urls import include
 from django.conf import settings
 from django.conf.urls.static import static
@@ -32,5 +32,14 @@ urlpatterns = [
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path('api/', include('ATTN_Backend.urls')),
-    
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if settings.DEBUG:
+    # Development only, like static() below: in production the web server
+    # serves MEDIA_ROOT, and should send the same immutable Cache-Control
+    # for products/variants/.
+    urlpatterns.append(
+        re_path(r'^media/(?P<path>products/variants/.+)$', views.media_variant, name='media_variant'),
+    )
+
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -64,79 +64,6 @@ function calculateDaysUntilStockout(currentStock, predictedWeeklyDemand) {
   return daysLeft;
 }
 
-// -----------------------------
-// MARKET BASKET ANALYSIS
-// -----------------------------
-function analyzeMarketBasket(orderedItems, orders) {
-  // Group items by order_id
-  const orderGroups = {};
-  
-  orderedItems.forEach((item) => {
-    const orderId = item.order;
-    if (!orderId) return;
-    
-    if (!orderGroups[orderId]) {
-      orderGroups[orderId] = [];
-    }
-    
-    const productName = (item.product_name || "").toLowerCase().trim();
-    if (productName) {
-      orderGroups[orderId].push(productName);
-    }
-  });
-
-  // Find all product pairs in each order
-  const productPairs = {};
-  const productCounts = {};
-
-  Object.values(orderGroups).forEach((products) => {
-    // Count individual products
-    products.forEach((product) => {
-      productCounts[product] = (productCounts[product] || 0) + 1;
-    });
-
-    // Find pairs (only unique products in same order)
-    const uniqueProducts = [...new Set(products)];
-    for (let i = 0; i < uniqueProducts.length; i++) {
-      for (let j = i + 1; j < uniqueProducts.length; j++) {
-        const pair = [uniqueProducts[i], uniqueProducts[j]].sort().join(" + ");
-        productPairs[pair] = (productPairs[pair] || 0) + 1;
-      }
-    }
-  });
-
-  const totalOrders = Object.keys(orderGroups).length;
-
-  // Calculate metrics for each pair
-const associations = Object.entries(productPairs).map(([pair, count]) => {
-  const [product1, product2] = pair.split(" + ");
-  
-  const support = (count / totalOrders) * 100;
-
-  // ✅ New confidence calculation: denominator = baskets with product1 OR product2
-  const denom = productCounts[product1] + productCounts[product2] - count;
-  const confidence = denom > 0 ? (count / denom) * 100 : 0;
-
-  const expectedTogether = (productCounts[product1] / totalOrders) * (productCounts[product2] / totalOrders);
-  const lift = (count / totalOrders) / expectedTogether;
-
-  return {
-    product1: product1.charAt(0).toUpperCase() + product1.slice(1),
-    product2: product2.charAt(0).toUpperCase() + product2.slice(1),
-    frequency: count,
-    support,
-    confidence,   // ✅ single confidence value for the pair
-    lift
-  };
-});
-
-  // Sort by frequency and filter meaningful associations
-  associations.sort((a, b) => b.frequency - a.frequency);
-  
-  // Filter: at least 2 occurrences and lift > 1 (better than random)
-  return associations.filter(a => a.frequency >= 2 && a.lift > 1).slice(0, 10);
-}
-
 function Analytics() {
   const [salesData, setSalesData] = useState([]);
   const [restockData, setRestockData] = useState([]);
@@ -171,8 +98,10 @@ function Analytics() {
         setProducts(productsData);
         processSalesData(orderedItems, orders, productsData);
         
-        // Analyze market basket
-        const basketResults = analyzeMarketBasket(orderedItems, orders);
+        // Market basket analysis is computed and cached server-side
+        const basketRes = await fetch("http://127.0.0.1:8000/api/analytics/basket/");
+        if (!basketRes.ok) throw new Error(`Failed to fetch basket analysis: ${basketRes.status}`);
+        const basketResults = await basketRes.json();
         setBasketAnalysis(basketResults);
         console.log("Market Basket Analysis:", basketResults);
       } catch (err) {
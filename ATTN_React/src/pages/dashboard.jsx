@@ -34,137 +34,27 @@ export default function Dashboard() {
     yearOptions.push(y);
   }
 
-  // 🔥 Helper function to process all fetched data
-  const processDashboardData = (data) => {
-    const today = new Date();
-    const todayMonth = today.getMonth() + 1;
-    const todayYear = today.getFullYear();
-    const todayDate = today.getDate();
-
-    // ---- Today’s Items ----
-    const todaysItems = data.filter((item) => {
-      if (!item.order_date) return false;
-      const d = new Date(item.order_date);
-      return (
-        d.getDate() === todayDate &&
-        d.getMonth() + 1 === todayMonth &&
-        d.getFullYear() === todayYear
-      );
-    });
-
-    // ---- Today's Sales ----
-    const totalSales = todaysItems.reduce((sum, item) => {
-      return sum + parseFloat(item.selling_price || 0) * (item.qty || 0);
-    }, 0);
-
-    // ---- Today's Profit ----
-    const totalProfit = todaysItems.reduce((sum, item) => {
-      return (
-        sum +
-        (parseFloat(item.selling_price || 0) -
-          parseFloat(item.cost_price || 0)) *
-          (item.qty || 0)
-      );
-    }, 0);
-
-    setTodaySalesCount(totalSales);
-    setTodayProfit(totalProfit);
-
-    // ---- Top Product ----
-     // ---- Today's Top-Selling Product ----
-    const todayProductTotals = {};
-    todaysItems.forEach((item) => {
-      const name = item.product_name;
-      todayProductTotals[name] = (todayProductTotals[name] || 0) + (item.qty || 0);
-    });
-
-    const sortedTodayProducts = Object.entries(todayProductTotals).sort(
-      (a, b) => b[1] - a[1]
-    );
-
-    setTopProduct(
-      sortedTodayProducts.length ? sortedTodayProducts[0][0] : "No sales today"
-    );
-
-
-    updateWeeklyData(selectedMonth, data);
-    updateYearlyData(selectedYear, data);
-  };
-
-  // ---- Weekly aggregation ----
-  const updateWeeklyData = (month, data) => {
-    const monthOrders = data.filter((item) => {
-      if (!item.order_date) return false;
-      const d = new Date(item.order_date);
-      return d.getMonth() + 1 === parseInt(month);
-    });
-
-    const weeks = [];
-    const daysInMonth = new Date(new Date().getFullYear(), month, 0).getDate();
-    const numWeeks = Math.ceil(daysInMonth / 7);
-
-    for (let i = 0; i < numWeeks; i++) weeks.push([]);
-
-    monthOrders.forEach((item) => {
-      const orderDate = new Date(item.order_date);
-      const weekNumber = Math.floor((orderDate.getDate() - 1) / 7);
-      weeks[weekNumber].push(item);
-    });
-
-    const weeklyTotals = weeks.map((weekItems, i) => {
-      const sales = weekItems.reduce(
-        (sum, item) =>
-          sum + parseFloat(item.selling_price || 0) * (item.qty || 0),
-        0
-      );
-      const profit = weekItems.reduce(
-        (sum, item) =>
-          sum +
-          (parseFloat(item.selling_price || 0) -
-            parseFloat(item.cost_price || 0)) *
-            (item.qty || 0),
-        0
-      );
-      return { week: `Week ${i + 1}`, sales, profit };
-    });
-
-    setWeeklyData(weeklyTotals);
-    setTotalMonthSales(weeklyTotals.reduce((s, w) => s + w.sales, 0));
-    setTotalMonthProfit(weeklyTotals.reduce((s, w) => s + w.profit, 0));
-  };
-
-  // ---- Yearly aggregation ----
-  const updateYearlyData = (year, data) => {
-    const months = Array.from({ length: 12 }, (_, i) => ({
-      month: new Date(0, i).toLocaleString("en", { month: "short" }),
-      sales: 0,
-      profit: 0,
-    }));
-
-    data.forEach((item) => {
-      if (!item.order_date) return;
-      const d = new Date(item.order_date);
-      if (d.getFullYear() !== Number(year)) return;
-
-      const monthIndex = d.getMonth();
-      months[monthIndex].sales +=
-        parseFloat(item.selling_price || 0) * (item.qty || 0);
-      months[monthIndex].profit +=
-        (parseFloat(item.selling_price || 0) -
-          parseFloat(item.cost_price || 0)) *
-        (item.qty || 0);
-    });
-
-    setYearlyData(months);
-    setTotalYearSales(months.reduce((s, m) => s + m.sales, 0));
-    setTotalYearProfit(months.reduce((s, m) => s + m.profit, 0));
+  // 🔥 Totals are computed server-side by /api/dashboard/
+  const applyDashboardData = (data) => {
+    setTodaySalesCount(data.today.sales);
+    setTodayProfit(data.today.profit);
+    setTopProduct(data.today.top_product || "No sales today");
+
+    setWeeklyData(data.weekly);
+    setTotalMonthSales(data.month_sales);
+    setTotalMonthProfit(data.month_profit);
+
+    setYearlyData(data.yearly);
+    setTotalYearSales(data.year_sales);
+    setTotalYearProfit(data.year_profit);
   };
 
-  // 🚀 INITIAL FETCH (RUN ONCE)
-  useEffect(() => {
-    fetch("http://127.0.0.1:8000/api/ordereditem/")
+  const fetchDashboard = () => {
+    fetch(
+      `http://127.0.0.1:8000/api/dashboard/?month=${selectedMonth}&year=${selectedYear}`
+    )
       .then((res) => res.json())
-      .then(processDashboardData);
+      .then(applyDashboardData);
 
     fetch("http://127.0.0.1:8000/api/analytics/")
       .then((res) => res.json())
@@ -172,22 +62,12 @@ export default function Dashboard() {
         setDailySales(data.daily_sales || []);
         setTopProducts(data.top_products || []);
       });
-  }, []);
+  };
 
-  // 🚀 AUTO UPDATE EVERY 3 SECONDS
+  // 🚀 FETCH NOW + AUTO UPDATE EVERY 3 SECONDS
   useEffect(() => {
-    const interval = setInterval(() => {
-      fetch("http://127.0.0.1:8000/api/ordereditem/")
-        .then((res) => res.json())
-        .then(processDashboardData);
-
-      fetch("http://127.0.0.1:8000/api/analytics/")
-        .then((res) => res.json())
-        .then((data) => {
-          setDailySales(data.daily_sales || []);
-          setTopProducts(data.top_products || []);
-        });
-    }, 3000);
+    fetchDashboard();
+    const interval = setInterval(fetchDashboard, 3000);
 
     return () => clearInterval(interval);
   }, [selectedMonth, selectedYear]);
@@ -3,42 +3,42 @@ import { Search, Eye } from "lucide-react";
 import { useNavigate } from "react-router-dom";
 
 function DebtList() {
-  const [orders, setOrders] = useState([]);
-  const [payments, setPayments] = useState([]);
+  const [customers, setCustomers] = useState([]);
+  const [totalPendingAmount, setTotalPendingAmount] = useState(0);
   const [searchTerm, setSearchTerm] = useState("");
 
   const navigate = useNavigate();
 
   // ------------------------------
-  // FETCH ORDERS
+  // FETCH OUTSTANDING BALANCES PER CUSTOMER (computed server-side)
   // ------------------------------
-  const fetchOrders = async () => {
+  const fetchDebts = async () => {
     try {
-      const res = await fetch("http://127.0.0.1:8000/api/orders/");
-      const data = await res.json();
-      setOrders(data);
+      const rows = [];
+      let cursor = null;
+      let total = 0;
+      do {
+        const params = new URLSearchParams({ limit: "500" });
+        if (cursor) params.set("cursor", cursor);
+        const res = await fetch(`http://127.0.0.1:8000/api/debts/?${params}`);
+        const data = await res.json();
+        rows.push(...data.results);
+        total = data.total_pending;
+        cursor = data.next_cursor;
+      } while (cursor);
+
+      setCustomers(
+        rows.map((c) => ({ ...c, cus_name: c.cus_name || "Unknown" }))
+      );
+      setTotalPendingAmount(total);
     } catch (err) {
-      console.error("Error fetching orders:", err);
-    }
-  };
-
-  // ------------------------------
-  // FETCH PAYMENTS
-  // ------------------------------
-  const fetchPayments = async () => {
-    try {
-      const res = await fetch("http://127.0.0.1:8000/api/debtpayments/");
-      const data = await res.json();
-      setPayments(data);
-    } catch (err) {
-      console.error("Error fetching payments:", err);
+      console.error("Error fetching debts:", err);
     }
   };
 
   // First load ONLY ONCE
   useEffect(() => {
-    fetchOrders();
-    fetchPayments();
+    fetchDebts();
   }, []);
 
   // ------------------------------
@@ -46,55 +46,19 @@ function DebtList() {
   // ------------------------------
   useEffect(() => {
     const interval = setInterval(() => {
-      fetchOrders();
-      fetchPayments();
+      fetchDebts();
     }, 2000);  // auto refresh every 2 seconds
 
     return () => clearInterval(interval);
   }, []);
 
-  // ------------------------------
-  // AGGREGATE PENDING BY CUSTOMER
-  // ------------------------------
-  const aggregatedPendingOrders = () => {
-    const pendingOrders = orders.filter((o) => o.status === "Pending");
-    const grouped = {};
-
-    pendingOrders.forEach((order) => {
-      const name = order.cus_name || "Unknown";
-
-      const totalPaid = payments
-        .filter((p) => p.order === order.order_id)
-        .reduce((sum, p) => sum + parseFloat(p.amount_paid), 0);
-
-      const remaining = parseFloat(order.total_amt) - totalPaid;
-
-      if (!grouped[name]) {
-        grouped[name] = {
-          cus_name: name,
-          total_pending: remaining,
-        };
-      } else {
-        grouped[name].total_pending += remaining;
-      }
-    });
-
-    return Object.values(grouped);
-  };
-
   // ------------------------------
   // SEARCH FILTER
   // ------------------------------
-  const filteredOrders = aggregatedPendingOrders().filter((o) =>
+  const filteredOrders = customers.filter((o) =>
     (o.cus_name || "").toLowerCase().includes(searchTerm.toLowerCase())
   );
 
-  // TOTAL
-  const totalPendingAmount = aggregatedPendingOrders().reduce(
-    (sum, o) => sum + o.total_pending,
-    0
-  );
-
   return (
     <div className="p-3">
       <h1 className="text-2xl font-bold text-[#4D1C0A] mb-4">Debt List</h1>
@@ -23,7 +23,7 @@ function DebtTransactions() {
   const fetchCustomerPayments = async () => {
     try {
       const res = await fetch(
-        `http://127.0.0.1:8000/api/debtpayments/?customer=${customerName}`
+        `http://127.0.0.1:8000/api/debtpayments/?customer=${encodeURIComponent(customerName)}`
       );
       const data = await res.json();
       setCustomerPayments(data);
@@ -37,21 +37,17 @@ function DebtTransactions() {
   // ------------------------------
   const fetchOrders = async () => {
     try {
-      const res = await fetch("http://127.0.0.1:8000/api/orders/");
-      const data = await res.json();
-
-      // Filter by customer
-      const customerOrders = data.filter(
-        (o) => o.cus_name === customerName && o.status === "Pending"
-      );
-
-      // Calculate remaining balance for each order
-      const ordersWithBalance = customerOrders.map((order) => {
-        const paidAmount = customerPayments
-          .filter((p) => p.order === order.order_id)
-          .reduce((sum, p) => sum + parseFloat(p.amount_paid), 0);
-        return { ...order, remaining_amt: order.total_amt - paidAmount };
-      });
+      // Pending orders with remaining balance, computed server-side
+      const ordersWithBalance = [];
+      let cursor = null;
+      do {
+        const params = new URLSearchParams({ customer: customerName, limit: "500" });
+        if (cursor) params.set("cursor", cursor);
+        const res = await fetch(`http://127.0.0.1:8000/api/debts/?${params}`);
+        const data = await res.json();
+        ordersWithBalance.push(...data.results);
+        cursor = data.next_cursor;
+      } while (cursor);
 
       setOrders(ordersWithBalance);
     } catch (err) {
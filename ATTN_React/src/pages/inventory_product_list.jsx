@@ -106,18 +106,43 @@ function ProductList() {
       .catch((err) => console.error("Error fetching categories:", err));
   }, []);
 
-  const filteredProducts = products.filter((item) => {
-    const categoryName = typeof item.category === 'object' ? (item.category?.name || '') : (item.category || '');
-    const itemName = (item.display_name || item.name || '').toString();
+  // Ids from the server-side ranked search (prefix, substring, typos), best
+  // match first; null while the search box is empty
+  const [searchIds, setSearchIds] = useState(null);
 
-    const matchesSearch =
-      itemName.toLowerCase().includes(search.toLowerCase()) ||
-      categoryName.toLowerCase().includes(search.toLowerCase());
+  useEffect(() => {
+    const query = search.trim();
+    if (!query) {
+      setSearchIds(null);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetch(`http://127.0.0.1:8000/api/products/search/?q=${encodeURIComponent(query)}&limit=50`, { signal: controller.signal })
+        .then((res) => res.json())
+        .then((data) => setSearchIds((data.results || []).map((p) => p.id)))
+        .catch((err) => {
+          if (err.name !== "AbortError") console.error("Error searching products: ", err);
+        });
+    }, 200);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [search]);
+
+  const productsById = new Map(products.map((p) => [p.id, p]));
+  const searchedProducts = searchIds === null
+    ? products
+    : searchIds.map((id) => productsById.get(id)).filter(Boolean);
+
+  const filteredProducts = searchedProducts.filter((item) => {
+    const categoryName = typeof item.category === 'object' ? (item.category?.name || '') : (item.category || '');
 
     const matchesCategory =
       filterCaategory === "" || categoryName === filterCaategory;
 
-    return matchesSearch && matchesCategory;
+    return matchesCategory;
   });
 
 
@@ -1,50 +1,93 @@
 import { useEffect, useState } from "react";
 import { Search, ChevronDown } from "lucide-react";
 
+const API = "http://127.0.0.1:8000/api/ewallets/";
+const PAGE_SIZE = 50;
+
+// YYYY-MM-DD in local time
+const isoDate = (d) =>
+  `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, "0")}-${String(d.getDate()).padStart(2, "0")}`;
+
+// Date filter -> query-string range; the server does the filtering
+function dateRange(selectedFilter, specificDate) {
+  const today = new Date();
+  if (selectedFilter === "Today") return { date_from: isoDate(today), date_to: isoDate(today) };
+  if (selectedFilter === "Past 7 Days") {
+    const from = new Date();
+    from.setDate(today.getDate() - 7);
+    return { date_from: isoDate(from), date_to: isoDate(today) };
+  }
+  if (selectedFilter === "Past Month") {
+    const from = new Date();
+    from.setMonth(today.getMonth() - 1);
+    return { date_from: isoDate(from), date_to: isoDate(today) };
+  }
+  if (selectedFilter === "Specific Date" && specificDate) return { date_from: specificDate, date_to: specificDate };
+  return {};
+}
+
 function EwalletHistory() {
   const [transactions, setTransactions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [summary, setSummary] = useState(null);
+  const [loading, setLoading] = useState(false);
   const [searchTerm, setSearchTerm] = useState("");
   const [selectedFilter, setSelectedFilter] = useState("All"); // All / Today / Past 7 Days / Past Month / Specific Date
   const [specificDate, setSpecificDate] = useState(""); // Only used if Specific Date is selected
 
-  // Fetch e-wallet data from Django
+  const buildParams = (extra = {}) => {
+    const params = new URLSearchParams({ ...dateRange(selectedFilter, specificDate), ...extra });
+    if (searchTerm.trim()) params.set("q", searchTerm.trim());
+    return params;
+  };
+
+  // First page + per app/type totals whenever the filters change (search is debounced)
   useEffect(() => {
-    fetch("http://127.0.0.1:8000/api/ewallets/")
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      setLoading(true);
+      fetch(`${API}?${buildParams({ limit: PAGE_SIZE })}`, { signal: controller.signal })
+        .then((res) => res.json())
+        .then((data) => {
+          setTransactions(data.results || []);
+          setNextCursor(data.next_cursor);
+        })
+        .catch((err) => {
+          if (err.name !== "AbortError") console.error("Error fetching ewallet:", err);
+        })
+        .finally(() => setLoading(false));
+
+      fetch(`${API}summary/?${buildParams()}`, { signal: controller.signal })
+        .then((res) => res.json())
+        .then((data) => setSummary(data))
+        .catch((err) => {
+          if (err.name !== "AbortError") console.error("Error fetching ewallet summary:", err);
+        });
+    }, 250);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [searchTerm, selectedFilter, specificDate]);
+
+  const loadMore = () => {
+    if (!nextCursor || loading) return;
+    setLoading(true);
+    fetch(`${API}?${buildParams({ limit: PAGE_SIZE, cursor: nextCursor })}`)
       .then((res) => res.json())
-      .then((data) => setTransactions(data))
-      .catch((err) => console.error("Error fetching ewallet:", err));
-  }, []);
+      .then((data) => {
+        setTransactions((prev) => [...prev, ...(data.results || [])]);
+        setNextCursor(data.next_cursor);
+      })
+      .catch((err) => console.error("Error fetching ewallet:", err))
+      .finally(() => setLoading(false));
+  };
 
   const handleFilterChange = (value) => {
     setSelectedFilter(value);
     if (value !== "Specific Date") setSpecificDate("");
   };
 
-  const filteredTransactions = transactions.filter((t) => {
-    const matchesSearch =
-      t.EWALL_APP?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      t.EWALL_TYPE?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      t.EWALL_ACC_NAME?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      (t.EWAL_NUM && t.EWAL_NUM.includes(searchTerm)) ||
-      t.EWALL_ID.toString().includes(searchTerm);
-
-    const txDate = new Date(t.EWALL_DATE);
-    const today = new Date();
-    const sevenDaysAgo = new Date();
-    sevenDaysAgo.setDate(today.getDate() - 7);
-    const pastMonth = new Date();
-    pastMonth.setMonth(today.getMonth() - 1);
-
-    let matchesFilter = true;
-    if (selectedFilter === "Today") matchesFilter = txDate.toDateString() === today.toDateString();
-    else if (selectedFilter === "Past 7 Days") matchesFilter = txDate >= sevenDaysAgo && txDate <= today;
-    else if (selectedFilter === "Past Month") matchesFilter = txDate >= pastMonth && txDate <= today;
-    else if (selectedFilter === "Specific Date" && specificDate)
-      matchesFilter = txDate.toISOString().split("T")[0] === specificDate;
-
-    return matchesSearch && matchesFilter;
-  });
-
   return (
     <div className="p-3">
       <h1 className="text-2xl font-bold text-[#4D1C0A] mb-4">E-wallet Transaction List</h1>
@@ -115,6 +158,19 @@ function EwalletHistory() {
           </div>
         </div>
 
+        {/* Totals per e-wallet and type for the current filters */}
+        {summary && summary.by_app_type.length > 0 && (
+          <div className="grid grid-cols-2 md:grid-cols-4 gap-3 mt-4">
+            {summary.by_app_type.map((t) => (
+              <div key={`${t.app}-${t.type}`} className="border rounded-lg p-3 bg-gray-50">
+                <p className="text-xs text-gray-500">{t.app} · {t.type} ({t.count})</p>
+                <p className="font-semibold text-gray-800">₱{t.total}</p>
+                <p className="text-xs text-gray-500">Amount ₱{t.amount} · Fee ₱{t.fee}</p>
+              </div>
+            ))}
+          </div>
+        )}
+
         {/* Table */}
         <div className="overflow-x-auto mt-4">
           <table className="table table-md w-full">
@@ -133,14 +189,14 @@ function EwalletHistory() {
             </thead>
 
             <tbody>
-              {filteredTransactions.length === 0 ? (
+              {transactions.length === 0 ? (
                 <tr>
                   <td colSpan="9" className="text-center text-gray-400">
                     No transactions found.
                   </td>
                 </tr>
               ) : (
-                filteredTransactions.map((t) => (
+                transactions.map((t) => (
                   <tr key={t.EWALL_ID} className="text-gray-800">
                     <td>
                       <span
@@ -165,6 +221,18 @@ function EwalletHistory() {
             </tbody>
           </table>
         </div>
+
+        {nextCursor && (
+          <div className="flex justify-center mt-4">
+            <button
+              onClick={loadMore}
+              disabled={loading}
+              className="btn btn-sm btn-outline border-gray-300 hover:bg-gray-50 normal-case font-normal text-gray-700"
+            >
+              {loading ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -17,6 +17,9 @@ function OrderProduct() {
   const [showModal, setShowModal] = useState(false);
   const [notification, setNotification] = useState({ show: false, message: "", type: "success" });
   const [searchTerm, setSearchTerm] = useState("");
+  // Ids from the server-side ranked search, best match first; null while
+  // the search box is empty
+  const [searchIds, setSearchIds] = useState(null);
 
   const today = new Date().toISOString().split("T")[0];
 
@@ -167,11 +170,31 @@ function OrderProduct() {
       .catch(() => showAlert("Failed to save order.", "error"));
   };
 
-  const filteredProducts = products.filter(
-    (p) =>
-      p.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      p.category.toLowerCase().includes(searchTerm.toLowerCase())
-  );
+  useEffect(() => {
+    const query = searchTerm.trim();
+    if (!query) {
+      setSearchIds(null);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetch(`http://localhost:8000/api/products/search/?q=${encodeURIComponent(query)}&limit=50`, { signal: controller.signal })
+        .then((res) => res.json())
+        .then((data) => setSearchIds((data.results || []).map((p) => p.id)))
+        .catch((err) => {
+          if (err.name !== "AbortError") console.error("Error searching products:", err);
+        });
+    }, 200);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [searchTerm]);
+
+  const productsById = new Map(products.map((p) => [p.id, p]));
+  const filteredProducts = searchIds === null
+    ? products
+    : searchIds.map((id) => productsById.get(id)).filter(Boolean);
 
   return (
     <div className="p-6 space-y-8">